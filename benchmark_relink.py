@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+benchmark_relink.py — Synthetic benchmark for relink_missing_photos.py.
+
+Generates a photo tree and a matching Missing_Photos.csv, puts a deterministic
+fake ``exiftool`` on PATH, then times each stage of the relink pipeline
+(indexing, metadata extraction, date parsing, decisions, output writing) and
+a full end-to-end run of the script.  It also times candidate discovery
+for every row with each backend (in-memory index, --filename-index, and
+mdfind where available).  Results are written as JSON so that successive
+runs can be compared with ``--compare``.
+
+Usage:
+    python3 benchmark_relink.py --rows 5000 --output bench/after.json --compare bench/before.json
+    python3 benchmark_relink.py --csv Missing_Photos.csv --search-root /Volumes/Photos  # backends only
+
+The synthetic "image" files contain their EXIF tags as JSON, which the fake
+exiftool reads back.  It speaks both the one-shot command line and the
+``-stay_open`` protocol and can add a per-file delay (--exiftool-latency-ms)
+to model real exiftool costs.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import relink_missing_photos as relink
+
+SCRIPT = Path(__file__).resolve().parent / "relink_missing_photos.py"
+CSV_COLUMNS = ["Photo", "Filename", "Date/Time Original (Capture)", "Width", "Height", "Camera Make"]
+MAKES = ["Canon", "NIKON CORPORATION", "SONY", "FUJIFILM", "Apple", "OLYMPUS CORPORATION"]
+RAW_FORMATS = [".CR2", ".NEF", ".ARW", ".RAF", ".DNG", ".ORF"]
+OTHER_FORMATS = [".JPG", ".TIF", ".HEIC"]
+SIZES = [(6000, 4000), (4000, 3000), (2000, 1500)]
+STAGES = ["indexing", "metadata", "date_parsing", "decisions", "output_writing"]
+
+FAKE_EXIFTOOL = r'''#!{python}
+# Deterministic exiftool stand-in written by benchmark_relink.py.
+# Each synthetic file holds its tags as a JSON object.
+import json, os, sys, time
+
+LATENCY = float(os.environ.get("BENCH_EXIFTOOL_LATENCY", "0"))
+
+def run(args, out, err):
+    echo4 = None
+    if "-echo4" in args:
+        i = args.index("-echo4")
+        echo4 = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    if "-ver" in args:
+        out.write("12.76\n")
+    else:
+        records = []
+        for path in (a for a in args if not a.startswith("-")):
+            if LATENCY:
+                time.sleep(LATENCY)
+            try:
+                with open(path) as f:
+                    tags = json.load(f)
+            except (OSError, ValueError):
+                err.write("Error: File not found - %s\n" % path)
+                continue
+            tags["SourceFile"] = path
+            records.append(tags)
+        if records:
+            out.write(json.dumps(records) + "\n")
+    if echo4:
+        err.write(echo4 + "\n")
+
+argv = sys.argv[1:]
+if argv[:2] == ["-stay_open", "True"]:
+    pending = []
+    for line in sys.stdin:
+        line = line.rstrip("\n")
+        if line.startswith("-execute"):
+            run(pending, sys.stdout, sys.stderr)
+            sys.stdout.write("{ready%s}\n" % line[len("-execute"):])
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pending = []
+        elif pending == ["-stay_open"] and line == "False":
+            break
+        else:
+            pending.append(line)
+else:
+    run(argv, sys.stdout, sys.stderr)
+'''
+
+
+# =============================================================================
+# Corpus generation
+# =============================================================================
+
+def generate_corpus(work_dir, rows, duplicate_rate, cross_format_rate, tz_offset_rate,
+                    missing_rate, dirs, seed):
+    """
+    Write a synthetic search tree and Missing_Photos.csv under work_dir.
+
+    Every CSV row gets one exact match unless it is chosen as missing; on top
+    of that some rows get same-stem duplicates elsewhere in the tree (another
+    size of the same shot, or an unrelated photo), cross-format variants
+    (JPG/TIF/HEIC/DNG next to the original), and some exact matches carry a
+    whole-hour timezone offset.
+    """
+    rng = random.Random(seed)
+    root = work_dir / "photos"
+    csv_path = work_dir / "Missing_Photos.csv"
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    stats = {"rows": rows, "files": 0, "duplicates": 0, "cross_format": 0, "tz_offset": 0, "missing": 0}
+    start = datetime(2012, 1, 1)
+
+    def write_file(stem, ext, make, size, taken):
+        directory = root / f"{rng.randrange(dirs):04d}" / f"{rng.randrange(20):02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{stem}{ext}"
+        tags = {"Make": make, "ImageWidth": size[0], "ImageHeight": size[1],
+                "DateTimeOriginal": taken.strftime("%Y:%m:%d %H:%M:%S")}
+        path.write_text(json.dumps(tags))
+        stats["files"] += 1
+
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
+        for i in range(rows):
+            # Camera counters wrap, so stems repeat across the library.
+            stem = f"IMG_{i % 9000 + 1000:04d}" if rng.random() < duplicate_rate else f"DSC{i:06d}"
+            ext = rng.choice(RAW_FORMATS) if rng.random() < 0.7 else rng.choice(OTHER_FORMATS)
+            make = rng.choice(MAKES)
+            size = rng.choice(SIZES)
+            taken = start + timedelta(seconds=rng.randrange(10 * 365 * 86400))
+            writer.writerow([f"/Volumes/Old/Photos/{taken:%Y/%m}/{stem}{ext}", f"{stem}{ext}",
+                             taken.strftime("%Y-%m-%d %H:%M:%S"), size[0], size[1], make])
+
+            if rng.random() < missing_rate:
+                stats["missing"] += 1
+            else:
+                match_time = taken
+                if rng.random() < tz_offset_rate:
+                    match_time += timedelta(hours=rng.choice([-8, -5, 1, 2, 9]))
+                    stats["tz_offset"] += 1
+                write_file(stem, ext, make, size, match_time)
+            if rng.random() < duplicate_rate:
+                # Half are the same shot at another size (resolution mismatches),
+                # half an unrelated photo that reused the file name.
+                other = rng.choice([s for s in SIZES if s != size])
+                dup_time = taken if rng.random() < 0.5 else taken + timedelta(days=rng.randrange(1, 900))
+                write_file(stem, ext, make, other, dup_time)
+                stats["duplicates"] += 1
+            if rng.random() < cross_format_rate:
+                variant = rng.choice([e for e in OTHER_FORMATS + [".DNG"] if e != ext])
+                write_file(stem, variant, make, rng.choice(SIZES), taken)
+                stats["cross_format"] += 1
+            # Sidecars are skipped by the indexer.
+            if rng.random() < 0.2:
+                sidecar_dir = root / f"{rng.randrange(dirs):04d}"
+                sidecar_dir.mkdir(exist_ok=True)
+                (sidecar_dir / f"{stem}.xmp").write_text("")
+    return root, csv_path, stats
+
+
+def install_fake_exiftool(work_dir, latency_ms):
+    """Write the fake exiftool to work_dir/bin and put it first on PATH (also for subprocesses)."""
+    bin_dir = work_dir / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    exiftool = bin_dir / "exiftool"
+    exiftool.write_text(FAKE_EXIFTOOL.replace("{python}", sys.executable, 1))
+    exiftool.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["BENCH_EXIFTOOL_LATENCY"] = str(latency_ms / 1000.0)
+    return exiftool
+
+
+# =============================================================================
+# Stages
+# =============================================================================
+
+def load_rows(csv_path):
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def run_stages(root, csv_path, out_dir, workers, allow_timezone_mismatches):
+    """Run each pipeline stage once, in order; return {stage: (seconds, items)}."""
+    timings = {}
+    rows = load_rows(csv_path)
+    quiet = open(os.devnull, "w")
+    real_stderr = sys.stderr
+
+    # The relink functions report progress on stderr; keep the benchmark output readable.
+    sys.stderr = quiet
+    try:
+        started = time.perf_counter()
+        index = relink.index_files_by_stem(root, [], workers=workers)
+        timings["indexing"] = (time.perf_counter() - started, index.files)
+
+        candidates = {}
+        for row in rows:
+            stem = Path(row["Photo"]).stem.lower()
+            candidates[stem] = [Path(p) for p in index.get(stem, ())]
+        paths = list(dict.fromkeys(str(c) for cands in candidates.values() for c in cands))
+        started = time.perf_counter()
+        with relink.ExiftoolPool(size=workers) as pool:
+            metadata = pool.get_exif_data_batch(paths)
+        timings["metadata"] = (time.perf_counter() - started, len(paths))
+
+        started = time.perf_counter()
+        capture_times, _, _ = relink.prescan_missing_csv(csv_path)
+        target_times = [relink.capture_datetime(t) for t in capture_times]
+        for meta in metadata.values():
+            relink.parse_datetime(meta["DateTime"])
+        timings["date_parsing"] = (time.perf_counter() - started, len(rows) + len(metadata))
+
+        started = time.perf_counter()
+        results = []
+        for row, target_time in zip(rows, target_times):
+            original_path = row["Photo"]
+            scored = [
+                s for s in (
+                    relink.score_candidate(c, metadata.get(str(c)), target_time,
+                                           row["Camera Make"].strip().lower(), original_path,
+                                           allow_timezone_mismatches=allow_timezone_mismatches)
+                    for c in candidates[Path(original_path).stem.lower()]
+                ) if s
+            ]
+            result = relink.decide_row(original_path, int(row["Width"]), int(row["Height"]),
+                                       scored, copy_across_volumes=False)
+            result["row"] = row
+            results.append(result)
+        timings["decisions"] = (time.perf_counter() - started, len(rows))
+
+        started = time.perf_counter()
+        out_dir.mkdir(parents=True, exist_ok=True)
+        scripts = {key: relink.open_output(out_dir / f"{key}.sh", False)
+                   for key in ("relink", "mismatch", "higher_resolution")}
+        still_missing, other_formats, higher_res = [], [], []
+        for result in results:
+            for key, f in scripts.items():
+                f.writelines(line + "\n" for line in result[key])
+            if result["outcome"] == relink.OUTCOME_STILL_MISSING:
+                still_missing.append(result["row"])
+            other_formats.extend(result["import_other_formats"])
+            higher_res.extend(result["import_same_format_higher_res"])
+        for f in scripts.values():
+            f.close()
+        relink.append_csv_rows(out_dir / "Still_Missing_Photos.csv", CSV_COLUMNS, still_missing, False)
+        if other_formats:
+            relink.append_csv_rows(out_dir / "import_other_formats.csv", list(other_formats[0]), other_formats, False)
+        if higher_res:
+            relink.append_csv_rows(out_dir / "import_same_format_higher_resolution.csv", list(higher_res[0]),
+                                   higher_res, False)
+        timings["output_writing"] = (time.perf_counter() - started, len(results))
+    finally:
+        sys.stderr = real_stderr
+        quiet.close()
+    return timings
+
+
+def measure_index_memory(root, workers):
+    """
+    Memory traced (tracemalloc) for the stem index: the peak during a whole
+    index_files_by_stem run and what the finished index keeps; then, from
+    the same directory listings, the peak of the build step alone next to
+    building the index as a dict of stem -> list of path strings.
+    """
+    quiet = open(os.devnull, "w")
+    real_stderr = sys.stderr
+    sys.stderr = quiet
+    tracemalloc.start()
+    try:
+        index = relink.index_files_by_stem(root, [], workers=workers)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        sys.stderr = real_stderr
+        quiet.close()
+    index_build_peak, _ = traced_build(root, relink.StemIndex)
+    dict_build_peak, dict_bytes = traced_build(root, dict_of_lists)
+    return {
+        "files": index.files,
+        "stems": len(index),
+        "build_peak_bytes": peak,
+        "index_bytes": retained,
+        "index_build_peak_bytes": index_build_peak,
+        "dict_build_peak_bytes": dict_build_peak,
+        "dict_of_lists_bytes": dict_bytes,
+    }
+
+
+def walk_listings(root):
+    """Directory listings of ``root`` in the form StemIndex is built from."""
+    return {
+        directory: (None, [n for n in files
+                           if os.path.splitext(n)[1].lower() not in relink.IGNORED_CANDIDATE_EXTENSIONS], subdirs)
+        for directory, subdirs, files in os.walk(root)
+    }
+
+
+def dict_of_lists(listings):
+    """The stem index as a plain dict of sorted path lists, consuming ``listings`` like StemIndex."""
+    index = {}
+    for directory in sorted(listings):
+        for name in listings.pop(directory)[1]:
+            index.setdefault(os.path.splitext(name)[0].lower(), []).append(os.path.join(directory, name))
+    for paths in index.values():
+        paths.sort()
+    return index
+
+
+def traced_build(root, build):
+    """Return ``(peak, retained)`` bytes traced while ``build(listings)`` indexes a fresh walk of root."""
+    listings = walk_listings(root)
+    tracemalloc.start()
+    try:
+        built = build(listings)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del built
+    return peak, retained
+
+
+def run_backends(root, csv_path, work_dir, workers):
+    """
+    Look up the stem of every CSV row with each candidate discovery backend.
+
+    Returns ``{backend: {"setup_seconds", "lookup_seconds", "lookups",
+    "candidates", "microseconds_per_lookup"}}``; setup is the index walk,
+    the filename index build (cold) or refresh (nothing changed).
+    """
+    stems = [Path(row["Photo"]).stem.lower() for row in load_rows(csv_path)]
+    index_path = Path(work_dir) / "filename_index.sqlite"
+    for path in (index_path, index_path.with_name(index_path.name + "-wal"),
+                 index_path.with_name(index_path.name + "-shm")):
+        if path.exists():
+            path.unlink()
+
+    def filename_index():
+        index = relink.FilenameIndex(index_path)
+        index.refresh(root, [], workers=workers)
+        return index
+
+    backends = {
+        "memory": lambda: relink.StemIndexBackend(root, [], workers=workers),
+        "filename-index": filename_index,
+        "filename-index-refresh": filename_index,
+    }
+    if shutil.which("mdfind"):
+        backends["mdfind"] = lambda: relink.MdfindBackend(root)
+
+    results = {}
+    quiet = open(os.devnull, "w")
+    real_stderr = sys.stderr
+    sys.stderr = quiet
+    try:
+        for name, open_backend in backends.items():
+            started = time.perf_counter()
+            backend = open_backend()
+            setup = time.perf_counter() - started
+            started = time.perf_counter()
+            candidates = sum(len(backend.find(stem)) for stem in stems)
+            lookup = time.perf_counter() - started
+            backend.close()
+            results[name] = {
+                "setup_seconds": round(setup, 4),
+                "lookup_seconds": round(lookup, 4),
+                "lookups": len(stems),
+                "candidates": candidates,
+                "microseconds_per_lookup": round(lookup / len(stems) * 1e6, 2) if stems else None,
+            }
+    finally:
+        sys.stderr = real_stderr
+        quiet.close()
+    return results
+
+
+def run_end_to_end(root, csv_path, out_dir, extra_args):
+    """
+    Time a full relink_missing_photos.py run.
+
+    Returns ``(seconds, returncode, stderr tail, stats)`` where stats is the
+    script's own --stats-json report (None if it was not written).
+    """
+    stats_path = out_dir / "stats.json"
+    cmd = [sys.executable, str(SCRIPT), str(csv_path), "--search-root", str(root),
+           "--output-dir", str(out_dir), "--stats-json", str(stats_path), *extra_args]
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+    stats = json.loads(stats_path.read_text()) if stats_path.exists() else None
+    return seconds, proc.returncode, proc.stderr.strip().splitlines()[-15:], stats
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT.parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarise(samples):
+    """Reduce a list of (seconds, items) samples to a JSON-friendly dict."""
+    seconds = [s for s, _ in samples]
+    items = samples[0][1]
+    best = min(seconds)
+    return {
+        "seconds": round(best, 4),
+        "median_seconds": round(statistics.median(seconds), 4),
+        "samples": [round(s, 4) for s in seconds],
+        "items": items,
+        "items_per_second": round(items / best, 1) if best > 0 else None,
+    }
+
+
+def print_report(results, previous=None):
+    def delta(name, value):
+        if not previous:
+            return ""
+        old = (previous.get("stages", {}).get(name) or previous.get(name) or {}).get("seconds")
+        if not old:
+            return ""
+        return f"  ({(value - old) / old * 100:+.1f}% vs {previous.get('git_commit') or 'previous'})"
+
+    corpus = results["corpus"]
+    print(f"Corpus: {corpus['rows']} rows, {corpus['files']} files "
+          f"({corpus['duplicates']} duplicates, {corpus['cross_format']} cross-format, "
+          f"{corpus['tz_offset']} tz-offset, {corpus['missing']} missing)")
+    print(f"{'STAGE':<16}{'SECONDS':>10}{'ITEMS':>10}{'ITEMS/S':>12}")
+    for name in STAGES:
+        stage = results["stages"][name]
+        rate = f"{stage['items_per_second']:.0f}" if stage["items_per_second"] else "-"
+        print(f"{name:<16}{stage['seconds']:>10.3f}{stage['items']:>10}{rate:>12}{delta(name, stage['seconds'])}")
+    e2e = results.get("end_to_end")
+    if e2e:
+        print(f"{'end_to_end':<16}{e2e['seconds']:>10.3f}{corpus['rows']:>10}"
+              f"{e2e['items_per_second'] or '-':>12}{delta('end_to_end', e2e['seconds'])}")
+    memory = results["index_memory"]
+    old = (previous or {}).get("index_memory") or {}
+    mib = 2 ** 20
+    print(f"\nStem index: {memory['files']} files, {memory['stems']} stems; "
+          f"{memory['index_bytes'] / mib:.1f} MiB kept, {memory['build_peak_bytes'] / mib:.1f} MiB peak while building "
+          f"(as a dict of path lists: {memory['dict_of_lists_bytes'] / mib:.1f} MiB)")
+    if memory.get("index_build_peak_bytes") is not None:
+        print(f"  Build step from the same listings: {memory['index_build_peak_bytes'] / mib:.1f} MiB peak "
+              f"(dict of path lists: {memory['dict_build_peak_bytes'] / mib:.1f} MiB peak)")
+    if old.get("build_peak_bytes"):
+        print(f"  vs {previous.get('git_commit') or 'previous'}: {old['build_peak_bytes'] / mib:.1f} MiB peak, "
+              f"{old['index_bytes'] / mib:.1f} MiB kept")
+    print_backends(results["backends"])
+
+
+def print_backends(backends):
+    print(f"\n{'BACKEND':<24}{'SETUP S':>10}{'LOOKUPS':>10}{'LOOKUP S':>10}{'US/LOOKUP':>11}{'CANDIDATES':>12}")
+    for name, b in backends.items():
+        print(f"{name:<24}{b['setup_seconds']:>10.3f}{b['lookups']:>10}{b['lookup_seconds']:>10.3f}"
+              f"{b['microseconds_per_lookup'] or '-':>11}{b['candidates']:>12}")
+    if len({b["candidates"] for b in backends.values()}) > 1:
+        print("⚠️ Backends disagree on the number of candidates.")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark relink_missing_photos.py on a synthetic photo tree with a fake exiftool.",
+    )
+    parser.add_argument("--rows", type=int, default=2000, help="Rows in the synthetic Missing_Photos.csv (default: 2000).")
+    parser.add_argument("--duplicate-rate", type=float, default=0.3,
+                        help="Fraction of rows with a same-stem duplicate elsewhere in the tree (default: 0.3).")
+    parser.add_argument("--cross-format-rate", type=float, default=0.3,
+                        help="Fraction of rows with a variant in another format, e.g. JPG next to NEF (default: 0.3).")
+    parser.add_argument("--tz-offset-rate", type=float, default=0.1,
+                        help="Fraction of exact matches whose capture time is off by whole hours (default: 0.1).")
+    parser.add_argument("--missing-rate", type=float, default=0.1,
+                        help="Fraction of rows with no exact match on disk (default: 0.1).")
+    parser.add_argument("--dirs", type=int, default=200, help="Top-level directories in the tree (default: 200).")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed; the same seed gives the same corpus.")
+    parser.add_argument("--exiftool-latency-ms", type=float, default=0.0,
+                        help="Delay the fake exiftool adds per file, in milliseconds (default: 0).")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Index threads and exiftool workers for the stage timings (default: 4).")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Run the stages this many times and report the fastest (default: 3).")
+    parser.add_argument("--work-dir", default=None,
+                        help="Directory for the corpus and outputs (default: a temporary directory, removed afterwards).")
+    parser.add_argument("--output", default=None, metavar="JSON",
+                        help="Write results to this JSON file (default: benchmark_results/relink-<timestamp>.json).")
+    parser.add_argument("--compare", default=None, metavar="JSON",
+                        help="Earlier results file to show per-stage changes against.")
+    parser.add_argument("--skip-end-to-end", action="store_true", help="Only time the individual stages.")
+    parser.add_argument("--csv", default=None,
+                        help="Compare only the candidate discovery backends, on this real Missing_Photos.csv "
+                             "(requires --search-root; no corpus is generated).")
+    parser.add_argument("--search-root", default=None, help="Search root for --csv.")
+    parser.add_argument("--relink-args", default="--allow-timezone-mismatches",
+                        help="Extra arguments for the end-to-end run (default: --allow-timezone-mismatches).")
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1.")
+    if (args.csv is None) != (args.search_root is None):
+        parser.error("--csv and --search-root must be given together.")
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    temp_dir = None
+    if args.work_dir:
+        work_dir = Path(args.work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="relink-bench-")
+        work_dir = Path(temp_dir)
+
+    try:
+        if args.csv:
+            print(f"Comparing candidate discovery backends on {args.csv}...", file=sys.stderr)
+            print_backends(run_backends(os.path.abspath(args.search_root), args.csv, work_dir, args.workers))
+            return
+
+        print(f"Generating corpus in {work_dir}...", file=sys.stderr)
+        root, csv_path, corpus = generate_corpus(
+            work_dir, args.rows, args.duplicate_rate, args.cross_format_rate, args.tz_offset_rate,
+            args.missing_rate, args.dirs, args.seed,
+        )
+        install_fake_exiftool(work_dir, args.exiftool_latency_ms)
+
+        allow_tz = "--allow-timezone-mismatches" in args.relink_args.split()
+        samples = {name: [] for name in STAGES}
+        for n in range(args.repeat):
+            print(f"Timing stages (run {n + 1}/{args.repeat})...", file=sys.stderr)
+            for name, sample in run_stages(root, csv_path, work_dir / "stage_out", args.workers, allow_tz).items():
+                samples[name].append(sample)
+
+        results = {
+            "benchmark": "relink_missing_photos",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "work_dir")},
+            "corpus": corpus,
+            "stages": {name: summarise(samples[name]) for name in STAGES},
+        }
+
+        print("Measuring stem index memory...", file=sys.stderr)
+        results["index_memory"] = measure_index_memory(root, args.workers)
+
+        print("Timing candidate discovery backends...", file=sys.stderr)
+        results["backends"] = run_backends(root, csv_path, work_dir, args.workers)
+
+        if not args.skip_end_to_end:
+            print("Timing end-to-end run...", file=sys.stderr)
+            seconds, returncode, tail, stats = run_end_to_end(root, csv_path, work_dir / "e2e_out",
+                                                       args.relink_args.split())
+            if returncode != 0:
+                print(f"❌ relink_missing_photos.py exited with {returncode}:", file=sys.stderr)
+                print("\n".join(tail), file=sys.stderr)
+                sys.exit(1)
+            results["end_to_end"] = {
+                "seconds": round(seconds, 4),
+                "items_per_second": round(args.rows / seconds, 1) if seconds > 0 else None,
+                "summary": tail,
+                "stats": stats,
+            }
+
+        output = Path(args.output) if args.output else (
+            SCRIPT.parent / "benchmark_results" / f"relink-{datetime.now():%Y%m%d-%H%M%S}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2) + "\n")
+
+        print_report(results, previous)
+        print(f"\nResults written to {output}")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,9 +33,15 @@ import hashlib
 import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
 import tempfile
+import unicodedata
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from datetime import datetime
 from itertools import groupby
@@ -46,6 +52,7 @@ from pathlib import Path
 # ---------------------------------------------------------------------------
 
 DEFAULT_REPORT = "data/timemachine_recovery_candidates.csv"
+DEFAULT_MANIFESTS = "data/snapshot_manifests.sqlite"
 
 REPORT_COLUMNS = [
     "status",
@@ -84,6 +91,20 @@ _CCC_SNAP_DATE_RE = re.compile(
 )
 
 
+def _snapshot_name_date(name: str) -> tuple[str, str]:
+    """
+    Return ``(date, source)`` for a snapshot name: the date string (or the
+    full name if no pattern matches) and "timemachine" | "ccc" | "other".
+    """
+    tm_m = _APFS_SNAP_DATE_RE.search(name)
+    if tm_m:
+        return tm_m.group(1), "timemachine"
+    ccc_m = _CCC_SNAP_DATE_RE.search(name)
+    if ccc_m:
+        return ccc_m.group(1), "ccc"
+    return name, "other"
+
+
 def _list_apfs_snapshots(tm_volume: Path) -> list[dict]:
     """
     Run ``diskutil apfs listsnapshots <volume>`` and parse the output.
@@ -121,17 +142,7 @@ def _list_apfs_snapshots(tm_volume: Path) -> list[dict]:
         name_m = re.search(r"Name:\s+(.+)", line)
         if name_m and current_uuid:
             current_name = name_m.group(1).strip()
-            tm_m = _APFS_SNAP_DATE_RE.search(current_name)
-            ccc_m = _CCC_SNAP_DATE_RE.search(current_name)
-            if tm_m:
-                date = tm_m.group(1)
-                source = "timemachine"
-            elif ccc_m:
-                date = ccc_m.group(1)
-                source = "ccc"
-            else:
-                date = current_name
-                source = "other"
+            date, source = _snapshot_name_date(current_name)
             snapshots.append({
                 "uuid": current_uuid,
                 "name": current_name,
@@ -173,8 +184,67 @@ def _mount_apfs_snapshot(snapshot_name: str, tm_volume: Path):
                 capture_output=True,
             )
 
+class ApfsSnapshotMounter:
+    """
+    Lists the APFS snapshots of a backup volume with ``diskutil`` and mounts
+    them read-only with ``mount_apfs`` (see ``_mount_apfs_snapshot``).
+
+    Scanning and restoring only go through ``list_snapshots()`` and the
+    ``mount(snapshot_name)`` context manager, so another mounter can stand in
+    for APFS — see ``DirectorySnapshotMounter``.
+    """
+
+    def __init__(self, tm_volume: Path):
+        self.tm_volume = tm_volume
+
+    def list_snapshots(self) -> list[dict]:
+        return _list_apfs_snapshots(self.tm_volume)
+
+    def mount(self, snapshot_name: str):
+        return _mount_apfs_snapshot(snapshot_name, self.tm_volume)
+
+
+class DirectorySnapshotMounter(ApfsSnapshotMounter):
+    """
+    Stand-in mounter for tests and benchmarks on machines without APFS: each
+    subdirectory of ``tm_volume`` named like a Time Machine or CCC snapshot
+    plays that snapshot, already "mounted" in place.  ``mount_seconds``
+    imitates the latency of ``mount_apfs``.
+    """
+
+    def __init__(self, tm_volume: Path, mount_seconds: float = 0.0):
+        super().__init__(tm_volume)
+        self.mount_seconds = mount_seconds
 
-def discover_tm_layout(tm_volume: Path, volume_name: str) -> dict:
+    def list_snapshots(self) -> list[dict]:
+        snapshots = []
+        try:
+            names = sorted(p.name for p in self.tm_volume.iterdir() if p.is_dir())
+        except OSError:
+            return []
+        for name in names:
+            date, source = _snapshot_name_date(name)
+            snapshots.append({"uuid": "", "name": name, "date": date, "source": source})
+        return snapshots
+
+    @contextmanager
+    def mount(self, snapshot_name: str):
+        mountpoint = self.tm_volume / snapshot_name
+        if not mountpoint.is_dir():
+            raise OSError(f"snapshot directory not found: {mountpoint}")
+        if self.mount_seconds:
+            time.sleep(self.mount_seconds)
+        yield mountpoint
+
+
+def snapshot_mounter(tm_volume: Path, snapshot_dirs: bool = False, mount_seconds: float = 0.0):
+    """Return the mounter for ``tm_volume``: real APFS, or snapshot directories with ``--snapshot-dirs``."""
+    if snapshot_dirs:
+        return DirectorySnapshotMounter(tm_volume, mount_seconds)
+    return ApfsSnapshotMounter(tm_volume)
+
+
+def discover_tm_layout(tm_volume: Path, volume_name: str, mounter=None) -> dict:
     """
     Inspect a mounted Time Machine volume and return a dict describing its
     layout.  Handles three cases:
@@ -192,6 +262,9 @@ def discover_tm_layout(tm_volume: Path, volume_name: str) -> dict:
       snapshots:      {host: [Path]}      (modern only)
       volume_roots:   [Path]              (modern only; one per host)
       raw_notes:      [str, …]
+
+    APFS snapshots are listed through ``mounter`` (default:
+    ``ApfsSnapshotMounter(tm_volume)``).
     """
     result = {
         "layout_type": "unknown",
@@ -203,7 +276,7 @@ def discover_tm_layout(tm_volume: Path, volume_name: str) -> dict:
     }
 
     # --- Try APFS snapshot layout first ---
-    apfs_snaps = _list_apfs_snapshots(tm_volume)
+    apfs_snaps = (mounter or ApfsSnapshotMounter(tm_volume)).list_snapshots()
     tm_snaps = [s for s in apfs_snaps if s["source"] == "timemachine"]
     ccc_snaps = [s for s in apfs_snaps if s["source"] == "ccc"]
     known_snaps = tm_snaps + ccc_snaps
@@ -364,58 +437,135 @@ def normalize_source_volume(source_volume: str | None) -> str | None:
     return str(Path("/Volumes") / path)
 
 
-def find_in_snapshots(rel_path: str, snapshots: list) -> list:
+def fold_name(name: str) -> str:
     """
-    Search ordered list of (snapshot_lh_root, date_str) tuples for a relative
-    path.  Returns a list of (backup_path, date_str) for every snapshot where
-    the file exists, newest-first.
+    Key for comparing path names the way HFS+/APFS do: Unicode-normalized
+    (Lightroom writes NFC, HFS+ stores NFD) and case-folded.
     """
-    found = []
-    for lh_root, date_str in snapshots:
-        actual = _resolve_case_insensitive(lh_root / rel_path)
-        if actual is not None:
-            found.append((actual, date_str))
-    return found
+    return unicodedata.normalize("NFC", name).casefold()
 
 
-def _resolve_case_insensitive(candidate: Path) -> Path | None:
+def build_path_trie(rel_paths) -> dict:
     """
-    Return the actual on-disk path for ``candidate``, matching
-    case-insensitively at every path component that doesn't exist verbatim.
-
-    Returns the resolved Path if a matching file is found, or None.
+    Build a prefix trie of relative paths keyed by ``fold_name`` of each
+    component.
+
+    Each node is ``{"name": spelling, "children": {folded: node}, "paths":
+    [rel_path, ...]}``, where ``paths`` lists the wanted rel_paths ending at
+    that node and ``name`` is the first spelling seen for the component (an
+    entry with exactly that name is preferred over other case or Unicode
+    normalization variants).
     """
-    if candidate.is_file():
-        return candidate
-
-    # Walk from the filesystem root toward the candidate, resolving each
-    # component case-insensitively when the exact name is absent.
-    parts = candidate.parts  # e.g. ('/', 'tmp', 'snap', 'RawPhotos', 'foo.JPG')
-    resolved = Path(parts[0])
-    for part in parts[1:]:
-        exact = resolved / part
-        if exact.exists():
-            resolved = exact
-        else:
-            # Try case-insensitive match among the directory's children.
+    root = {"name": "", "children": {}, "paths": []}
+    for rel in rel_paths:
+        node = root
+        for part in Path(rel).parts:
+            folded = fold_name(part)
+            child = node["children"].get(folded)
+            if child is None:
+                child = node["children"][folded] = {"name": part, "children": {}, "paths": []}
+            node = child
+        node["paths"].append(rel)
+    return root
+
+
+def resolve_path_trie(
+    root: Path,
+    trie: dict,
+    share_directories: bool = False,
+    stats: dict | None = None,
+) -> dict:
+    """
+    Resolve every rel_path in ``trie`` under ``root`` in one walk.
+
+    Only directories on the way to a wanted path are listed, each exactly
+    once however many wanted paths pass through it; each component matches
+    its exact spelling first, then by ``fold_name`` (ignoring case and
+    NFC/NFD differences).  Returns
+    ``{rel_path: actual on-disk Path}`` for the rel_paths that resolve to a
+    regular file.
+
+    With ``share_directories``, the answer below each directory is kept in
+    the trie under the directory's ``(st_dev, st_ino)``, and a later walk
+    (of another snapshot) reaching the same directory reuses it without
+    listing anything.  Classic Time Machine backups hard-link unchanged
+    directories between snapshots, so they share one inode.  ``stats`` (if
+    given) counts ``dirs_listed`` and ``dirs_reused``.
+    """
+    if stats is not None:
+        stats.setdefault("dirs_listed", 0)
+        stats.setdefault("dirs_reused", 0)
+
+    def _identity(stat_result):
+        return (stat_result.st_dev, stat_result.st_ino) if share_directories else None
+
+    def _walk(directory, node, identity):
+        """Return ``[(rel_path, path below directory)]`` for ``node``'s wanted paths."""
+        if identity is not None and identity in node.get("shared", {}):
+            if stats is not None:
+                stats["dirs_reused"] += 1
+            return node["shared"][identity]
+        results = []
+        try:
+            with os.scandir(directory) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            entries = {}
+        if stats is not None:
+            stats["dirs_listed"] += 1
+        folded = {}
+        for name, entry in entries.items():
+            folded.setdefault(fold_name(name), entry)
+        for key, child in node["children"].items():
+            entry = entries.get(child["name"]) or folded.get(key)
+            if entry is None:
+                continue
             try:
-                children = list(resolved.iterdir())
+                if child["paths"] and entry.is_file():
+                    results.extend((rel, entry.name) for rel in child["paths"])
+                if child["children"] and entry.is_dir():
+                    below = _walk(directory / entry.name, child, _identity(entry.stat()))
+                    results.extend((rel, f"{entry.name}/{suffix}") for rel, suffix in below)
             except OSError:
-                return None
-            part_lower = part.lower()
-            match = next(
-                (c for c in children if c.name.lower() == part_lower), None
-            )
-            if match is None:
-                return None
-            resolved = match
+                continue
+        if identity is not None:
+            node.setdefault("shared", {})[identity] = results
+        return results
+
+    try:
+        identity = _identity(os.stat(root))
+    except OSError:
+        return {}
+    return {rel: root / suffix for rel, suffix in _walk(root, trie, identity)}
+
+
+def find_all_in_snapshots(rel_paths, snapshots: list, stats: dict | None = None) -> dict:
+    """
+    Search ordered list of (snapshot_lh_root, date_str) tuples for many
+    relative paths at once.  Returns a dict mapping each rel_path to a list
+    of (backup_path, date_str) for every snapshot where the file exists,
+    newest-first.
 
-    return resolved if resolved.is_file() else None
+    The snapshots are classic Backups.backupdb directories, so directories
+    hard-linked between snapshots are answered once (``share_directories``).
+    """
+    trie = build_path_trie(rel_paths)
+    found = {rel: [] for rel in rel_paths}
+    for lh_root, date_str in snapshots:
+        for rel, actual in resolve_path_trie(
+            lh_root, trie, share_directories=True, stats=stats
+        ).items():
+            found[rel].append((actual, date_str))
+    return found
 
 
-def _snapshot_contains_path(lh_root: Path, rel_path: str) -> bool:
-    candidate = lh_root / rel_path
-    return _resolve_case_insensitive(candidate) is not None
+def find_in_snapshots(rel_path: str, snapshots: list) -> list:
+    """
+    Search ordered list of (snapshot_lh_root, date_str) tuples for a relative
+    path.  Returns a list of (backup_path, date_str) for every snapshot where
+    the file exists, newest-first.
+    """
+    return find_all_in_snapshots([rel_path], snapshots)[rel_path]
 
 
 def _snapshot_month_key(date_str: str) -> str | None:
@@ -453,6 +603,69 @@ def build_month_anchor_indices(snapshots: list) -> list[int]:
     return [month_to_index[key] for key in month_order]
 
 
+def find_all_in_snapshots_anchored(
+    rel_paths,
+    snapshots: list,
+    month_anchor_indices: list[int],
+    month_interval: int = 1,
+    stats: dict | None = None,
+) -> dict:
+    """
+    Two-phase snapshot search for many relative paths at once:
+      1) Probe month anchors at the configured month interval, resolving
+         every path not yet found in one walk per anchor snapshot.
+      2) Scan forward in time (toward newer snapshots) from each path's
+         anchor to pick the newest available match and keep all matches in
+         that forward window.
+    Returns a dict mapping each rel_path to its (backup_path, date_str)
+    matches, newest-first.
+
+    As with one search per path, a path is only looked up on the anchors
+    until it is found and then in the snapshots from the newest to its own
+    anchor.  Each walk uses one trie of the paths still wanted there (rebuilt
+    only when that set changes), so directories hard-linked between
+    snapshots are answered once (``share_directories``).
+    """
+    if month_interval < 1:
+        raise ValueError("month_interval must be >= 1")
+    found = {rel: [] for rel in rel_paths}
+    if not snapshots:
+        return found
+
+    anchor_of = {}
+    probed = {}  # anchor idx -> its walk; it holds exactly the paths anchored there
+    trie = None
+    for idx in month_anchor_indices[::month_interval]:
+        if len(anchor_of) == len(found):
+            break
+        if trie is None:
+            trie = build_path_trie([rel for rel in found if rel not in anchor_of])
+        lh_root, _ = snapshots[idx]
+        probed[idx] = resolve_path_trie(lh_root, trie, share_directories=True, stats=stats)
+        for rel in probed[idx]:
+            anchor_of[rel] = idx
+            trie = None  # found paths leave the trie
+
+    # Snapshot idx is searched for the paths anchored at idx or older; the
+    # set only shrinks just past an anchor.  A probed anchor's walk already
+    # answers it (the paths anchored older were absent there).
+    anchors = set(anchor_of.values())
+    trie = None
+    for idx in range(max(anchors, default=-1) + 1):
+        lh_root, date_str = snapshots[idx]
+        if idx in probed:
+            resolved = probed[idx]
+        else:
+            if trie is None:
+                trie = build_path_trie([rel for rel in found if anchor_of.get(rel, -1) >= idx])
+            resolved = resolve_path_trie(lh_root, trie, share_directories=True, stats=stats)
+        for rel, actual in resolved.items():
+            found[rel].append((actual, date_str))
+        if idx in anchors:
+            trie = None  # the paths anchored here are done
+    return found
+
+
 def find_in_snapshots_anchored(
     rel_path: str,
     snapshots: list,
@@ -465,30 +678,151 @@ def find_in_snapshots_anchored(
       2) Once found, scan forward in time (toward newer snapshots) to pick the
          newest available match and keep all matches in that forward window.
     """
-    if month_interval < 1:
-        raise ValueError("month_interval must be >= 1")
-    if not snapshots:
-        return []
+    return find_all_in_snapshots_anchored(
+        [rel_path], snapshots, month_anchor_indices, month_interval
+    )[rel_path]
 
-    anchor_probe_indices = month_anchor_indices[::month_interval]
-    found_anchor_idx = None
 
-    for idx in anchor_probe_indices:
-        lh_root, _ = snapshots[idx]
-        if _snapshot_contains_path(lh_root, rel_path):
-            found_anchor_idx = idx
+def _bisection_order(indices: list[int]) -> list[int]:
+    """
+    Return ``indices`` (newest-first) in bisection order: the newest first,
+    then the middle of the rest, then the middles of each half, and so on,
+    so early probes are spread evenly over the whole history.
+    """
+    if not indices:
+        return []
+    order = [indices[0]]
+    intervals = deque([(1, len(indices) - 1)])
+    while intervals:
+        lo, hi = intervals.popleft()
+        if lo > hi:
+            continue
+        mid = (lo + hi) // 2
+        order.append(indices[mid])
+        intervals.append((lo, mid - 1))
+        intervals.append((mid + 1, hi))
+    return order
+
+
+def bisect_newest_snapshots(
+    rel_paths,
+    grid_indices: list[int],
+    probe,
+    batch: int = 1,
+    stats: dict | None = None,
+) -> dict:
+    """
+    Find the newest snapshot containing each path, assuming a file is present
+    in one contiguous run of snapshots (from import until deletion).
+
+    Snapshot indices are newest-first (0 = newest).  A path first probes
+    ``grid_indices`` in bisection order until one contains it; the newest
+    snapshot holding it is then bisected between that hit and the nearest
+    newer snapshot known not to hold it, in O(log n) probes.
+
+    Probes are batched across paths: each round takes the ``batch``
+    snapshots wanted by the most paths and calls ``probe(indices,
+    rel_paths)`` once, with every pending path those snapshots tell
+    something about.  ``probe`` returns ``{index: {rel_path: match}}`` for
+    the paths present in each snapshot.  ``stats`` (if given) receives the
+    number of rounds and of snapshots probed.
+
+    Returns ``{rel_path: (index, match)}`` for the paths found.
+    """
+    order = _bisection_order(grid_indices)
+    hit = {}  # rel -> (newest index known to contain it, match)
+    lo = {}  # rel -> newest-side bound known not to contain it (after a hit)
+    absent = {rel: set() for rel in rel_paths}
+    cursor = dict.fromkeys(rel_paths, 0)
+    pending = set(rel_paths)
+    rounds = probed = 0
+
+    def wanted(rel):
+        if rel in hit:
+            if hit[rel][0] - lo[rel] <= 1:
+                return None
+            return (lo[rel] + hit[rel][0]) // 2
+        while cursor[rel] < len(order) and order[cursor[rel]] in absent[rel]:
+            cursor[rel] += 1
+        return order[cursor[rel]] if cursor[rel] < len(order) else None
+
+    def informative(rel, idx):
+        if rel in hit:
+            return lo[rel] < idx < hit[rel][0]
+        return idx not in absent[rel]
+
+    while pending:
+        want = {}
+        for rel in list(pending):
+            idx = wanted(rel)
+            if idx is None:
+                pending.discard(rel)
+            else:
+                want[rel] = idx
+        if not want:
             break
+        chosen = sorted(idx for idx, _ in Counter(want.values()).most_common(batch))
+        rels = [rel for rel in want if any(informative(rel, idx) for idx in chosen)]
+        found = probe(chosen, rels)
+        rounds += 1
+        probed += len(chosen)
+        for idx in chosen:
+            present = found.get(idx, {})
+            for rel in rels:
+                if not informative(rel, idx):
+                    continue
+                if rel not in present:
+                    if rel in hit:
+                        lo[rel] = idx
+                    else:
+                        absent[rel].add(idx)
+                    continue
+                if rel not in hit:
+                    lo[rel] = max((i for i in absent[rel] if i < idx), default=-1)
+                hit[rel] = (idx, present[rel])
 
-    if found_anchor_idx is None:
-        return []
+    if stats is not None:
+        stats["rounds"] = rounds
+        stats["snapshots_probed"] = probed
+    return hit
 
-    found = []
-    for idx in range(0, found_anchor_idx + 1):
-        lh_root, date_str = snapshots[idx]
-        actual = _resolve_case_insensitive(lh_root / rel_path)
-        if actual is not None:
-            found.append((actual, date_str))
-    return found
+
+def find_all_in_snapshots_bisect(
+    rel_paths,
+    snapshots: list,
+    month_anchor_indices: list[int],
+    month_interval: int = 1,
+    stats: dict | None = None,
+) -> dict:
+    """
+    ``bisect_newest_snapshots`` over ordered (snapshot_lh_root, date_str)
+    tuples, discovering each path on the month anchors at the configured
+    interval.  Returns a dict mapping each rel_path to ``[(backup_path,
+    date_str)]`` for the newest snapshot containing it, or ``[]``.  Each
+    probe walks one trie of just the paths it tells something about, shared
+    by the snapshots of that round so hard-linked directories are answered
+    once.
+    """
+    if month_interval < 1:
+        raise ValueError("month_interval must be >= 1")
+
+    position = {rel: i for i, rel in enumerate(rel_paths)}
+
+    def probe(indices, rels):
+        trie = build_path_trie(sorted(rels, key=position.get))
+        return {
+            idx: {
+                rel: (actual, snapshots[idx][1])
+                for rel, actual in resolve_path_trie(
+                    snapshots[idx][0], trie, share_directories=True, stats=stats
+                ).items()
+            }
+            for idx in indices
+        }
+
+    grid = month_anchor_indices[::month_interval]
+    newest = bisect_newest_snapshots(rel_paths, grid, probe, stats=stats)
+    return {rel: [newest[rel][1]] if rel in newest else [] for rel in rel_paths}
 
 
 def file_stat(path: Path) -> dict:
@@ -534,6 +868,194 @@ def is_apfs_backup_path(backup_path: str) -> bool:
     return backup_path.startswith(APFS_SNAP_PREFIX)
 
 
+# ---------------------------------------------------------------------------
+# Per-snapshot file manifests (answer later scans without mounting)
+# ---------------------------------------------------------------------------
+
+class SnapshotManifests:
+    """
+    Persistent SQLite store of what each APFS snapshot holds under the source
+    volume root: every regular file's relative path, size, mtime and inode.
+
+    Snapshots never change once taken, so a manifest, recorded the first time
+    a snapshot is mounted, answers every later lookup in that snapshot with
+    no mounting at all.  Manifests are keyed by ``(snapshot name, source
+    volume name)``; a snapshot without the source volume is recorded too
+    (with no root) so it is not mounted again.  Paths are matched
+    case-insensitively and regardless of Unicode normalization, like the
+    snapshot walk (see ``fold_name``).
+    """
+
+    LOOKUP_BATCH = 500  # rel_paths per SELECT
+    SCHEMA_VERSION = 1  # 1: ``folded`` is fold_name(rel_path) (was rel_path.casefold())
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS snapshots (
+                   id INTEGER PRIMARY KEY,
+                   name TEXT NOT NULL,
+                   volume_name TEXT NOT NULL,
+                   root TEXT,
+                   files INTEGER NOT NULL,
+                   built_at TEXT NOT NULL,
+                   UNIQUE (name, volume_name)
+               )"""
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                   snapshot_id INTEGER NOT NULL,
+                   folded TEXT NOT NULL,
+                   rel_path TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   mtime REAL NOT NULL,
+                   inode INTEGER NOT NULL,
+                   PRIMARY KEY (snapshot_id, folded)
+               ) WITHOUT ROWID"""
+        )
+        (version,) = self.conn.execute("PRAGMA user_version").fetchone()
+        if version < self.SCHEMA_VERSION:
+            # Manifests recorded before keys were NFC-normalized: re-key them in place.
+            self.conn.create_function("fold_name", 1, fold_name, deterministic=True)
+            self.conn.execute("UPDATE OR IGNORE files SET folded = fold_name(rel_path)")
+            self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.used = 0  # snapshots answered from a manifest
+        self.built = 0  # manifests recorded this run
+        self.incomplete = 0  # snapshots walked with read errors (not recorded)
+
+    def get(self, name: str, volume_name: str):
+        """Return the snapshot id of a recorded manifest (counted as used), or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id FROM snapshots WHERE name = ? AND volume_name = ?",
+                (name, volume_name),
+            ).fetchone()
+            if row:
+                self.used += 1
+        return row[0] if row else None
+
+    def store(self, name: str, volume_name: str, root: str | None, files) -> int:
+        """
+        Record (or replace) the manifest of one snapshot.  ``files`` is a list
+        of ``(rel_path, size, mtime, inode)``; ``root`` is the source volume
+        root relative to the mountpoint, or None if the snapshot lacks it.
+        Returns the snapshot id.
+        """
+        built_at = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM files WHERE snapshot_id IN "
+                "(SELECT id FROM snapshots WHERE name = ? AND volume_name = ?)",
+                (name, volume_name),
+            )
+            self.conn.execute(
+                "DELETE FROM snapshots WHERE name = ? AND volume_name = ?",
+                (name, volume_name),
+            )
+            snapshot_id = self.conn.execute(
+                "INSERT INTO snapshots (name, volume_name, root, files, built_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, volume_name, root, len(files), built_at),
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO files "
+                "(snapshot_id, folded, rel_path, size, mtime, inode) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (snapshot_id, fold_name(rel), rel, size, mtime, inode)
+                    for rel, size, mtime, inode in files
+                ),
+            )
+            self.built += 1
+        return snapshot_id
+
+    def record_incomplete(self, name: str, errors: list) -> None:
+        """Report a snapshot whose walk hit read errors; its manifest is not stored."""
+        with self.lock:
+            self.incomplete += 1
+        print(
+            f"  WARNING: manifest for {name} not recorded: {len(errors)} path(s) could not "
+            f"be read (first: {errors[0]}); it will be walked again next time.",
+            file=sys.stderr,
+        )
+
+    def lookup(self, snapshot_id: int, rel_paths) -> dict:
+        """Return ``{rel_path: (actual rel_path, size, mtime)}`` for the rel_paths in the manifest."""
+        by_folded = {}
+        for rel in rel_paths:
+            by_folded.setdefault(fold_name(rel), []).append(rel)
+        folded = list(by_folded)
+        found = {}
+        with self.lock:
+            for start in range(0, len(folded), self.LOOKUP_BATCH):
+                chunk = folded[start:start + self.LOOKUP_BATCH]
+                rows = self.conn.execute(
+                    "SELECT folded, rel_path, size, mtime FROM files WHERE snapshot_id = ? "
+                    f"AND folded IN ({', '.join('?' * len(chunk))})",
+                    (snapshot_id, *chunk),
+                ).fetchall()
+                for key, rel_path, size, mtime in rows:
+                    for rel in by_folded[key]:
+                        found[rel] = (rel_path, size, mtime)
+        return found
+
+    def snapshots(self) -> list:
+        """Return ``[(name, volume_name, root, files, built_at)]`` for every manifest."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT name, volume_name, root, files, built_at FROM snapshots ORDER BY name"
+            ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def walk_snapshot_files(root: Path) -> tuple[list, list]:
+    """
+    Return ``(files, errors)``: ``[(rel_path, size, mtime, inode)]`` for every
+    regular file under ``root`` (symlinks are not followed), for
+    ``SnapshotManifests.store``, and a message for every directory or file
+    that could not be read.  A walk with errors is incomplete.
+    """
+    files = []
+    errors = []
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(root / rel_dir) as it:
+                entries = list(it)
+        except OSError as exc:
+            errors.append(f"{root / rel_dir}: {exc.strerror or exc}")
+            continue
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    files.append((rel, st.st_size, st.st_mtime, st.st_ino))
+            except OSError as exc:
+                errors.append(f"{root / rel}: {exc.strerror or exc}")
+    return files, errors
+
+
+def _listing_errors(directory: Path) -> list:
+    """Return ``[message]`` if ``directory`` cannot be listed, else ``[]``."""
+    try:
+        with os.scandir(directory) as it:
+            next(it, None)
+    except OSError as exc:
+        return [f"{directory}: {exc.strerror or exc}"]
+    return []
+
+
 # ---------------------------------------------------------------------------
 # APFS-specific snapshot scanning (mount each snapshot once, check all files)
 # ---------------------------------------------------------------------------
@@ -624,73 +1146,207 @@ def scan_apfs_snapshots(
     *,
     progress_callback=None,
     debug: bool = False,
+    mounter=None,
+    mount_workers: int = 1,
+    manifests=None,
 ) -> dict:
     """
-    For APFS Time Machine volumes, mount each snapshot once, check every
-    ``rel_path`` in the mounted source-volume directory, then unmount.
+    For APFS Time Machine volumes, mount each snapshot once, resolve every
+    ``rel_path`` in the mounted source-volume directory in a single walk of
+    the directories they share (see ``resolve_path_trie``), then unmount.
 
     ``snapshots`` is a list of ``(snap_name, date_str)`` tuples, newest-first
-    (as returned by ``all_volume_snapshots`` for the APFS layout).
+    (as returned by ``all_volume_snapshots`` for the APFS layout).  Snapshots
+    are mounted through ``mounter`` (default: ``ApfsSnapshotMounter``), with up
+    to ``mount_workers`` of them mounted and scanned at once.  On an error or
+    Ctrl-C no further snapshots are mounted and every mounted one is
+    unmounted before the exception propagates.
+
+    With ``manifests`` (a ``SnapshotManifests``), a snapshot whose manifest
+    is recorded is answered from it without mounting; any other snapshot is
+    walked in full once mounted and its manifest recorded.
 
     Returns a dict mapping ``rel_path`` → list of
     ``(apfs_backup_path_str, date_str, file_size, mtime)`` tuples, newest-first.
     """
+    mounter = mounter or ApfsSnapshotMounter(tm_volume)
     results = {r: [] for r in rel_paths}
+    trie = build_path_trie(rel_paths)
+    debug_lock = threading.Lock()
     _debug_done = False  # only dump tree once
+    stop = threading.Event()
+
+    def _from_manifest(snapshot_id, snap_name, date_str):
+        return [
+            (rel, (
+                _apfs_backup_path(tm_volume, snap_name, actual_rel),
+                date_str,
+                size,
+                datetime.fromtimestamp(mtime).strftime("%Y-%m-%dT%H:%M:%S"),
+            ))
+            for rel, (actual_rel, size, mtime) in manifests.lookup(snapshot_id, rel_paths).items()
+        ]
 
-    for i, (snap_name, date_str) in enumerate(snapshots, 1):
+    def _scan_snapshot(i, snap_name, date_str):
+        """Mount one snapshot; return ``[(rel_path, result tuple)]`` found in it."""
+        nonlocal _debug_done
+        found = []
+        if stop.is_set():
+            return found
+        if manifests is not None:
+            snapshot_id = manifests.get(snap_name, volume_name)
+            if snapshot_id is not None:
+                return _from_manifest(snapshot_id, snap_name, date_str)
         if progress_callback:
             progress_callback(i, len(snapshots), snap_name)
 
         try:
-            with _mount_apfs_snapshot(snap_name, tm_volume) as mountpoint:
+            with mounter.mount(snap_name) as mountpoint:
                 lh_root = _find_source_volume_in_snapshot(mountpoint, volume_name)
 
-                if debug and not _debug_done:
-                    _debug_done = True
-                    _debug_snapshot_tree(mountpoint, depth=3)
-                    print(
-                        f"\n  DEBUG: source volume root found at: {lh_root}",
-                        file=sys.stderr,
-                    )
-                    if lh_root is not None:
-                        for rel in rel_paths:
+                with debug_lock:
+                    if debug and not _debug_done:
+                        _debug_done = True
+                        _debug_snapshot_tree(mountpoint, depth=3)
+                        print(
+                            f"\n  DEBUG: source volume root found at: {lh_root}",
+                            file=sys.stderr,
+                        )
+                        if lh_root is not None:
+                            for rel in rel_paths:
+                                print(
+                                    f"  DEBUG: searching for: {lh_root / rel}",
+                                    file=sys.stderr,
+                                )
+                        else:
                             print(
-                                f"  DEBUG: searching for: {lh_root / rel}",
+                                f"  DEBUG: '{volume_name}' not found in snapshot — skipping search.",
                                 file=sys.stderr,
                             )
+                        print("", file=sys.stderr)
+
+                if stop.is_set():
+                    return found
+                if manifests is not None:
+                    if lh_root is not None:
+                        files, errors = walk_snapshot_files(lh_root)
                     else:
-                        print(
-                            f"  DEBUG: '{volume_name}' not found in snapshot — skipping search.",
-                            file=sys.stderr,
+                        files, errors = [], _listing_errors(mountpoint)
+                    if not errors:
+                        snapshot_id = manifests.store(
+                            snap_name,
+                            volume_name,
+                            str(lh_root.relative_to(mountpoint)) if lh_root is not None else None,
+                            files,
                         )
-                    print("", file=sys.stderr)
-
+                        return _from_manifest(snapshot_id, snap_name, date_str)
+                    # An incomplete walk must not become the snapshot's permanent
+                    # manifest; search it directly this time and walk it again next run.
+                    manifests.record_incomplete(snap_name, errors)
                 if lh_root is None:
-                    continue
-
-                for rel in rel_paths:
-                    candidate = lh_root / rel
-                    actual = _resolve_case_insensitive(candidate)
-                    if actual is not None:
-                        # Use the actual on-disk relative path (may differ in case).
-                        actual_rel = str(actual.relative_to(lh_root))
-                        stat = file_stat(actual)
-                        results[rel].append((
-                            _apfs_backup_path(tm_volume, snap_name, actual_rel),
-                            date_str,
-                            stat["file_size"],
-                            stat["mtime"],
-                        ))
+                    return found
+
+                for rel, actual in resolve_path_trie(lh_root, trie).items():
+                    # Use the actual on-disk relative path (may differ in case).
+                    actual_rel = str(actual.relative_to(lh_root))
+                    stat = file_stat(actual)
+                    found.append((rel, (
+                        _apfs_backup_path(tm_volume, snap_name, actual_rel),
+                        date_str,
+                        stat["file_size"],
+                        stat["mtime"],
+                    )))
         except OSError as exc:
             print(
                 f"  WARNING: skipping snapshot {snap_name}: {exc}",
                 file=sys.stderr,
             )
+        return found
 
+    per_snapshot = [[] for _ in snapshots]
+    if mount_workers <= 1:
+        for i, (snap_name, date_str) in enumerate(snapshots, 1):
+            per_snapshot[i - 1] = _scan_snapshot(i, snap_name, date_str)
+    else:
+        executor = ThreadPoolExecutor(max_workers=mount_workers)
+        try:
+            futures = {
+                executor.submit(_scan_snapshot, i, snap_name, date_str): i - 1
+                for i, (snap_name, date_str) in enumerate(snapshots, 1)
+            }
+            for future in as_completed(futures):
+                per_snapshot[futures[future]] = future.result()
+        except BaseException:
+            stop.set()
+            print(
+                "\n  Stopping: waiting for mounted snapshots to be unmounted...",
+                file=sys.stderr,
+            )
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    # Merge in snapshot order so every path's matches stay newest-first.
+    for found in per_snapshot:
+        for rel, match in found:
+            results[rel].append(match)
     return results
 
 
+def scan_apfs_snapshots_bisect(
+    rel_paths: list[str],
+    snapshots: list,
+    tm_volume: Path,
+    volume_name: str,
+    grid_indices: list[int],
+    *,
+    debug: bool = False,
+    mounter=None,
+    mount_workers: int = 1,
+    manifests=None,
+    stats: dict | None = None,
+) -> dict:
+    """
+    ``bisect_newest_snapshots`` over APFS snapshots: each round mounts the
+    ``mount_workers`` snapshots wanted by the most paths (through
+    ``scan_apfs_snapshots``) and answers every pending path they are
+    informative for.  Returns the same dict as ``scan_apfs_snapshots``, with
+    at most one (the newest) match per path.
+    """
+    rounds = 0
+
+    def probe(indices, rels):
+        nonlocal rounds
+        rounds += 1
+        print(
+            f"  Bisect round {rounds}: mounting {len(indices)} snapshot(s) "
+            f"for {len(rels)} path(s)",
+            file=sys.stderr,
+        )
+        index_of = {snapshots[idx][0]: idx for idx in indices}
+        found = scan_apfs_snapshots(
+            rels,
+            [snapshots[idx] for idx in indices],
+            tm_volume,
+            volume_name,
+            debug=debug and rounds == 1,
+            mounter=mounter,
+            mount_workers=mount_workers,
+            manifests=manifests,
+        )
+        by_index = {idx: {} for idx in indices}
+        for rel, matches in found.items():
+            for match in matches:
+                _, snap_name, _ = _parse_apfs_backup_path(match[0])
+                by_index[index_of[snap_name]][rel] = match
+        return by_index
+
+    newest = bisect_newest_snapshots(
+        rel_paths, grid_indices, probe, batch=mount_workers, stats=stats
+    )
+    return {rel: [newest[rel][1]] if rel in newest else [] for rel in rel_paths}
+
+
 # ---------------------------------------------------------------------------
 # inspect command
 # ---------------------------------------------------------------------------
@@ -706,7 +1362,13 @@ def cmd_inspect(args):
 
     print(f"\n=== Inspecting Time Machine volume: {tm_volume} ===\n")
 
-    layout = discover_tm_layout(tm_volume, volume_name or "")
+    if args.build_manifests and not volume_name:
+        print("ERROR: --build-manifests requires --source-volume", file=sys.stderr)
+        sys.exit(1)
+
+    layout = discover_tm_layout(
+        tm_volume, volume_name or "", snapshot_mounter(tm_volume, args.snapshot_dirs)
+    )
 
     print(f"Layout type : {layout['layout_type']}")
 
@@ -741,6 +1403,8 @@ def cmd_inspect(args):
             "\nNote: APFS snapshots must be individually mounted to access their content."
             "\nThe 'scan' command will mount each snapshot automatically (requires root)."
         )
+        if args.build_manifests:
+            _build_manifests(args, tm_volume, layout, volume_name)
         return
 
     # modern / unknown layout
@@ -787,6 +1451,46 @@ def cmd_inspect(args):
         )
 
 
+def _build_manifests(args, tm_volume: Path, layout: dict, volume_name: str) -> None:
+    """Mount every APFS snapshot without a manifest yet and record its manifest."""
+    snapshots = all_volume_snapshots(layout, volume_name)
+    manifests = SnapshotManifests(args.manifests)
+    try:
+        todo = [
+            (name, date) for name, date in snapshots
+            if manifests.get(name, volume_name) is None
+        ]
+        print(
+            f"\nBuilding manifests for {len(todo)} of {len(snapshots)} snapshot(s) "
+            f"in {manifests.path}..."
+        )
+
+        def _progress(i, total, snap_name):
+            print(f"  Mounting snapshot {i}/{total}: {snap_name}", file=sys.stderr)
+
+        scan_apfs_snapshots(
+            [],
+            todo,
+            tm_volume,
+            volume_name,
+            progress_callback=_progress,
+            mounter=snapshot_mounter(tm_volume, args.snapshot_dirs),
+            mount_workers=args.mount_workers,
+            manifests=manifests,
+        )
+        recorded = [m for m in manifests.snapshots() if m[1] == volume_name]
+        missing_root = sum(1 for m in recorded if m[2] is None)
+        print(
+            f"  {manifests.built} built, {manifests.incomplete} not recorded (read errors); "
+            f"{len(recorded)} snapshot(s) now have manifests "
+            f"({sum(m[3] for m in recorded):,} files"
+            + (f"; {missing_root} without {volume_name}" if missing_root else "")
+            + ")."
+        )
+    finally:
+        manifests.close()
+
+
 # ---------------------------------------------------------------------------
 # scan command
 # ---------------------------------------------------------------------------
@@ -808,8 +1512,15 @@ def cmd_scan(args):
     missing = load_missing_photos(csv_path)
     print(f"  {len(missing)} records loaded.", file=sys.stderr)
 
+    if args.mount_workers < 1:
+        print("ERROR: --mount-workers must be >= 1", file=sys.stderr)
+        sys.exit(1)
+    mounter = snapshot_mounter(
+        tm_volume, args.snapshot_dirs, args.simulated_mount_seconds
+    )
+
     print(f"Discovering snapshot layout on {tm_volume}...", file=sys.stderr)
-    layout = discover_tm_layout(tm_volume, volume_name)
+    layout = discover_tm_layout(tm_volume, volume_name, mounter)
     is_apfs = layout["layout_type"] == "apfs"
     snapshots = all_volume_snapshots(layout, volume_name)
     print(f"  Layout type: {layout['layout_type']}", file=sys.stderr)
@@ -821,8 +1532,30 @@ def cmd_scan(args):
             file=sys.stderr,
         )
 
+    manifests = None
+    if args.manifests and is_apfs:
+        manifests = SnapshotManifests(args.manifests)
+        print(f"  Snapshot manifests: {args.manifests}", file=sys.stderr)
+    elif args.manifests:
+        print(
+            "  Note: --manifests only applies to APFS snapshots; ignored for this layout.",
+            file=sys.stderr,
+        )
+
     search_mode = args.search_mode
     month_interval = args.month_interval
+    scan_stats = {}
+    if search_mode == "bisect":
+        if month_interval < 1:
+            print("ERROR: --month-interval must be >= 1", file=sys.stderr)
+            sys.exit(1)
+        bisect_grid = build_month_anchor_indices(snapshots)[::month_interval]
+        print(
+            f"  Bisect mode: discovering each file on {len(bisect_grid)} monthly "
+            f"anchors (interval={month_interval}), then bisecting for the newest "
+            "snapshot that contains it.",
+            file=sys.stderr,
+        )
 
     if is_apfs:
         # For APFS, each snapshot must be individually mounted.  We scan all
@@ -846,6 +1579,8 @@ def cmd_scan(args):
                 f"anchor snapshots (interval={month_interval}).",
                 file=sys.stderr,
             )
+        elif search_mode == "bisect":
+            snapshots_to_scan = snapshots
         else:
             snapshots_to_scan = snapshots
             print(
@@ -865,11 +1600,18 @@ def cmd_scan(args):
                 f"{len(month_anchor_indices)} monthly anchors, interval={month_interval}.",
                 file=sys.stderr,
             )
-        else:
+        elif search_mode == "full":
             print("  Full mode: scanning all snapshots for each file.", file=sys.stderr)
 
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Bisect mode only locates the newest copy, so a single match says nothing
+    # about older snapshots.
+    single_match_note = (
+        "Newest snapshot containing the file (bisect search; older snapshots not listed)"
+        if search_mode == "bisect"
+        else ""
+    )
 
     counters = {
         "total": 0,
@@ -916,10 +1658,24 @@ def cmd_scan(args):
                     file=sys.stderr,
                 )
 
-        if unique_rels and snapshots_to_scan:
+        if unique_rels and snapshots_to_scan and search_mode == "bisect":
+            apfs_results = scan_apfs_snapshots_bisect(
+                unique_rels,
+                snapshots_to_scan,
+                tm_volume,
+                volume_name,
+                bisect_grid,
+                debug=args.debug,
+                mounter=mounter,
+                mount_workers=args.mount_workers,
+                manifests=manifests,
+                stats=scan_stats,
+            )
+        elif unique_rels and snapshots_to_scan:
             print(
                 f"  Scanning {len(unique_rels)} unique paths across "
-                f"{len(snapshots_to_scan)} snapshots...",
+                f"{len(snapshots_to_scan)} snapshots "
+                f"({args.mount_workers} mounted at a time)...",
                 file=sys.stderr,
             )
             apfs_results = scan_apfs_snapshots(
@@ -929,6 +1685,9 @@ def cmd_scan(args):
                 volume_name,
                 progress_callback=_progress,
                 debug=args.debug,
+                mounter=mounter,
+                mount_workers=args.mount_workers,
+                manifests=manifests,
             )
         else:
             apfs_results = {r: [] for r in unique_rels}
@@ -986,7 +1745,7 @@ def cmd_scan(args):
                         if len(matches) == 1:
                             counters["found"] += 1
                             status = STATUS_FOUND
-                            notes = ""
+                            notes = single_match_note
                         else:
                             counters["multiple"] += 1
                             status = STATUS_MULTIPLE
@@ -1006,12 +1765,46 @@ def cmd_scan(args):
                         )
 
         print(f"\nReport written to {output_path}\n")
-        _print_summary(counters, source_volume)
+        _print_summary(counters, source_volume, scan_stats, manifests)
+        if manifests is not None:
+            manifests.close()
         return
 
     # -----------------------------------------------------------------------
-    # Classic (modern/HFS+) path: per-file search across pre-mounted snapshots.
+    # Classic (modern/HFS+) path: snapshots are already mounted; resolve all
+    # missing paths together, one walk of the shared directories per snapshot.
     # -----------------------------------------------------------------------
+    rels_by_row = {}  # row number -> rel_path, for rows that need searching
+    for i, row in enumerate(missing, 1):
+        expected_path = row.get("Photo", "").strip()
+        rel = relative_volume_path(expected_path, source_volume)
+        if rel is not None and not Path(expected_path).exists():
+            rels_by_row[i] = rel
+    unique_rels = list(dict.fromkeys(rels_by_row.values()))
+    print(
+        f"  Searching {len(unique_rels)} unique paths across "
+        f"{len(snapshots_to_scan)} snapshots...",
+        file=sys.stderr,
+    )
+    if search_mode == "anchored":
+        classic_results = find_all_in_snapshots_anchored(
+            unique_rels,
+            snapshots_to_scan,
+            month_anchor_indices=month_anchor_indices,
+            month_interval=month_interval,
+            stats=scan_stats,
+        )
+    elif search_mode == "bisect":
+        classic_results = find_all_in_snapshots_bisect(
+            unique_rels,
+            snapshots_to_scan,
+            month_anchor_indices=build_month_anchor_indices(snapshots_to_scan),
+            month_interval=month_interval,
+            stats=scan_stats,
+        )
+    else:
+        classic_results = find_all_in_snapshots(unique_rels, snapshots_to_scan, stats=scan_stats)
+
     with open(output_path, "w", newline="", encoding="utf-8") as out_fh:
         writer = csv.DictWriter(out_fh, fieldnames=REPORT_COLUMNS)
         writer.writeheader()
@@ -1043,8 +1836,8 @@ def cmd_scan(args):
 
             counters["source_volume"] += 1
 
-            # Check whether the file is already present on the source volume.
-            if Path(expected_path).exists():
+            # Files already present on the source volume were not searched.
+            if i not in rels_by_row:
                 counters["present"] += 1
                 writer.writerow(
                     {
@@ -1060,17 +1853,7 @@ def cmd_scan(args):
                 )
                 continue
 
-            # Search Time Machine snapshots.
-            if search_mode == "anchored":
-                matches = find_in_snapshots_anchored(
-                    rel,
-                    snapshots_to_scan,
-                    month_anchor_indices=month_anchor_indices,
-                    month_interval=month_interval,
-                )
-            else:
-                matches = find_in_snapshots(rel, snapshots_to_scan)
-
+            matches = classic_results[rel]
             if not matches:
                 counters["not_found"] += 1
                 writer.writerow(
@@ -1094,7 +1877,7 @@ def cmd_scan(args):
             if len(matches) == 1:
                 counters["found"] += 1
                 status = STATUS_FOUND
-                notes = ""
+                notes = single_match_note
             else:
                 counters["multiple"] += 1
                 status = STATUS_MULTIPLE
@@ -1115,10 +1898,10 @@ def cmd_scan(args):
             )
 
     print(f"\nReport written to {output_path}\n")
-    _print_summary(counters, source_volume)
+    _print_summary(counters, source_volume, scan_stats)
 
 
-def _print_summary(counters, source_volume):
+def _print_summary(counters, source_volume, stats=None, manifests=None):
     recoverable = counters["found"] + counters["multiple"]
     print(f"Missing Lightroom records examined : {counters['total']:>7,}")
     print(f"Source-volume records ({source_volume}): {counters['source_volume']:>7,}")
@@ -1128,6 +1911,22 @@ def _print_summary(counters, source_volume):
     print(f"  Not found in Time Machine        : {counters['not_found']:>7,}")
     print(f"Other/non-source-volume records    : {counters['other']:>7,}")
     print(f"Total recoverable from TM          : {recoverable:>7,}")
+    stats = stats or {}
+    if "rounds" in stats:
+        print(
+            f"Bisect snapshot probes             : {stats['snapshots_probed']:>7,}"
+            f"  ({stats['rounds']:,} rounds)"
+        )
+    if "dirs_listed" in stats:
+        print(
+            f"Snapshot directories listed        : {stats['dirs_listed']:>7,}"
+            f"  ({stats['dirs_reused']:,} answered from a shared inode)"
+        )
+    if manifests is not None:
+        print(f"Snapshots answered from manifests  : {manifests.used:>7,}")
+        print(f"Snapshot manifests built (mounted) : {manifests.built:>7,}  ({manifests.path})")
+        if manifests.incomplete:
+            print(f"Manifests skipped (read errors)    : {manifests.incomplete:>7,}")
 
 
 # ---------------------------------------------------------------------------
@@ -1320,7 +2119,7 @@ def cmd_restore(args):
             file=sys.stderr,
         )
         try:
-            with _mount_apfs_snapshot(snap_name, tm_vol) as mountpoint:
+            with snapshot_mounter(tm_vol, args.snapshot_dirs).mount(snap_name) as mountpoint:
                 lh_root = _find_source_volume_in_snapshot(mountpoint, volume_name)
                 for row in group_list:
                     backup = row["backup_path"]
@@ -1415,6 +2214,39 @@ def build_parser():
             "When provided, each snapshot is checked for the presence of that volume directory."
         ),
     )
+    p_inspect.add_argument(
+        "--snapshot-dirs",
+        action="store_true",
+        default=False,
+        help=(
+            "Treat the backup volume as a directory of stand-in snapshots: each "
+            "subdirectory named like a Time Machine or CCC snapshot plays that APFS "
+            "snapshot and is read in place instead of mounted.  For tests and "
+            "benchmarks on machines without APFS."
+        ),
+    )
+    p_inspect.add_argument(
+        "--build-manifests",
+        action="store_true",
+        default=False,
+        help=(
+            "Mount every APFS snapshot that has no manifest yet and record the files "
+            "under --source-volume in it (path, size, mtime, inode), so later "
+            "'scan --manifests' runs need no mounting.  Requires --source-volume."
+        ),
+    )
+    p_inspect.add_argument(
+        "--manifests",
+        default=DEFAULT_MANIFESTS,
+        metavar="PATH",
+        help=f"Manifest store for --build-manifests (default: {DEFAULT_MANIFESTS}).",
+    )
+    p_inspect.add_argument(
+        "--mount-workers",
+        type=int,
+        default=1,
+        help="Snapshots mounted at once by --build-manifests (default: 1).",
+    )
     p_inspect.set_defaults(func=cmd_inspect)
 
     # scan
@@ -1445,12 +2277,15 @@ def build_parser():
     )
     p_scan.add_argument(
         "--search-mode",
-        choices=("full", "anchored"),
+        choices=("full", "anchored", "bisect"),
         default="full",
         help=(
             "Snapshot search strategy. "
             "'full' scans all snapshots (exhaustive). "
-            "'anchored' probes monthly anchors first, then scans forward to newest match."
+            "'anchored' probes monthly anchors first, then scans forward to newest match. "
+            "'bisect' finds each file on the monthly anchors, then bisects for the newest "
+            "snapshot containing it (reports that snapshot only; assumes a file stays in "
+            "consecutive snapshots from import until deletion)."
         ),
     )
     p_scan.add_argument(
@@ -1458,7 +2293,7 @@ def build_parser():
         type=int,
         default=1,
         help=(
-            "Month step used by --search-mode anchored (default: 1). "
+            "Month step used by --search-mode anchored and bisect (default: 1). "
             "Example: 1 probes every month, 2 probes every other month."
         ),
     )
@@ -1471,6 +2306,46 @@ def build_parser():
             "being searched, to diagnose path-structure issues."
         ),
     )
+    p_scan.add_argument(
+        "--manifests",
+        nargs="?",
+        const=DEFAULT_MANIFESTS,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Answer APFS snapshots from recorded file manifests instead of mounting "
+            f"them (default store: {DEFAULT_MANIFESTS}).  A snapshot without a manifest "
+            "is mounted, walked in full once and its manifest recorded.  Build them all "
+            "up front with: inspect --build-manifests."
+        ),
+    )
+    p_scan.add_argument(
+        "--mount-workers",
+        type=int,
+        default=1,
+        help=(
+            "APFS snapshots mounted and scanned at once (default: 1).  Each "
+            "snapshot is still unmounted as soon as it has been scanned, and all "
+            "are unmounted on an error or Ctrl-C."
+        ),
+    )
+    p_scan.add_argument(
+        "--snapshot-dirs",
+        action="store_true",
+        default=False,
+        help=(
+            "Treat the backup volume as a directory of stand-in snapshots: each "
+            "subdirectory named like a Time Machine or CCC snapshot plays that APFS "
+            "snapshot and is read in place instead of mounted.  For tests and "
+            "benchmarks on machines without APFS."
+        ),
+    )
+    p_scan.add_argument(
+        "--simulated-mount-seconds",
+        type=float,
+        default=0.0,
+        help="With --snapshot-dirs, wait this long per snapshot to imitate mount_apfs latency.",
+    )
     p_scan.set_defaults(func=cmd_scan)
 
     # restore
@@ -1519,6 +2394,17 @@ def build_parser():
         default=False,
         help="Calculate SHA-256 of each copied file (slower but provides integrity check).",
     )
+    p_restore.add_argument(
+        "--snapshot-dirs",
+        action="store_true",
+        default=False,
+        help=(
+            "Treat the backup volume as a directory of stand-in snapshots: each "
+            "subdirectory named like a Time Machine or CCC snapshot plays that APFS "
+            "snapshot and is read in place instead of mounted.  For tests and "
+            "benchmarks on machines without APFS."
+        ),
+    )
     p_restore.set_defaults(func=cmd_restore)
 
     # hash
@@ -2,16 +2,36 @@ import os
 import csv
 import shlex
 import argparse
+import asyncio
 import sys
 import subprocess
 import shutil
+import stat
 import time
+import queue
+import selectors
+import threading
+import json
+import sqlite3
+import mmap
+import struct
+import random
+import math
+import zlib
+import heapq
+from array import array
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import count, islice
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-import pandas as pd
 from dateutil import parser as dateparser
 
 APPLE_EPOCH = datetime(2001, 1, 1, tzinfo=timezone.utc)
+UNIX_EPOCH = datetime(1970, 1, 1)  # naive: capture times are wall-clock times
+APPLE_EPOCH_SECONDS = 978307200    # APPLE_EPOCH in Unix seconds
 
 # Constants
 TIME_DELTA = timedelta(minutes=5)
@@ -19,6 +39,15 @@ TZ_MISMATCH_RESIDUAL = timedelta(minutes=1)  # allowed residual after removing t
 TZ_MISMATCH_MAX = timedelta(hours=26)         # max tz offset to consider
 RAW_EXTENSIONS = {".dng", ".orf", ".arw", ".cr2", ".nef", ".rw2", ".raf", ".pef"}
 IGNORED_CANDIDATE_EXTENSIONS = {".xmp"}
+EXIFTOOL_ARGS = ["-json", "-n", "-Make", "-ImageWidth", "-ImageHeight", "-DateTimeOriginal"]
+EXIFTOOL_TIMEOUT = 30      # seconds per exiftool request (one file or one batch)
+EXIFTOOL_BATCH_SIZE = 200  # files per exiftool request when prefetching
+MDFIND_TIMEOUT = 30        # seconds per mdfind query
+DEFAULT_PREFETCH_ROWS = 100
+DEFAULT_INDEX_WORKERS = 8    # threads walking top-level subdirectories of --search-root
+INDEX_PROGRESS_SECONDS = 5   # interval between indexing progress lines
+# Extensions read_exif_header tries before falling back to exiftool (RAF is not TIFF-based).
+NATIVE_EXIF_EXTENSIONS = {".jpg", ".jpeg", ".tif", ".tiff", ".dng", ".nef", ".cr2", ".arw", ".pef", ".orf", ".rw2"}
 
 
 def ensure_exiftool_available():
@@ -49,35 +78,909 @@ def ensure_exiftool_available():
         sys.exit(1)
 
 def get_exif_data_exiftool(image_path, verbose_debug=False):
+    return get_exif_data_exiftool_batch([image_path], verbose_debug=verbose_debug).get(str(image_path))
+
+def get_exif_data_exiftool_batch(image_paths, verbose_debug=False, timeouts=None):
+    """
+    Read metadata for several files with a single ``exiftool -json -n`` process.
+
+    Returns a dict mapping ``str(path)`` to a metadata dict.  Files exiftool
+    could not read are absent from the result.  With ``timeouts`` (an
+    ExiftoolTimeouts) the time limit follows observed latency.
+    """
+    paths = [str(p) for p in image_paths]
+    limit, cost = timeouts.for_paths(paths) if timeouts else (EXIFTOOL_TIMEOUT, 0)
     if verbose_debug:
-        print(f"    [VERBOSE] exiftool starting: {image_path}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+        print(f"    [VERBOSE] exiftool starting: {_describe_batch(paths)}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+    started = time.monotonic()
     try:
         result = subprocess.run(
-            ["exiftool", "-Make", "-ImageWidth", "-ImageHeight", "-DateTimeOriginal", image_path],
-            capture_output=True, text=True, check=True, timeout=30
+            ["exiftool", *EXIFTOOL_ARGS, *paths],
+            capture_output=True, text=True, timeout=limit
         )
-        if verbose_debug:
-            print(f"    [VERBOSE] exiftool done: {image_path}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
-        data = {}
-        for line in result.stdout.strip().splitlines():
-            if ':' not in line:
-                continue
-            key, val = line.split(':', 1)
-            data[key.strip()] = val.strip()
-        return {
-            "Camera Make": data.get("Make", ""),
-            "Width": int(float(data.get("Image Width", "0").replace(" pixels", ""))),
-            "Height": int(float(data.get("Image Height", "0").replace(" pixels", ""))),
-            "DateTime": data.get("Date/Time Original", "")
-        }
     except subprocess.TimeoutExpired:
-        print(f"⚠️ exiftool timed out on {image_path}, skipping", file=sys.stderr)
+        if len(paths) > 1:
+            # Isolate the file that hung so the rest of the batch still resolves.
+            print(f"⚠️ exiftool timed out on a batch of {len(paths)} files, retrying one at a time", file=sys.stderr)
+            found = {}
+            for path in paths:
+                found.update(get_exif_data_exiftool_batch([path], verbose_debug=verbose_debug, timeouts=timeouts))
+            return found
+        print(f"⚠️ exiftool timed out on {paths[0]} after {limit:.0f}s, skipping", file=sys.stderr)
+        if timeouts:
+            timeouts.record_timeout(paths[0], limit)
+        return {}
+    if timeouts:
+        timeouts.observe(cost, time.monotonic() - started)
+    if verbose_debug:
+        print(f"    [VERBOSE] exiftool done: {_describe_batch(paths)}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+    if result.stderr.strip():
+        print(f"❌ Error running exiftool on {_describe_batch(paths)}: {result.stderr.strip()}", file=sys.stderr)
+    return _parse_exiftool_json(result.stdout)
+
+def _describe_batch(paths):
+    return paths[0] if len(paths) == 1 else f"{len(paths)} files"
+
+def _parse_exiftool_json(stdout):
+    """
+    Convert ``exiftool -json -n`` output into ``{SourceFile: metadata dict}``.
+
+    With ``-n`` exiftool reports numeric values unformatted, so widths and
+    heights arrive as JSON numbers rather than strings like "4288 pixels".
+    """
+    if not stdout.strip():
+        return {}
+    try:
+        records = json.loads(stdout)
+    except json.JSONDecodeError as e:
+        print(f"❌ Could not parse exiftool JSON output ({e})", file=sys.stderr)
+        return {}
+    found = {}
+    for record in records:
+        source = record.get("SourceFile")
+        if source is None:
+            continue
+        found[source] = {
+            "Camera Make": str(record.get("Make") or "").strip(),
+            "Width": _exif_int(record.get("ImageWidth")),
+            "Height": _exif_int(record.get("ImageHeight")),
+            "DateTime": str(record.get("DateTimeOriginal") or ""),
+        }
+    return found
+
+def _exif_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ExiftoolTimeouts:
+    """
+    Per-request exiftool time limits that follow the latency seen so far.
+
+    Every request that completes is recorded as seconds per unit of cost,
+    where cost is the files' total size plus PER_FILE_BYTES of fixed
+    overhead per file.  Once MIN_SAMPLES requests have completed, a
+    request's limit is MARGIN times the 99th-percentile rate applied to its
+    own cost, kept between MIN_SECONDS and MAX_SECONDS: small files that
+    hang are given up on sooner, very large ones get longer.  Before that the
+    fixed ``default`` applies.  Files that time out on their own (not merely
+    as part of a batch) are collected in ``timed_out``, files whose
+    single-file request killed the exiftool worker in ``crashed``.
+    """
+
+    PER_FILE_BYTES = 1 << 20
+    MIN_SAMPLES = 20
+    MARGIN = 4
+    MIN_SECONDS = 10
+    MAX_SECONDS = 300
+
+    def __init__(self, default=EXIFTOOL_TIMEOUT):
+        self.default = default
+        self.rates = deque(maxlen=1000)  # seconds per cost byte of recent requests
+        self.timed_out = {}  # path -> limit it ran into
+        self.crashed = set()  # paths whose own request made the worker exit
+        self.lock = threading.Lock()
+
+    @classmethod
+    def cost(cls, paths):
+        total = 0
+        for path in paths:
+            try:
+                total += os.stat(path).st_size
+            except OSError:
+                pass
+            total += cls.PER_FILE_BYTES
+        return total
+
+    def for_paths(self, paths):
+        """Return ``(limit_seconds, cost)`` for one request over ``paths``."""
+        cost = self.cost(paths)
+        with self.lock:
+            if len(self.rates) < self.MIN_SAMPLES:
+                return self.default, cost
+            rates = sorted(self.rates)
+        rate = rates[min(len(rates) - 1, int(len(rates) * 0.99))]
+        return min(self.MAX_SECONDS, max(self.MIN_SECONDS, self.MARGIN * rate * cost)), cost
+
+    def observe(self, cost, seconds):
+        if cost > 0:
+            with self.lock:
+                self.rates.append(seconds / cost)
+
+    def record_timeout(self, path, limit):
+        with self.lock:
+            self.timed_out[str(path)] = limit
+
+    def record_crash(self, path):
+        with self.lock:
+            self.crashed.add(str(path))
+
+
+class ExiftoolWorker:
+    """One long-lived ``exiftool -stay_open True -@ -`` process.
+
+    A request is written to stdin as one argument per line and terminated with
+    ``-execute<N>``.  exiftool ends the reply on stdout with ``{ready<N>}``;
+    ``-echo4`` writes the same marker to stderr so both streams can be read up
+    to a known boundary without blocking on each other.
+    """
+
+    def __init__(self, timeout=EXIFTOOL_TIMEOUT, verbose_debug=False):
+        self.timeout = timeout
+        self.verbose_debug = verbose_debug
+        self.proc = None
+        self.seq = 0
+        self.restarts = 0
+        self.startup_seconds = 0.0
+
+    def start(self):
+        started = time.monotonic()
+        self.proc = subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        # The first request pays for Perl compiling exiftool; do it now so
+        # startup cost is measured here rather than on the first candidate.
+        self.execute(["-ver"])
+        self.startup_seconds += time.monotonic() - started
+
+    def restart(self):
+        self.kill()
+        self.restarts += 1
+        self.start()
+
+    def execute(self, args, timeout=None):
+        """
+        Send one request and return ``(stdout, stderr)`` as text.
+
+        Raises TimeoutError if exiftool does not answer within ``timeout``
+        (default ``self.timeout``) seconds, or OSError if the worker process
+        has gone away.  The caller is responsible for restarting the worker
+        in either case.
+        """
+        timeout = timeout or self.timeout
+        self.seq += 1
+        marker = f"{{ready{self.seq}}}".encode()
+        payload = "\n".join([*args, "-echo4", marker.decode(), f"-execute{self.seq}"]) + "\n"
+        try:
+            self.proc.stdin.write(payload.encode("utf-8"))
+            self.proc.stdin.flush()
+        except (BrokenPipeError, ValueError) as exc:
+            raise OSError(f"exiftool worker is not running: {exc}") from exc
+
+        buffers = {self.proc.stdout.fileno(): b"", self.proc.stderr.fileno(): b""}
+        pending = set(buffers)
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as sel:
+            for fd in buffers:
+                sel.register(fd, selectors.EVENT_READ)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"exiftool did not answer within {timeout:.0f}s")
+                for key, _ in sel.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        raise OSError("exiftool worker exited unexpectedly")
+                    buffers[key.fd] += chunk
+                    if buffers[key.fd].rstrip().endswith(marker):
+                        pending.discard(key.fd)
+                        sel.unregister(key.fd)
+
+        out = buffers[self.proc.stdout.fileno()].rstrip()[:-len(marker)]
+        err = buffers[self.proc.stderr.fileno()].rstrip()[:-len(marker)]
+        return out.decode("utf-8", errors="replace"), err.decode("utf-8", errors="replace")
+
+    def kill(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+
+    def close(self):
+        """Ask exiftool to exit cleanly; kill it if it does not."""
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        try:
+            self.proc.stdin.write(b"-stay_open\nFalse\n")
+            self.proc.stdin.flush()
+            self.proc.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+class ExiftoolPool:
+    """
+    A small pool of persistent exiftool workers.
+
+    ``get_exif_data`` is a drop-in replacement for ``get_exif_data_exiftool``:
+    it returns the same metadata dict, or None when exiftool reports an error
+    or times out.  A worker that hangs or dies is restarted before it is
+    handed out again, so one bad file cannot stall later lookups.
+    """
+
+    def __init__(self, size=1, timeout=EXIFTOOL_TIMEOUT, verbose_debug=False, timeouts=None):
+        self.verbose_debug = verbose_debug
+        self.timeouts = timeouts  # ExiftoolTimeouts, or None for a fixed timeout
+        self.workers = []
+        self.idle = queue.Queue()
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        self.lock = threading.Lock()
+        self.closed = False
+        started = time.monotonic()
+        for _ in range(size):
+            worker = ExiftoolWorker(timeout=timeout, verbose_debug=verbose_debug)
+            worker.start()
+            self.workers.append(worker)
+            self.idle.put(worker)
+        self.startup_seconds = time.monotonic() - started
+
+    def get_exif_data(self, image_path):
+        return self.get_exif_data_batch([image_path]).get(str(image_path))
+
+    def get_exif_data_batch(self, image_paths, batch_size=EXIFTOOL_BATCH_SIZE):
+        """
+        Resolve many files at once.  Paths are split into requests of at most
+        ``batch_size`` files which run concurrently on the idle workers.
+        Returns ``{str(path): metadata}`` for every file exiftool could read.
+        """
+        paths = [str(p) for p in image_paths]
+        chunks = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+        found = {}
+        if len(chunks) <= 1 or len(self.workers) == 1:
+            for chunk in chunks:
+                found.update(self._execute_batch(chunk))
+            return found
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            for part in executor.map(self._execute_batch, chunks):
+                found.update(part)
+        return found
+
+    def _limit(self, paths):
+        return self.timeouts.for_paths(paths) if self.timeouts else (None, 0)
+
+    def _execute_batch(self, paths):
+        worker = self.idle.get()
+        started = time.monotonic()
+        try:
+            if self.verbose_debug:
+                print(f"    [VERBOSE] exiftool worker {worker.proc.pid} starting: {_describe_batch(paths)}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+            limit, cost = self._limit(paths)
+            try:
+                out, err = worker.execute([*EXIFTOOL_ARGS, *paths], timeout=limit)
+            except (TimeoutError, OSError) as e:
+                if self.closed:
+                    return {}
+                if isinstance(e, TimeoutError):
+                    print(f"⚠️ exiftool timed out on {_describe_batch(paths)}, restarting worker", file=sys.stderr)
+                else:
+                    print(f"❌ exiftool worker failed on {_describe_batch(paths)} ({e}); restarting", file=sys.stderr)
+                worker.restart()
+                if len(paths) == 1:
+                    if self.timeouts:
+                        if isinstance(e, TimeoutError):
+                            self.timeouts.record_timeout(paths[0], limit or worker.timeout)
+                        else:
+                            self.timeouts.record_crash(paths[0])
+                    return {}
+                # Retry one file per request so only the offending file is lost.
+                found = {}
+                for path in paths:
+                    found.update(self._execute_on(worker, [path]))
+                return found
+            if self.timeouts:
+                self.timeouts.observe(cost, time.monotonic() - started)
+            if self.verbose_debug:
+                print(f"    [VERBOSE] exiftool worker {worker.proc.pid} done: {_describe_batch(paths)}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+            if err.strip():
+                print(f"❌ Error running exiftool on {_describe_batch(paths)}: {err.strip()}", file=sys.stderr)
+            return _parse_exiftool_json(out)
+        finally:
+            with self.lock:
+                self.lookups += len(paths)
+                self.lookup_seconds += time.monotonic() - started
+            self.idle.put(worker)
+
+    def _execute_on(self, worker, paths):
+        """Single-file retry used after a batch failed; restarts the worker on a hang."""
+        limit, cost = self._limit(paths)
+        started = time.monotonic()
+        try:
+            out, err = worker.execute([*EXIFTOOL_ARGS, *paths], timeout=limit)
+        except (TimeoutError, OSError) as e:
+            print(f"⚠️ exiftool failed on {paths[0]} ({e}), restarting worker and skipping", file=sys.stderr)
+            if self.timeouts:
+                if isinstance(e, TimeoutError):
+                    self.timeouts.record_timeout(paths[0], limit or worker.timeout)
+                else:
+                    self.timeouts.record_crash(paths[0])
+            worker.restart()
+            return {}
+        if self.timeouts:
+            self.timeouts.observe(cost, time.monotonic() - started)
+        if err.strip():
+            print(f"❌ Error running exiftool on {paths[0]}: {err.strip()}", file=sys.stderr)
+        return _parse_exiftool_json(out)
+
+    @property
+    def restarts(self):
+        return sum(w.restarts for w in self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def kill(self):
+        """Stop all workers immediately, e.g. on Ctrl-C while requests are in flight."""
+        self.closed = True
+        for worker in self.workers:
+            worker.kill()
+
+    def close(self):
+        self.closed = True
+        for worker in self.workers:
+            worker.close()
+
+def read_exif_header(image_path):
+    """
+    Read Make, dimensions and DateTimeOriginal straight from a JPEG or
+    TIFF-structured file (TIFF, DNG, NEF, CR2, ARW, PEF, ORF, RW2) without
+    running exiftool.
+
+    The file is memory-mapped, so only the pages holding the JPEG markers and
+    the TIFF IFDs that are visited are actually read — typically a few KB.
+    Returns a metadata dict like ``get_exif_data_exiftool``, or None when the
+    format is not handled or any of the four values is missing or ambiguous;
+    callers then fall back to exiftool, which also knows about makernotes,
+    XMP and formats such as RAF.
+    """
+    if Path(image_path).suffix.lower() not in NATIVE_EXIF_EXTENSIONS:
         return None
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error running exiftool on {image_path}: {e.stderr}", file=sys.stderr)
+    try:
+        with open(image_path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if buf[:2] == b"\xff\xd8":
+                    found = _read_jpeg_header(buf)
+                elif buf[:4] in _TIFF_MAGICS:
+                    found = _read_tiff_header(buf, 0)
+                else:
+                    return None
+    except (OSError, ValueError, struct.error, IndexError):
         return None
+    if not found or not found.get("make") or not found.get("dims") or not found.get("datetime"):
+        return None
+    width, height = found["dims"]
+    return {
+        "Camera Make": found["make"],
+        "Width": width,
+        "Height": height,
+        "DateTime": found["datetime"],
+    }
+
+# TIFF byte-order headers: standard II/MM, plus Olympus ORF and Panasonic RW2 variants.
+_TIFF_MAGICS = {b"II*\x00", b"MM\x00*", b"IIRO", b"IIRS", b"MMOR", b"IIU\x00"}
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+# JPEG start-of-frame markers (baseline, progressive, lossless, arithmetic variants).
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _read_jpeg_header(buf):
+    """Walk JPEG markers up to start-of-scan: EXIF from APP1, dimensions from SOF."""
+    found = None
+    sof_dims = None
+    pos = 2
+    while pos + 4 <= len(buf):
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0xDA:  # start of scan: no more headers
+            break
+        (length,) = struct.unpack_from(">H", buf, pos + 2)
+        segment = pos + 4
+        if marker == 0xE1 and found is None and buf[segment:segment + 6] == b"Exif\x00\x00":
+            found = _read_tiff_header(buf, segment + 6)
+        elif marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", buf, segment + 1)
+            sof_dims = (width, height)
+            break
+        pos += 2 + length
+    if found is None or sof_dims is None:
+        return None
+    # exiftool reports the SOF size for JPEGs; if IFD0 also carries a
+    # different ImageWidth/Length, leave the choice to exiftool.
+    if found.get("ifd0_dims") and found["ifd0_dims"] != sof_dims:
+        return None
+    found["dims"] = sof_dims
+    return found
+
+def _read_tiff_header(buf, base):
+    """
+    Walk the IFD0 chain, SubIFDs and the EXIF IFD of a TIFF structure at ``base``.
+
+    Dimensions follow exiftool's rule for multi-image TIFF raws: the first
+    IFD flagged as full resolution (NewSubfileType 0) wins, otherwise IFD0.
+    """
+    endian = "<" if buf[base:base + 2] == b"II" else ">"
+    (first_ifd,) = struct.unpack_from(endian + "I", buf, base + 4)
+    found = {"make": None, "datetime": None, "dims": None, "ifd0_dims": None, "priority_dims": None}
+    visited = set()
+
+    def value_pos(typ, count, entry):
+        size = _TIFF_TYPE_SIZES.get(typ, 1) * count
+        if size <= 4:
+            return entry + 8
+        (offset,) = struct.unpack_from(endian + "I", buf, entry + 8)
+        return base + offset
+
+    def read_int(typ, entry):
+        return struct.unpack_from(endian + ("H" if typ == 3 else "I"), buf, entry + 8)[0]
+
+    def read_ascii(typ, count, entry):
+        pos = value_pos(typ, count, entry)
+        return bytes(buf[pos:pos + count]).split(b"\x00", 1)[0].decode("utf-8", errors="replace").strip()
+
+    def walk(offset, is_ifd0, depth):
+        if offset == 0 or offset in visited or depth > 4 or base + offset + 2 > len(buf):
+            return 0
+        visited.add(offset)
+        start = base + offset
+        (count,) = struct.unpack_from(endian + "H", buf, start)
+        subfile = width = height = None
+        children = []
+        for k in range(count):
+            entry = start + 2 + 12 * k
+            tag, typ, cnt = struct.unpack_from(endian + "HHI", buf, entry)
+            if tag == 0x00FE and typ in (3, 4):
+                subfile = read_int(typ, entry)
+            elif tag == 0x0100 and typ in (3, 4):
+                width = read_int(typ, entry)
+            elif tag == 0x0101 and typ in (3, 4):
+                height = read_int(typ, entry)
+            elif tag == 0x010F and typ == 2 and is_ifd0:
+                found["make"] = read_ascii(typ, cnt, entry)
+            elif tag == 0x9003 and typ == 2 and found["datetime"] is None:
+                found["datetime"] = read_ascii(typ, cnt, entry)
+            elif tag == 0x014A and typ in (4, 13):
+                pos = value_pos(typ, cnt, entry)
+                children += struct.unpack_from(endian + "I" * cnt, buf, pos)
+            elif tag == 0x8769 and typ in (4, 13):
+                children.append(read_int(4, entry))
+        if width and height:
+            if is_ifd0:
+                found["ifd0_dims"] = (width, height)
+            if subfile == 0 and found["priority_dims"] is None:
+                found["priority_dims"] = (width, height)
+        for child in children:
+            walk(child, False, depth + 1)
+        (next_ifd,) = struct.unpack_from(endian + "I", buf, start + 2 + 12 * count)
+        return next_ifd
+
+    next_ifd = walk(first_ifd, True, 0)
+    # Later IFDs in the chain are usually thumbnails but may hold the full image.
+    for _ in range(4):
+        if not next_ifd:
+            break
+        next_ifd = walk(next_ifd, False, 1)
+    found["dims"] = found["priority_dims"] or found["ifd0_dims"]
+    return found
+
+
+class MetadataCache:
+    """
+    Persistent SQLite cache of candidate metadata shared across runs.
+
+    Entries are keyed by file identity ``(st_dev, st_ino)`` and are only used
+    while the file's size and mtime still match what was recorded, so an
+    edited or replaced file is read again.  Writes are buffered and committed
+    in batches; the database runs in WAL mode so a crash loses at most the
+    unflushed batch.  Files exiftool could not read are not cached.
+    """
+
+    WRITE_BATCH = 500
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS metadata (
+                   device INTEGER NOT NULL,
+                   inode INTEGER NOT NULL,
+                   size INTEGER NOT NULL,
+                   mtime_ns INTEGER NOT NULL,
+                   path TEXT NOT NULL,
+                   make TEXT,
+                   width INTEGER,
+                   height INTEGER,
+                   datetime_original TEXT,
+                   PRIMARY KEY (device, inode)
+               )"""
+        )
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.pending = []
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def identity(path):
+        """Return ``(device, inode, size, mtime_ns)`` for ``path``, or None if it cannot be stat'ed."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def get_many(self, paths):
+        """
+        Look up ``paths`` in the cache.
+
+        Returns ``(found, missing)``: a dict of ``str(path)`` → metadata for
+        valid cache entries, and the list of paths that must be read afresh.
+        """
+        found = {}
+        missing = []
+        with self.lock:
+            for path in paths:
+                ident = self.identity(path)
+                row = None
+                if ident is not None:
+                    row = self.conn.execute(
+                        "SELECT make, width, height, datetime_original FROM metadata "
+                        "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+                        ident,
+                    ).fetchone()
+                if row is None:
+                    missing.append(path)
+                    continue
+                found[str(path)] = {
+                    "Camera Make": row[0] or "",
+                    "Width": row[1] or 0,
+                    "Height": row[2] or 0,
+                    "DateTime": row[3] or "",
+                }
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, metadata_by_path):
+        with self.lock:
+            for path, meta in metadata_by_path.items():
+                ident = self.identity(path)
+                if ident is None or not meta:
+                    continue
+                self.pending.append((*ident, str(path), meta["Camera Make"], meta["Width"],
+                                     meta["Height"], meta["DateTime"]))
+            if len(self.pending) >= self.WRITE_BATCH:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metadata "
+                "(device, inode, size, mtime_ns, path, make, width, height, datetime_original) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self.pending,
+            )
+        self.pending = []
+
+    def prune(self):
+        """
+        Delete entries whose file no longer exists (or is now a different file).
+        Returns ``(removed, total)``.
+        """
+        self.flush()
+        with self.lock:
+            rows = self.conn.execute("SELECT device, inode, path FROM metadata").fetchall()
+            stale = []
+            for device, inode, path in rows:
+                ident = self.identity(path)
+                if ident is None or ident[:2] != (device, inode):
+                    stale.append((device, inode))
+            with self.conn:
+                self.conn.executemany("DELETE FROM metadata WHERE device = ? AND inode = ?", stale)
+        return len(stale), len(rows)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class ExiftoolQuarantine:
+    """
+    Persistent SQLite list of files exiftool timed out on, crashed on or
+    could not read.
+
+    Like MetadataCache, entries are keyed by ``(st_dev, st_ino)`` and only
+    count while size and mtime still match, so a repaired or replaced file
+    is read again.  A timeout or crash on the file's own request quarantines
+    it at once; a file that merely came back without a record (which a
+    worker restart mid-batch can also cause) gets a strike and is only
+    quarantined after ``strikes`` of them.  Later runs leave quarantined
+    files out of exiftool requests (--retry-quarantined reads them again,
+    last and one per request); a file that is read successfully is released
+    and its strikes cleared.
+    """
+
+    STRIKES = 3  # "unreadable" results before a file is quarantined
+
+    def __init__(self, path, strikes=None):
+        self.path = Path(path)
+        self.strikes = strikes or self.STRIKES
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS quarantine (
+                   device INTEGER NOT NULL,
+                   inode INTEGER NOT NULL,
+                   size INTEGER NOT NULL,
+                   mtime_ns INTEGER NOT NULL,
+                   path TEXT NOT NULL,
+                   reason TEXT NOT NULL,
+                   first_seen TEXT NOT NULL,
+                   last_seen TEXT NOT NULL,
+                   failures INTEGER NOT NULL DEFAULT 1,
+                   PRIMARY KEY (device, inode)
+               )"""
+        )
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.skipped = {}  # path -> reason, quarantined files left out this run
+        self.added = {}    # path -> reason, quarantined during this run
+        self.struck = {}   # path -> strikes, unreadable this run but not (yet) quarantined
+        self.released = set()
+
+    def is_held(self, reason, failures):
+        return reason != "unreadable" or failures >= self.strikes
+
+    def split(self, paths):
+        """
+        Return ``(clear, quarantined, struck)``: the paths to read normally,
+        those in quarantine, and the clear paths that already have strikes.
+        """
+        clear = []
+        held = []
+        struck = []
+        with self.lock:
+            for path in paths:
+                ident = MetadataCache.identity(path)
+                row = None
+                if ident is not None:
+                    row = self.conn.execute(
+                        "SELECT reason, failures FROM quarantine "
+                        "WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+                        ident,
+                    ).fetchone()
+                if row is None:
+                    clear.append(path)
+                elif not self.is_held(*row):
+                    clear.append(path)
+                    struck.append(path)
+                else:
+                    held.append(path)
+                    self.skipped[str(path)] = row[0]
+        return clear, held, struck
+
+    def add(self, failures):
+        """
+        Record ``{path: reason}`` failures ("timeout", "crash" or
+        "unreadable"); files that cannot be stat'ed are ignored.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.lock, self.conn:
+            for path, reason in failures.items():
+                ident = MetadataCache.identity(path)
+                if ident is None:
+                    continue
+                self.conn.execute(
+                    "INSERT INTO quarantine (device, inode, size, mtime_ns, path, reason, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (device, inode) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                    "path = excluded.path, reason = excluded.reason, last_seen = excluded.last_seen, "
+                    "failures = CASE WHEN quarantine.size = excluded.size AND quarantine.mtime_ns = excluded.mtime_ns "
+                    "THEN failures + 1 ELSE 1 END",
+                    (*ident, str(path), reason, now, now),
+                )
+                (count,) = self.conn.execute(
+                    "SELECT failures FROM quarantine WHERE device = ? AND inode = ?", ident[:2]
+                ).fetchone()
+                self.skipped.pop(str(path), None)
+                if self.is_held(reason, count):
+                    self.added[str(path)] = reason
+                    self.struck.pop(str(path), None)
+                else:
+                    self.struck[str(path)] = count
+
+    def release(self, paths):
+        """Remove paths that have now been read successfully, with any strikes."""
+        with self.lock, self.conn:
+            for path in paths:
+                ident = MetadataCache.identity(path)
+                if ident is not None:
+                    self.conn.execute("DELETE FROM quarantine WHERE device = ? AND inode = ?", ident[:2])
+                self.released.add(str(path))
+                self.skipped.pop(str(path), None)
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM quarantine").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class DirectoryIndexFile:
+    """
+    SQLite file holding the last directory listing seen for each directory
+    under a search root, so unchanged directories need not be listed again.
+
+    A directory's mtime changes whenever an entry is added, removed or renamed
+    in it, so a listing is reused while the recorded ``mtime_ns`` still
+    matches.  Each row keeps the candidate file names and the (non-symlink)
+    subdirectory names; --exclude-sources is applied when the tree is walked,
+    so changing it between runs does not invalidate the file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS directories (
+                   path TEXT PRIMARY KEY,
+                   mtime_ns INTEGER,
+                   files TEXT NOT NULL,
+                   subdirs TEXT NOT NULL
+               )"""
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _under(search_root):
+        # Rows for search_root itself and everything below it.
+        prefix = search_root.rstrip(os.sep) + os.sep
+        return "path = ? OR substr(path, 1, ?) = ?", (search_root, len(prefix), prefix)
+
+    def load(self, search_root):
+        """Return ``{directory: (mtime_ns, file_names, subdir_names)}`` under search_root."""
+        where, params = self._under(search_root)
+        listings = {}
+        for path, mtime_ns, files, subdirs in self.conn.execute(
+                f"SELECT path, mtime_ns, files, subdirs FROM directories WHERE {where}", params):
+            listings[path] = (mtime_ns, files.split("\0") if files else [],
+                              subdirs.split("\0") if subdirs else [])
+        return listings
+
+    def save(self, search_root, listings, changed, excluded):
+        """
+        Store the listings of the directories in ``changed`` and drop rows under
+        search_root for directories that were not reached in this walk (other
+        than those skipped because ``excluded(path)`` is true).
+        Returns the number of rows dropped.
+        """
+        where, params = self._under(search_root)
+        with self.conn:
+            stored = [row[0] for row in self.conn.execute(f"SELECT path FROM directories WHERE {where}", params)]
+            gone = [(path,) for path in stored if path not in listings and not excluded(path)]
+            self.conn.executemany("DELETE FROM directories WHERE path = ?", gone)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO directories (path, mtime_ns, files, subdirs) VALUES (?, ?, ?, ?)",
+                [(path, listings[path][0], "\0".join(listings[path][1]), "\0".join(listings[path][2]))
+                 for path in changed],
+            )
+        return len(gone)
+
+    def close(self):
+        self.conn.close()
+
+
+class RunStats:
+    """
+    Timings and counters for one run, written out by --stats-json.
+
+    Each timer keeps every sample (as doubles in an array) so the report can
+    give percentiles as well as totals; distributions such as candidates per
+    row are kept the same way.  Safe to update from the --jobs threads.
+    """
+
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.timings = defaultdict(lambda: array("d"))
+            self.distributions = defaultdict(lambda: array("d"))
+            self.counters = Counter()
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            self.timings[name].append(seconds)
+
+    def observe(self, name, value):
+        with self.lock:
+            self.distributions[name].append(value)
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] += n
+
+    @classmethod
+    def _summarise(cls, samples, unit=""):
+        ordered = sorted(samples)
+        summary = {"count": len(ordered), f"total{unit}": round(sum(ordered), 6)}
+        if ordered:
+            summary[f"mean{unit}"] = round(sum(ordered) / len(ordered), 6)
+            for pct in cls.PERCENTILES:
+                rank = -(-pct * len(ordered) // 100)  # nearest-rank percentile
+                summary[f"p{pct}{unit}"] = round(ordered[max(rank, 1) - 1], 6)
+            summary[f"max{unit}"] = round(ordered[-1], 6)
+        return summary
+
+    def report(self):
+        with self.lock:
+            return {
+                "timings": {name: self._summarise(s, "_seconds") for name, s in sorted(self.timings.items())},
+                "distributions": {name: self._summarise(s) for name, s in sorted(self.distributions.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+
+# Process-wide instance: parse_datetime and the mdfind lookups report here too.
+STATS = RunStats()
+
 
 def parse_datetime(value, verbose_debug=False):
+    with STATS.timer("parse_datetime"):
+        return _parse_datetime(value, verbose_debug)
+
+def _parse_datetime(value, verbose_debug=False):
     try:
         if value is None:
             return None
@@ -87,51 +990,379 @@ def parse_datetime(value, verbose_debug=False):
         dt_str = str(value).strip()
         if not dt_str:
             return None
+        # EXIF and Lightroom plug-in formats, the common cases
+        fixed = _parse_fixed_datetime(dt_str)
+        if fixed is not None:
+            return fixed
         # Also accept Apple timestamps that arrived as strings
         try:
             numeric_value = float(dt_str)
             return (APPLE_EPOCH + timedelta(seconds=numeric_value)).replace(tzinfo=None)
         except ValueError:
             pass
-        # EXIF-style datetime
+        # EXIF-style datetime that is not a valid date (e.g. 0000:00:00 00:00:00)
         if ":" in dt_str[:10]:
-            dt_str = dt_str[:19]
-            return datetime.strptime(dt_str, "%Y:%m:%d %H:%M:%S")
+            print(f"⚠️ Failed to parse datetime: {value} (not a valid EXIF date/time)", file=sys.stderr)
+            return None
         # Everything else — strip any tz info dateparser may attach
         if verbose_debug:
             print(f"    [VERBOSE] dateparser.parse starting on: {dt_str!r}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
-        result = dateparser.parse(dt_str)
+        result, error = _parse_datetime_dateutil(dt_str)
         if verbose_debug:
             print(f"    [VERBOSE] dateparser.parse done: {result}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
-        return result.replace(tzinfo=None) if result is not None else None
+        if error:
+            print(f"⚠️ Failed to parse datetime: {value} ({error})", file=sys.stderr)
+        return result
     except Exception as e:
         print(f"⚠️ Failed to parse datetime: {value} ({e})", file=sys.stderr)
         return None
 
-def index_files_by_stem(search_root, exclude_sources):
+def _parse_fixed_datetime(dt_str):
+    """
+    Parse ``YYYY:MM:DD HH:MM:SS`` (EXIF) or ``YYYY-MM-DD HH:MM:SS`` (the
+    Lightroom plug-in's export format) by slicing; anything after the seconds
+    (sub-seconds, a zone) is ignored.  Returns None for any other layout.
+    """
+    if (len(dt_str) < 19 or dt_str[4] not in "-:" or dt_str[7] != dt_str[4]
+            or dt_str[10] not in " T" or dt_str[13] != ":" or dt_str[16] != ":"):
+        return None
+    try:
+        return datetime(int(dt_str[0:4]), int(dt_str[5:7]), int(dt_str[8:10]),
+                        int(dt_str[11:13]), int(dt_str[14:16]), int(dt_str[17:19]))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=65536)
+def _parse_datetime_dateutil(dt_str):
+    """dateutil fallback for unusual strings; memoized.  Returns ``(naive datetime or None, error or None)``."""
+    STATS.count("dateutil_parses")
+    with STATS.timer("parse_datetime_dateutil"):
+        try:
+            return dateparser.parse(dt_str).replace(tzinfo=None), None
+        except (ValueError, OverflowError) as e:
+            return None, str(e)
+
+CAPTURE_COLUMN = "Date/Time Original (Capture)"
+
+# Sentinels in the normalized capture-time array (valid values are epoch seconds).
+NO_CAPTURE_TIME = -(2 ** 63)               # capture column empty
+UNPARSEABLE_CAPTURE_TIME = -(2 ** 63) + 1  # capture column could not be parsed
+# Range of valid values: what capture_datetime can turn back into a datetime.
+MIN_CAPTURE_SECONDS = (datetime.min - UNIX_EPOCH) // timedelta(seconds=1)
+MAX_CAPTURE_SECONDS = (datetime.max - UNIX_EPOCH) // timedelta(seconds=1)
+
+def capture_seconds(value):
+    """
+    Normalize one capture-time field to wall-clock seconds since 1970-01-01.
+
+    Accepts the same inputs as parse_datetime (Apple epoch numbers, EXIF and
+    Lightroom formats, then dateutil), but returns an integer — whole seconds
+    — or one of the sentinels above, and prints nothing.  Numbers outside
+    the years datetime can hold (``1e20``, ``inf``, ``nan``) are unparseable.
+    """
+    dt_str = value.strip() if value else ""
+    if not dt_str:
+        return NO_CAPTURE_TIME
+    parsed = _parse_fixed_datetime(dt_str)
+    if parsed is None:
+        try:
+            seconds = APPLE_EPOCH_SECONDS + math.floor(float(dt_str))
+        except (ValueError, OverflowError):
+            pass
+        else:
+            if MIN_CAPTURE_SECONDS <= seconds <= MAX_CAPTURE_SECONDS:
+                return seconds
+            return UNPARSEABLE_CAPTURE_TIME
+        if ":" in dt_str[:10]:
+            return UNPARSEABLE_CAPTURE_TIME
+        parsed = _parse_datetime_dateutil(dt_str)[0]
+        if parsed is None:
+            return UNPARSEABLE_CAPTURE_TIME
+    return (parsed - UNIX_EPOCH) // timedelta(seconds=1)
+
+def capture_datetime(seconds):
+    """Inverse of capture_seconds for valid values."""
+    return UNIX_EPOCH + timedelta(seconds=seconds)
+
+def _file_stem(name):
+    """Index key of a file name: its lower-cased stem."""
+    return os.path.splitext(name)[0].lower()
+
+class StemIndex:
+    """
+    Read-only map of lower-cased file stem -> sorted list of path strings,
+    stored compactly enough for trees of millions of files.
+
+    Each directory path is stored once (``dirs``); a file is a directory id
+    in an ``array('I')`` plus its name in one bytes blob, in directory
+    order.  ``_order`` lists the files by stem and then by full path, and
+    the distinct stems are kept, sorted, in a second blob, so a lookup is a
+    binary search over the stems followed by a slice of ``_order``.  Path
+    strings are only built for the stems actually looked up.
+    """
+
+    def __init__(self, listings):
+        """
+        Build from ``{directory: (mtime_ns, file_names, subdir_names)}`` as
+        walked by index_files_by_stem.  ``listings`` is emptied as it is
+        consumed, so the walk's name lists are freed while the index grows.
+        """
+        self.dirs = sorted(listings)
+        names = bytearray()
+        name_offsets = array("Q", [0])
+        dir_ids = array("I")
+        # One heap entry per directory, (stem, file id, end of its file ids):
+        # a directory's files are stored in stem order and merged from here.
+        heads = []
+        for dir_id, directory in enumerate(self.dirs):
+            file_names = sorted(listings.pop(directory)[1], key=_file_stem)
+            first = len(dir_ids)
+            for name in file_names:
+                names += os.fsencode(name)
+                name_offsets.append(len(names))
+                dir_ids.append(dir_id)
+            if file_names:
+                heads.append((_file_stem(file_names[0]), first, len(dir_ids)))
+        self._names = bytes(names)
+        del names
+        self._name_offsets = name_offsets
+        self._dir_ids = dir_ids
+
+        # Merge the directories by stem: only one key per directory is held
+        # at a time, never one per file.
+        stems = bytearray()
+        stem_offsets = array("Q", [0])
+        starts = array("Q", [0])
+        order = array("I")
+
+        def add_group(stem, group):
+            if len(group) > 1:
+                group.sort(key=self._path)
+            order.extend(group)
+            stems.extend(os.fsencode(stem))
+            stem_offsets.append(len(stems))
+            starts.append(len(order))
+
+        current, group = None, []
+        heapq.heapify(heads)
+        while heads:
+            stem, file_id, end = heads[0]
+            if file_id + 1 < end:
+                heapq.heapreplace(heads, (_file_stem(self._name(file_id + 1)), file_id + 1, end))
+            else:
+                heapq.heappop(heads)
+            if stem != current:
+                if group:
+                    add_group(current, group)
+                current, group = stem, []
+            group.append(file_id)
+        if group:
+            add_group(current, group)
+        self._stems = bytes(stems)
+        self._stem_offsets = stem_offsets
+        self._starts = starts
+        self._order = order
+
+    def __len__(self):
+        """Number of distinct stems."""
+        return len(self._starts) - 1
+
+    @property
+    def files(self):
+        return len(self._dir_ids)
+
+    def _stem(self, i):
+        return os.fsdecode(self._stems[self._stem_offsets[i]:self._stem_offsets[i + 1]])
+
+    def _name(self, file_id):
+        return os.fsdecode(self._names[self._name_offsets[file_id]:self._name_offsets[file_id + 1]])
+
+    def _path(self, file_id):
+        return os.path.join(self.dirs[self._dir_ids[file_id]], self._name(file_id))
+
+    def _paths(self, i):
+        return [self._path(file_id) for file_id in self._order[self._starts[i]:self._starts[i + 1]]]
+
+    def get(self, stem, default=None):
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._stem(mid) < stem:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self._stem(lo) == stem:
+            return self._paths(lo)
+        return default
+
+    def items(self):
+        for i in range(len(self)):
+            yield self._stem(i), self._paths(i)
+
+    def nbytes(self):
+        """Approximate memory held by the index, in bytes."""
+        arrays = (self._stem_offsets, self._starts, self._name_offsets, self._dir_ids, self._order)
+        return (len(self._stems) + len(self._names) + sum(a.itemsize * len(a) for a in arrays)
+                + sys.getsizeof(self.dirs) + sum(sys.getsizeof(d) for d in self.dirs))
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # macOS reports bytes, Linux KiB
+
+
+def rebase_path(path, root, given_root):
+    """Re-express ``path`` (``root`` or a path under it) under ``given_root``, the form root was given in."""
+    if path == root:
+        return given_root
+    return os.path.join(given_root, path[len(root.rstrip(os.sep)) + 1:])
+
+def index_files_by_stem(search_root, exclude_sources, workers=DEFAULT_INDEX_WORKERS, index_file=None):
+    """Return a StemIndex: lower-cased file stem -> sorted list of path strings under search_root.
+
+    Directories whose path contains any of exclude_sources are skipped before
+    they are opened, and each top-level subdirectory is walked on its own
+    thread so large volumes are scanned with several requests in flight.
+
+    With ``index_file`` (a path), directory listings are saved between runs and
+    only directories whose mtime has changed are listed again.
+    """
     print(f"Indexing files under {search_root}...", file=sys.stderr)
-    index = {}
-    for root, _, files in os.walk(search_root):
-        if any(excl in root for excl in exclude_sources):
-            continue
-        for file in files:
-            if Path(file).suffix.lower() in IGNORED_CANDIDATE_EXTENSIONS:
+    search_root = given_root = os.fspath(search_root)
+    if index_file:
+        # Listings are keyed by directory path, so they must not depend on the cwd.
+        search_root = os.path.abspath(search_root)
+    started = time.monotonic()
+    progress = {"files": 0, "dirs": 0, "next_report": started + INDEX_PROGRESS_SECONDS}
+    lock = threading.Lock()
+
+    directory_index = DirectoryIndexFile(index_file) if index_file else None
+    saved = directory_index.load(search_root) if directory_index else {}
+    # A listing taken in the same second the directory was modified may miss
+    # a later change with the same (coarse) mtime; such listings are stored
+    # without an mtime so the next run lists them again.
+    trust_before_ns = time.time_ns() - 2_000_000_000
+
+    def report(files, dirs):
+        with lock:
+            progress["files"] += files
+            progress["dirs"] += dirs
+            now = time.monotonic()
+            if now < progress["next_report"]:
+                return
+            progress["next_report"] = now + INDEX_PROGRESS_SECONDS
+            rate = progress["files"] / (now - started)
+            print(f"  ...{progress['files']} files in {progress['dirs']} directories "
+                  f"({rate:.0f} files/sec)", file=sys.stderr)
+
+    def excluded(path):
+        return any(excl in path for excl in exclude_sources)
+
+    def list_directory(directory):
+        """Return ``(listing, reused)``; listing is ``(mtime_ns, file_names, subdir_names)``."""
+        if directory_index:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            previous = saved.get(directory)
+            if previous and previous[0] == mtime_ns:
+                return previous, True
+        files = []
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        subdirs.append(entry.name)
+                elif os.path.splitext(entry.name)[1].lower() not in IGNORED_CANDIDATE_EXTENSIONS:
+                    files.append(entry.name)
+        if directory_index and mtime_ns > trust_before_ns:
+            mtime_ns = None
+        return (mtime_ns if directory_index else None, files, subdirs), False
+
+    def scan(top, recurse=True):
+        """Walk top (depth-first); return (listings, reused, subdirs)."""
+        listings = {}
+        reused = set()
+        subdirs = []
+        pending = [top]
+        while pending:
+            directory = pending.pop()
+            try:
+                listing, was_reused = list_directory(directory)
+            except OSError as e:
+                print(f"⚠️ Cannot list {directory}: {e.strerror}", file=sys.stderr)
+                report(0, 1)
                 continue
-            stem = Path(file).stem
-            full_path = Path(root) / file
-            index.setdefault(stem.lower(), []).append(full_path)
-    print(f"Indexed {sum(len(v) for v in index.values())} files.\n", file=sys.stderr)
+            listings[directory] = listing
+            if was_reused:
+                reused.add(directory)
+            for name in listing[2]:
+                path = os.path.join(directory, name)
+                if not excluded(path):
+                    (pending if recurse else subdirs).append(path)
+            report(len(listing[1]), 1)
+        return listings, reused, subdirs
+
+    listings, reused = {}, set()
+
+    def merge(part):
+        listings.update(part[0])
+        reused.update(part[1])
+
+    subdirs = []
+    if not excluded(search_root):
+        top = scan(search_root, recurse=False)
+        merge(top)
+        subdirs = top[2]
+
+    if workers > 1 and len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for part in executor.map(scan, subdirs):
+                merge(part)
+    else:
+        for subdir in subdirs:
+            merge(scan(subdir))
+
+    if directory_index:
+        changed = [path for path in listings if path not in reused]
+        removed = directory_index.save(search_root, listings, changed, excluded)
+        directory_index.close()
+    if search_root != given_root:
+        # Hand paths back in the form search_root was given, as a plain walk does.
+        listings = {rebase_path(directory, search_root, given_root): listing
+                    for directory, listing in listings.items()}
+    # Paths within a stem are sorted (StemIndex orders them by full path), so
+    # candidate order and tie-breaking do not depend on listing order.
+    index = StemIndex(listings)
+    del listings
+    elapsed = time.monotonic() - started
+    total = progress["files"]
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Indexed {total} files in {progress['dirs']} directories "
+          f"in {elapsed:.1f}s ({rate:.0f} files/sec); index holds {len(index)} stems "
+          f"in {index.nbytes() / 2**20:.1f} MiB.", file=sys.stderr)
+    if directory_index:
+        print(f"Index file {index_file}: {len(reused)} directories reused, "
+              f"{len(changed)} rescanned, {removed} removed.", file=sys.stderr)
+    print(file=sys.stderr)
     return index
 
 def find_candidates_mdfind(stem, search_root=None, exclude_sources=None, verbose_debug=False):
     """Use macOS Spotlight (mdfind) to locate files matching stem, then filter."""
-    cmd = ["mdfind", "-name", stem]
-    if search_root:
-        cmd += ["-onlyin", str(search_root)]
+    cmd = mdfind_command(stem, search_root)
     if verbose_debug:
         print(f"    [VERBOSE] mdfind starting: {' '.join(cmd)}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
+        with STATS.timer("mdfind"):
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=MDFIND_TIMEOUT)
     except subprocess.TimeoutExpired:
         print(f"⚠️ mdfind timed out for stem={stem!r}, skipping", file=sys.stderr)
         return []
@@ -143,8 +1374,17 @@ def find_candidates_mdfind(stem, search_root=None, exclude_sources=None, verbose
         return []
     if verbose_debug:
         print(f"    [VERBOSE] mdfind done: {stem!r}, {len(result.stdout.strip().splitlines())} raw results  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+    return _filter_mdfind_output(result.stdout, stem, exclude_sources)
+
+def mdfind_command(stem, search_root=None):
+    cmd = ["mdfind", "-name", stem]
+    if search_root:
+        cmd += ["-onlyin", str(search_root)]
+    return cmd
+
+def _filter_mdfind_output(stdout, stem, exclude_sources):
     candidates = []
-    for line in result.stdout.strip().splitlines():
+    for line in stdout.strip().splitlines():
         line = line.strip()
         if not line:
             continue
@@ -159,6 +1399,239 @@ def find_candidates_mdfind(stem, search_root=None, exclude_sources=None, verbose
         candidates.append(p)
     return candidates
 
+class AsyncLookups:
+    """
+    Runs mdfind queries and one-shot exiftool reads as asyncio subprocesses,
+    at most ``limit`` at a time, for --async-lookups.
+
+    The caller hands over a whole chunk of lookups (every new stem of the
+    next --prefetch-rows rows, or every batch of their candidates) and gets
+    them all back at once.  Each subprocess has its own timeout and is
+    killed when it expires, so a hung file holds up only its own lookup
+    while the others keep going.  Results are keyed by stem or path, so the
+    rows are still scored and written in CSV order.
+    """
+
+    def __init__(self, limit, verbose_debug=False, timeouts=None):
+        self.limit = limit
+        self.verbose_debug = verbose_debug
+        self.timeouts = timeouts  # ExiftoolTimeouts, or None for a fixed timeout
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        self.timed_out_calls = 0
+
+    def find_candidates_mdfind(self, stems, search_root=None, exclude_sources=None):
+        """Return ``{stem: [Path]}``, like find_candidates_mdfind for each stem."""
+        stems = list(stems)
+        return dict(zip(stems, asyncio.run(self._gather(self._mdfind, stems, search_root, exclude_sources))))
+
+    def get_exif_data_batch(self, image_paths, batch_size=EXIFTOOL_BATCH_SIZE):
+        """Return ``{str(path): metadata}`` for every file exiftool could read."""
+        paths = [str(p) for p in image_paths]
+        chunks = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+        found = {}
+        for part in asyncio.run(self._gather(self._exiftool, chunks)):
+            found.update(part)
+        return found
+
+    async def _gather(self, lookup, keys, *args):
+        semaphore = asyncio.Semaphore(self.limit)
+        return await asyncio.gather(*(lookup(semaphore, key, *args) for key in keys))
+
+    async def _run(self, semaphore, cmd, label, timeout, stat):
+        """Run cmd; return ``(returncode, stdout, stderr, seconds)`` or None if it timed out."""
+        async with semaphore:
+            if self.verbose_debug:
+                print(f"    [VERBOSE] {cmd[0]} starting: {label}  ({time.strftime('%H:%M:%S')})", file=sys.stderr)
+            started = time.monotonic()
+            proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                        stderr=asyncio.subprocess.PIPE)
+            try:
+                out, err = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                self.timed_out_calls += 1
+                return None
+            finally:
+                if proc.returncode is None:  # timed out or cancelled by Ctrl-C
+                    proc.kill()
+                    await proc.communicate()  # reap it and drain its pipes
+                STATS.add_time(stat, time.monotonic() - started)
+            return (proc.returncode, out.decode("utf-8", errors="replace"), err.decode("utf-8", errors="replace"),
+                    time.monotonic() - started)
+
+    async def _mdfind(self, semaphore, stem, search_root, exclude_sources):
+        try:
+            result = await self._run(semaphore, mdfind_command(stem, search_root), repr(stem), MDFIND_TIMEOUT, "mdfind")
+        except FileNotFoundError:
+            print("❌ mdfind not found — are you running on macOS?", file=sys.stderr)
+            return []
+        if result is None:
+            print(f"⚠️ mdfind timed out for stem={stem!r}, skipping", file=sys.stderr)
+            return []
+        returncode, out, err, _ = result
+        if returncode != 0:
+            print(f"❌ mdfind error for {stem}: {err}", file=sys.stderr)
+            return []
+        return _filter_mdfind_output(out, stem, exclude_sources)
+
+    async def _exiftool(self, semaphore, paths):
+        limit, cost = self.timeouts.for_paths(paths) if self.timeouts else (EXIFTOOL_TIMEOUT, 0)
+        started = time.monotonic()
+        result = await self._run(semaphore, ["exiftool", *EXIFTOOL_ARGS, *paths], _describe_batch(paths),
+                                 limit, "exiftool")
+        if result is None:
+            if len(paths) == 1:
+                print(f"⚠️ exiftool timed out on {paths[0]} after {limit:.0f}s, skipping", file=sys.stderr)
+                if self.timeouts:
+                    self.timeouts.record_timeout(paths[0], limit)
+                return {}
+            # Isolate the file that hung; the single-file retries run concurrently.
+            print(f"⚠️ exiftool timed out on a batch of {len(paths)} files, retrying one at a time", file=sys.stderr)
+            found = {}
+            for part in await asyncio.gather(*(self._exiftool(semaphore, [path]) for path in paths)):
+                found.update(part)
+            return found
+        _, out, err, seconds = result
+        self.lookups += len(paths)
+        self.lookup_seconds += time.monotonic() - started
+        if self.timeouts:
+            self.timeouts.observe(cost, seconds)
+        if err.strip():
+            print(f"❌ Error running exiftool on {_describe_batch(paths)}: {err.strip()}", file=sys.stderr)
+        return _parse_exiftool_json(out)
+
+# Candidate discovery backends.  Each has find(stem) -> [Path] (stem is
+# lower-cased; paths in a reproducible order) and close(); main() picks one
+# from --filename-index, --mdfind or --search-root.
+
+class StemIndexBackend:
+    """Every file under search_root listed into memory at start-up (index_files_by_stem)."""
+
+    def __init__(self, search_root, exclude_sources, workers=DEFAULT_INDEX_WORKERS, index_file=None):
+        self.index = index_files_by_stem(search_root, exclude_sources, workers=workers, index_file=index_file)
+
+    def find(self, stem):
+        return [Path(p) for p in self.index.get(stem, ())]
+
+    def close(self):
+        pass
+
+
+class MdfindBackend:
+    """One Spotlight query per stem (macOS only)."""
+
+    def __init__(self, search_root=None, exclude_sources=None, verbose_debug=False):
+        self.search_root = search_root
+        self.exclude_sources = exclude_sources
+        self.verbose_debug = verbose_debug
+
+    def find(self, stem):
+        return find_candidates_mdfind(stem, self.search_root, self.exclude_sources, verbose_debug=self.verbose_debug)
+
+    def close(self):
+        pass
+
+
+class FilenameIndex:
+    """
+    Persistent SQLite index of candidate file names under one or more search
+    roots, written by the build-filename-index command and queried once per
+    stem at run time (an indexed equality lookup, so it costs microseconds
+    however large the tree is).
+
+    Directory listings are kept in the same file (see DirectoryIndexFile), so
+    refreshing a root only lists directories whose mtime has changed.  At run
+    time the lookups can be narrowed to one --search-root and filtered by
+    --exclude-sources; the excludes given when a root was built are applied
+    while it is walked.
+    """
+
+    def __init__(self, path, search_root=None, exclude_sources=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS roots (
+                   path TEXT PRIMARY KEY,
+                   excludes TEXT NOT NULL,
+                   indexed_at TEXT,
+                   files INTEGER NOT NULL DEFAULT 0
+               )"""
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                   path TEXT PRIMARY KEY,
+                   stem TEXT NOT NULL,
+                   root TEXT NOT NULL
+               )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS files_stem ON files (stem)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS files_root ON files (root)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.prefix = None
+        self.search_root = None  # (absolute, as given): paths are returned in the given form
+        if search_root is not None:
+            given = os.fspath(search_root)
+            search_root = os.path.abspath(given)
+            self.prefix = search_root.rstrip(os.sep) + os.sep
+            self.search_root = (search_root, given)
+        self.exclude_sources = exclude_sources or []
+
+    def roots(self):
+        """Return ``{root: (excludes, indexed_at, files)}`` for every indexed root."""
+        return {path: (json.loads(excludes), indexed_at, files) for path, excludes, indexed_at, files
+                in self.conn.execute("SELECT path, excludes, indexed_at, files FROM roots ORDER BY path")}
+
+    def covers(self, search_root):
+        """True if search_root is an indexed root or lies under one."""
+        search_root = os.path.abspath(search_root)
+        return any(search_root == root or search_root.startswith(root.rstrip(os.sep) + os.sep)
+                   for root in self.roots())
+
+    def refresh(self, root, exclude_sources, workers=DEFAULT_INDEX_WORKERS):
+        """(Re)index one root.  Returns ``(added, removed)`` file counts."""
+        root = os.path.abspath(root)
+        for other in self.roots():
+            if other != root and (root.startswith(other.rstrip(os.sep) + os.sep)
+                                  or other.startswith(root.rstrip(os.sep) + os.sep)):
+                raise ValueError(f"{root} overlaps indexed root {other}")
+        index = index_files_by_stem(root, exclude_sources, workers=workers, index_file=self.path)
+        found = {path: stem for stem, paths in index.items() for path in paths}
+        with self.conn:
+            stored = {row[0] for row in self.conn.execute("SELECT path FROM files WHERE root = ?", (root,))}
+            removed = [(path,) for path in stored if path not in found]
+            added = [(path, found[path], root) for path in found if path not in stored]
+            self.conn.executemany("DELETE FROM files WHERE path = ?", removed)
+            self.conn.executemany("INSERT INTO files (path, stem, root) VALUES (?, ?, ?)", added)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO roots (path, excludes, indexed_at, files) VALUES (?, ?, ?, ?)",
+                (root, json.dumps(exclude_sources), datetime.now().isoformat(timespec="seconds"), len(found)),
+            )
+        return len(added), len(removed)
+
+    def remove_root(self, root):
+        """Drop a root and its files.  Returns the number of files dropped."""
+        root = os.path.abspath(root)
+        with self.conn:
+            removed = self.conn.execute("DELETE FROM files WHERE root = ?", (root,)).rowcount
+            self.conn.execute("DELETE FROM roots WHERE path = ?", (root,))
+        directories = DirectoryIndexFile(self.path)
+        directories.save(root, {}, [], lambda path: False)
+        directories.close()
+        return removed
+
+    def find(self, stem):
+        with self.lock:
+            rows = self.conn.execute("SELECT path FROM files WHERE stem = ? ORDER BY path", (stem,)).fetchall()
+        return [Path(rebase_path(path, *self.search_root) if self.search_root else path) for (path,) in rows
+                if (self.prefix is None or path.startswith(self.prefix))
+                and not any(excl in path for excl in self.exclude_sources)]
+
+    def close(self):
+        self.conn.close()
+
 def get_volume(path):
     """Return the top-level mount point (volume) of a path."""
     p = Path(path).resolve()
@@ -169,6 +1642,100 @@ def get_volume(path):
     # Fallback: filesystem root
     return Path(parts[0])
 
+class VolumeScheduler:
+    """
+    Runs candidate metadata reads per physical volume (``st_dev``).
+
+    Each volume's files are queued in on-disk order — by inode, or by
+    directory and then inode — and read in requests of up to ``batch_size``
+    files with at most ``per_volume`` requests in flight on that volume, so
+    a spinning disk works through its files in one sweep instead of seeking
+    between rows, and a slow volume only holds up its own queue while the
+    other volumes run in parallel.  Files that cannot be stat'ed form one
+    more queue.  Per-volume file counts and times are kept for the Summary.
+    """
+
+    ORDERS = ("inode", "directory")
+
+    def __init__(self, per_volume=1, order="inode", batch_size=EXIFTOOL_BATCH_SIZE):
+        self.per_volume = per_volume
+        self.order = order
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.volumes = {}  # st_dev -> {"name", "files", "requests", "seconds"}
+
+    def plan(self, paths):
+        """Return ``{st_dev or None: [paths in read order]}``."""
+        queues = defaultdict(list)
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                queues[None].append((0, "", path))
+                continue
+            directory = os.path.dirname(str(path)) if self.order == "directory" else ""
+            queues[st.st_dev].append((st.st_ino, directory, path))
+        return {dev: [path for _, _, path in sorted(entries, key=lambda e: (e[1], e[0]))]
+                for dev, entries in queues.items()}
+
+    @staticmethod
+    def mount_point(path):
+        path = os.path.abspath(path)
+        while not os.path.ismount(path):
+            path = os.path.dirname(path)
+        return path
+
+    def run(self, paths, read):
+        """Read ``paths`` with ``read(list_of_paths) -> dict`` volume by volume; return the merged dict."""
+        queues = {}
+        for dev, ordered in self.plan(paths).items():
+            queues[dev] = deque(ordered[i:i + self.batch_size] for i in range(0, len(ordered), self.batch_size))
+            with self.lock:
+                if dev not in self.volumes:
+                    name = self.mount_point(ordered[0]) if dev is not None else "(cannot stat)"
+                    self.volumes[dev] = {"name": name, "files": 0, "requests": 0, "seconds": 0.0}
+        found = {}
+        stop = threading.Event()  # set on Ctrl-C or an error: drains finish their request and return
+
+        def drain(dev):
+            """Read one volume's queue; per_volume of these run per volume."""
+            queue_ = queues[dev]
+            while True:
+                with self.lock:
+                    if not queue_ or stop.is_set():
+                        return
+                    chunk = queue_.popleft()
+                started = time.monotonic()
+                part = read(chunk)
+                elapsed = time.monotonic() - started
+                with self.lock:
+                    found.update(part)
+                    volume = self.volumes[dev]
+                    volume["files"] += len(chunk)
+                    volume["requests"] += 1
+                    volume["seconds"] += elapsed
+
+        drains = [dev for dev, chunks in queues.items() for _ in range(min(self.per_volume, len(chunks)))]
+        if len(drains) == 1:
+            drain(drains[0])
+        else:
+            executor = ThreadPoolExecutor(max_workers=len(drains))
+            try:
+                for future in [executor.submit(drain, dev) for dev in drains]:
+                    future.result()
+            except BaseException:
+                stop.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            executor.shutdown()
+        return found
+
+    def report(self):
+        """Return ``[(name, files, requests, seconds)]`` per volume, busiest first."""
+        with self.lock:
+            volumes = sorted(self.volumes.values(), key=lambda v: -v["files"])
+        return [(v["name"], v["files"], v["requests"], v["seconds"]) for v in volumes]
+
 def make_link_or_copy_command(candidate_path, original_path, copy_across_volumes):
     """Return a shell command string to link or copy a candidate to the target location."""
     if copy_across_volumes:
@@ -178,6 +1745,104 @@ def make_link_or_copy_command(candidate_path, original_path, copy_across_volumes
             return f'cp {shlex.quote(str(candidate_path))} {shlex.quote(str(original_path))}'
     return f'ln {shlex.quote(str(candidate_path))} {shlex.quote(str(original_path))}'
 
+def read_plan(plan_paths):
+    """
+    Parse the ``ln``/``cp`` lines of generated relink scripts.
+
+    Returns ``(operations, problems)``: each operation is a dict with
+    ``plan`` (``file:line``), ``op``, ``source`` and ``destination``, in plan
+    order, keeping only the first operation for each destination; each
+    problem is ``(plan, op, source, destination, note)`` for a line that
+    could not be parsed (op is None) or repeats an earlier destination.
+    """
+    operations = []
+    problems = []
+    first_seen = {}
+    for plan_path in plan_paths:
+        with open(plan_path) as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                where = f"{plan_path}:{line_no}"
+                try:
+                    words = shlex.split(line)
+                except ValueError as e:
+                    problems.append((where, None, "", "", f"Cannot parse line: {e}"))
+                    continue
+                if len(words) != 3 or words[0] not in ("ln", "cp"):
+                    problems.append((where, None, "", "", f"Not an ln/cp command: {line}"))
+                    continue
+                op, source, destination = words
+                if destination in first_seen:
+                    problems.append((where, op, source, destination,
+                                     f"Destination already planned at {first_seen[destination]}"))
+                    continue
+                first_seen[destination] = where
+                operations.append({"plan": where, "op": op, "source": source, "destination": destination})
+    return operations, problems
+
+def apply_plan_operation(op, source, destination, dry_run=True, copy_across_volumes=False):
+    """
+    Hardlink (``ln``) or copy (``cp``) ``source`` to ``destination`` in-process.
+
+    Never overwrites: an existing destination is skipped, and the link or
+    copy itself fails rather than replace a file created in the meantime.
+    A link is only attempted when the destination directory is on the same
+    filesystem as the source; otherwise it is an error, or a copy with
+    ``copy_across_volumes``.  Like the generated ``ln``/``cp`` lines, no
+    directories are created: a missing destination directory (for example
+    on a volume that is not mounted) is an error.  Returns ``(operation,
+    status, file_size, notes)`` with operation LINK or COPY and status OK,
+    SKIP, ERROR or DRY-RUN.
+    """
+    operation = "LINK" if op == "ln" else "COPY"
+    try:
+        st = os.stat(source)
+    except OSError as e:
+        return operation, "ERROR", "", f"Cannot read source: {e.strerror}"
+    if not stat.S_ISREG(st.st_mode):
+        return operation, "ERROR", "", "Source is not a regular file"
+    if os.path.lexists(destination):
+        try:
+            if os.path.samefile(source, destination):
+                return operation, "SKIP", st.st_size, "Destination is already this file"
+        except OSError:
+            pass
+        return operation, "SKIP", st.st_size, "Destination already exists; will not overwrite"
+
+    notes = ""
+    parent = os.path.dirname(os.path.abspath(destination))
+    if not os.path.isdir(parent):
+        return operation, "ERROR", st.st_size, f"Destination directory does not exist: {parent}"
+    if operation == "LINK":
+        if os.stat(parent).st_dev != st.st_dev:
+            if not copy_across_volumes:
+                return (operation, "ERROR", st.st_size,
+                        "Source and destination are on different filesystems; cannot hardlink "
+                        "(pass --copy-across-volumes to copy instead)")
+            operation, notes = "COPY", "Different filesystems; copied instead of linking"
+    if dry_run:
+        return operation, "DRY-RUN", st.st_size, notes
+
+    try:
+        if operation == "LINK":
+            os.link(source, destination)
+        else:
+            with open(source, "rb") as src, open(destination, "xb") as dst:
+                try:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+                except BaseException:
+                    dst.close()
+                    os.unlink(destination)
+                    raise
+            shutil.copystat(source, destination)
+    except FileExistsError:
+        return operation, "SKIP", st.st_size, "Destination already exists; will not overwrite"
+    except OSError as e:
+        return operation, "ERROR", st.st_size, str(e)
+    return operation, "OK", st.st_size, notes
+
 def is_raw_file(path):
     return Path(path).suffix.lower() in RAW_EXTENSIONS
 
@@ -210,75 +1875,953 @@ def open_output(path, append):
         f.write("#!/bin/bash\n")
     return f
 
-def _print_interrupt_resume(csv_filename, last_completed_row, skip_rows,
-                             rows_to_process, output_dir, argv):
-    """Print the last completed row and a ready-to-paste resume command to stderr."""
-    print(f"\n⚠️  Interrupted after completing row {last_completed_row} "
-          f"(0-based CSV data row, not counting header).", file=sys.stderr)
-    # Rebuild resume command from original argv, replacing windowing flags
-    skip_flags = {"--skip-rows", "--rows-to-process"}
-    parts = [argv[0]]
-    skip_next = False
-    for arg in argv[1:]:
-        if skip_next:
-            skip_next = False
-            continue
-        if arg in skip_flags:
-            skip_next = True
-            continue
-        if any(arg.startswith(f + "=") for f in skip_flags):
-            continue
-        if arg == "--append-outputs":
-            continue
-        parts.append(arg)
-    parts += ["--skip-rows", str(last_completed_row), "--append-outputs"]
-    if rows_to_process is not None:
-        remaining = rows_to_process - (last_completed_row - skip_rows)
-        if remaining > 0:
-            parts += ["--rows-to-process", str(remaining)]
+def open_missing_csv(csv_filename):
+    """Open the Lightroom export; return ``(file, csv.DictReader)``.  Rows are plain dicts of strings."""
+    f = open(csv_filename, newline="", encoding="utf-8-sig")
+    reader = csv.DictReader(f)
+    if not reader.fieldnames:
+        f.close()
+        raise ValueError("no header row")
+    return f, reader
+
+def parse_shard(value):
+    """argparse type for --shard: ``"i/N"`` with 1 <= i <= N, returned as ``(i, N)``."""
+    try:
+        index, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 1/4, not {value!r}")
+    if not 1 <= index <= shards:
+        raise argparse.ArgumentTypeError(f"shard {value} is out of range (i must be between 1 and N)")
+    return index, shards
+
+def format_shard(shard):
+    return None if shard is None else f"{shard[0]}/{shard[1]}"
+
+def in_shard(photo, shard):
+    """
+    True if the row for ``photo`` belongs to ``shard`` (``(i, N)`` or None for
+    every row).  Rows are assigned by a CRC-32 of the lower-cased file stem,
+    which is the same on every host and Python version, so rows sharing a
+    stem always land in the same shard.
+    """
+    if shard is None:
+        return True
+    index, shards = shard
+    return zlib.crc32(Path(photo).stem.lower().encode("utf-8")) % shards == index - 1
+
+def prescan_missing_csv(csv_filename, skip_rows=0, rows_to_process=None, done=(), shard=None):
+    """
+    One pass over the (windowed) rows before matching starts.
+
+    Returns ``(seconds, unparseable, stem_rows)``: an ``array('q')`` with
+    capture_seconds() for each row, in the order csv.DictReader yields them;
+    a list of ``(data_row, value)`` for capture times that could not be
+    parsed; and a Counter of rows per lower-cased file stem.  Rows in
+    ``done`` (already in the journal) still get a capture time, to keep the
+    array aligned, but are left out of the other two; rows outside ``shard``
+    get NO_CAPTURE_TIME without being parsed.
+    """
+    seconds = array("q")
+    unparseable = []
+    stem_rows = Counter()
+    with open(csv_filename, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        def column(name):
+            # DictReader keeps the last of duplicated column names
+            return len(header) - 1 - header[::-1].index(name) if name in header else None
+
+        capture_col = column(CAPTURE_COLUMN)
+        photo_col = column("Photo")
+        records = (record for record in reader if record)  # DictReader skips blank lines too
+        for data_row, record in enumerate(window_rows(records, skip_rows, rows_to_process), skip_rows):
+            photo = record[photo_col] if photo_col is not None and photo_col < len(record) else None
+            if shard is not None and (photo is None or not in_shard(photo, shard)):
+                seconds.append(NO_CAPTURE_TIME)
+                continue
+            value = record[capture_col] if capture_col is not None and capture_col < len(record) else ""
+            normalized = capture_seconds(value)
+            seconds.append(normalized)
+            if data_row in done:
+                continue
+            if normalized == UNPARSEABLE_CAPTURE_TIME:
+                unparseable.append((data_row, value))
+            if photo is not None:
+                stem_rows[Path(photo).stem.lower()] += 1
+    return seconds, unparseable, stem_rows
+
+def window_rows(rows, skip_rows=0, rows_to_process=None):
+    """Apply --skip-rows / --rows-to-process to a row iterator without materialising it."""
+    stop = None if rows_to_process is None else skip_rows + rows_to_process
+    return islice(rows, skip_rows, stop)
+
+def sample_rows(rows, n):
+    """Uniform random sample of up to n rows (reservoir sampling), returned in CSV order."""
+    reservoir = []
+    for i, row in enumerate(rows):
+        if i < n:
+            reservoir.append((i, row))
+        else:
+            j = random.randint(0, i)
+            if j < n:
+                reservoir[j] = (i, row)
+    return [row for _, row in sorted(reservoir, key=lambda item: item[0])]
+
+def is_blank(value):
+    """True for a missing or empty CSV field."""
+    return value is None or not str(value).strip()
+
+def csv_int(value):
+    """Parse an integer CSV field, accepting float spellings such as ``4000.0``."""
+    return int(float(value))
+
+def append_csv_rows(path, columns, rows, append):
+    """Write dict rows to a CSV output, appending (without a header) when ``append`` and the file exists."""
+    if not rows:
+        return
+    append = append and path.exists()
+    with open(path, "a" if append else "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+        if not append:
+            writer.writeheader()
+        writer.writerows(rows)
+
+# Output files written to --output-dir
+RELINK_SCRIPT = "relink_good_matches.sh"
+MISMATCH_SCRIPT = "resolution_mismatch.sh"
+HIGHER_RESOLUTION_SCRIPT = "higher_resolution.sh"
+STILL_MISSING_CSV = "Still_Missing_Photos.csv"
+IMPORT_OTHER_FORMATS_CSV = "import_other_formats.csv"
+IMPORT_SAME_FORMAT_CSV = "import_same_format_higher_resolution.csv"
+QUARANTINE_FILE = "exiftool_quarantine.sqlite"
+QUARANTINE_REPORT_LIMIT = 50  # quarantined paths listed after the Summary
+APPLY_LOG = "apply_log.csv"  # written by the apply command, next to the first plan
+IMPORT_OTHER_FORMATS_COLUMNS = ["missing_file", "new_file", "missing_width", "missing_height",
+                                "new_width", "new_height", "rank"]
+IMPORT_SAME_FORMAT_COLUMNS = ["missing_file", "matched_file", "new_file",
+                              "lr_width", "lr_height",
+                              "matched_width", "matched_height",
+                              "new_width", "new_height", "rank"]
+
+
+class RelinkJournal:
+    """
+    Append-only record of finished rows, ``relink_journal.jsonl`` in --output-dir.
+
+    The first line identifies the input CSV and its columns; every further
+    line is one completed row: its 0-based CSV data row, outcome, output
+    lines and counters (and the input row itself when it is still missing).
+    Lines are written as rows finish, so the journal — not the buffered
+    output files — is the record of what has been done: --resume skips the
+    rows it lists, in whatever order they were processed, and
+    rebuild_outputs() regenerates every output file from it.
+    """
+
+    NAME = "relink_journal.jsonl"
+    VERSION = 1
+    FSYNC_EVERY = 100  # rows between fsyncs
+
+    def __init__(self, out_dir, csv_filename, columns, append, shard=None):
+        self.path = Path(out_dir) / self.NAME
+        append = append and self.path.exists() and self.path.stat().st_size > 0
+        self.file = open(self.path, "a" if append else "w", encoding="utf-8")
+        if append:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")  # a crash cut the last line short
+        else:
+            self.file.write(json.dumps(self.header(csv_filename, columns, shard)) + "\n")
+        self.file.flush()
+        self.unsynced = 0
+
+    @classmethod
+    def header(cls, csv_filename, columns, shard=None):
+        return {"journal": "relink_missing_photos", "version": cls.VERSION,
+                "csv": str(Path(csv_filename).resolve()), "columns": columns,
+                "shard": format_shard(shard)}
+
+    def record(self, result):
+        entry = {key: result[key] for key in ("data_row", "outcome", "relink", "mismatch", "higher_resolution",
+                                              "import_other_formats", "import_same_format_higher_res")}
+        entry["counters"] = dict(result["counters"])
+        if result["outcome"] == OUTCOME_STILL_MISSING:
+            entry["missing_row"] = result["row"]
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        self.unsynced += 1
+        if self.unsynced >= self.FSYNC_EVERY:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    @classmethod
+    def read(cls, path):
+        """
+        Return ``(header, entries)`` where entries maps data row -> entry (the
+        last one wins).  A truncated final line is ignored.  Raises ValueError
+        if path is not a journal.
+        """
+        header = None
+        entries = {}
+        with open(path, encoding="utf-8") as f:
+            for n, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if n == 0:
+                        raise ValueError(f"{path} is not a relink journal")
+                    continue  # partial line from a crash
+                if n == 0:
+                    if record.get("journal") != "relink_missing_photos":
+                        raise ValueError(f"{path} is not a relink journal")
+                    header = record
+                else:
+                    entries[record["data_row"]] = record
+        if header is None:
+            raise ValueError(f"{path} is empty")
+        return header, entries
+
+    @classmethod
+    def write(cls, path, header, entries):
+        """Write a complete journal (header, then entries in data-row order) atomically."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for data_row in sorted(entries):
+                f.write(json.dumps(entries[data_row]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+def rebuild_outputs(out_dir):
+    """
+    Rewrite every output file in out_dir from its journal, in CSV row order.
+    Returns ``(counters, rows)`` summed over the journal.
+    """
+    out_dir = Path(out_dir)
+    header, entries = RelinkJournal.read(out_dir / RelinkJournal.NAME)
+    counters = Counter()
+    still_missing, other_formats, same_format = [], [], []
+    scripts = {"relink": RELINK_SCRIPT, "mismatch": MISMATCH_SCRIPT, "higher_resolution": HIGHER_RESOLUTION_SCRIPT}
+    files = {key: open_output(out_dir / name, False) for key, name in scripts.items()}
+    try:
+        for data_row in sorted(entries):
+            entry = entries[data_row]
+            for key, f in files.items():
+                f.writelines(line + "\n" for line in entry[key])
+            if "missing_row" in entry:
+                still_missing.append(entry["missing_row"])
+            other_formats.extend(entry["import_other_formats"])
+            same_format.extend(entry["import_same_format_higher_res"])
+            counters.update(entry["counters"])
+    finally:
+        for f in files.values():
+            f.close()
+    for name, columns, rows in ((STILL_MISSING_CSV, header["columns"], still_missing),
+                                (IMPORT_OTHER_FORMATS_CSV, IMPORT_OTHER_FORMATS_COLUMNS, other_formats),
+                                (IMPORT_SAME_FORMAT_CSV, IMPORT_SAME_FORMAT_COLUMNS, same_format)):
+        path = out_dir / name
+        if path.exists():
+            path.unlink()
+        append_csv_rows(path, columns, rows, False)
+    return counters, len(entries)
+
+
+def merge_journals(shard_dirs, out_dir):
+    """
+    Combine the journals of several runs over the same CSV — normally the
+    ``--shard 1/N`` ... ``N/N`` runs — into out_dir and rebuild its outputs
+    from the result, in CSV row order.  Returns ``(counters, rows, missing)``
+    where missing lists the shards of an i/N set that were not given.
+    Raises ValueError if the journals do not belong together.
+    """
+    out_dir = Path(out_dir)
+    header = None
+    first_path = None
+    entries = {}
+    origin = {}
+    shards = {}
+    for shard_dir in shard_dirs:
+        path = Path(shard_dir) / RelinkJournal.NAME
+        shard_header, shard_entries = RelinkJournal.read(path)
+        if header is None:
+            header, first_path = shard_header, path
+        elif shard_header["columns"] != header["columns"]:
+            raise ValueError(f"{path} and {first_path} are runs over CSVs with different columns")
+        elif shard_header["csv"] != header["csv"]:
+            # Hosts may mount the same CSV at different paths
+            print(f"⚠️ {path} is a run over {shard_header['csv']}, {first_path} over {header['csv']}",
+                  file=sys.stderr)
+        shard = shard_header.get("shard")
+        if shard is not None:
+            if shard in shards:
+                raise ValueError(f"{path} and {shards[shard]} are both shard {shard}")
+            shards[shard] = path
+        for data_row, entry in shard_entries.items():
+            if data_row in origin:
+                raise ValueError(f"row {data_row} is in both {origin[data_row]} and {path}")
+            origin[data_row] = path
+            entries[data_row] = entry
+
+    missing = []
+    counts = {int(shard.split("/")[1]) for shard in shards}
+    if len(counts) > 1:
+        raise ValueError(f"journals come from different shard counts: {', '.join(sorted(shards))}")
+    for n in counts:
+        missing = [f"{i}/{n}" for i in range(1, n + 1) if f"{i}/{n}" not in shards]
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    merged_header = dict(header, shard=None, merged_from=[str(Path(d).resolve()) for d in shard_dirs])
+    RelinkJournal.write(out_dir / RelinkJournal.NAME, merged_header, entries)
+    counters, rows = rebuild_outputs(out_dir)
+    return counters, rows, missing
+
+def print_summary(counters, total):
+    """Print the per-outcome Summary block (each photo counted once in its primary outcome) to stderr."""
+    print("\nSummary:", file=sys.stderr)
+    print(f"  Relink commands (best):            {counters['relink_best']}", file=sys.stderr)
+    print(f"  Relink commands (alternate):       {counters['relink_alt']}", file=sys.stderr)
+    print(f"  Resolution mismatches (match):     {counters['resolution_match']}", file=sys.stderr)
+    print(f"  Resolution mismatches (alternate): {counters['resolution_alt']}", file=sys.stderr)
+    print(f"  Higher resolution matches:         {counters['higher_resolution']}", file=sys.stderr)
+    print(f"  Import other formats:              {counters['import_other_formats_primary']} photos", file=sys.stderr)
+    print(f"  Import higher res same format:     (see {IMPORT_SAME_FORMAT_CSV})", file=sys.stderr)
+    print(f"  Still missing:                     {counters['still_missing']}", file=sys.stderr)
+    total_primary = (counters['relink_best'] + counters['resolution_match']
+                     + counters['import_other_formats_primary'] + counters['still_missing'])
+    print(f"  (Total primary outcomes: {total_primary} / {total})", file=sys.stderr)
+
+def print_quarantine_report(quarantine, retry_quarantined):
+    """List the files quarantined or skipped as quarantined in this run, after the Summary."""
+    if not (quarantine.added or quarantine.skipped or quarantine.released or quarantine.struck):
+        return
+    print(f"  Quarantined files:                 {len(quarantine.added)} new, {len(quarantine.skipped)} skipped, "
+          f"{len(quarantine.released)} released, {len(quarantine.struck)} with strikes "
+          f"({quarantine.path})", file=sys.stderr)
+    listed = sorted({**quarantine.skipped, **quarantine.added}.items())
+    if not listed:
+        return
+    print("\nQuarantined files (exiftool timed out, crashed or repeatedly could not read them):", file=sys.stderr)
+    for path, reason in listed[:QUARANTINE_REPORT_LIMIT]:
+        state = "new" if path in quarantine.added else "skipped"
+        print(f"  [{reason}, {state}] {path}", file=sys.stderr)
+    if len(listed) > QUARANTINE_REPORT_LIMIT:
+        print(f"  ... and {len(listed) - QUARANTINE_REPORT_LIMIT} more", file=sys.stderr)
+    if quarantine.skipped and not retry_quarantined:
+        print("  Skipped files were not read again; use --retry-quarantined to try them.", file=sys.stderr)
+    print(f"  To clear the quarantine, delete {quarantine.path}.", file=sys.stderr)
+
+def _print_interrupt_resume(rows_done, journal_path, argv):
+    """Print how far the run got and a ready-to-paste --resume command to stderr."""
+    print(f"\n⚠️  Interrupted after completing {rows_done} row(s) in this run "
+          f"(recorded in {journal_path}).", file=sys.stderr)
+    parts = [arg for arg in argv if arg not in ("--append-outputs", "--resume")]
+    parts.append("--resume")
     print("Resume with:", file=sys.stderr)
     print("  " + " ".join(shlex.quote(p) for p in parts), file=sys.stderr)
 
+# Primary outcome of each processed row; every photo lands in exactly one.
+OUTCOME_RELINK = "relink"
+OUTCOME_RESOLUTION_MISMATCH = "resolution_mismatch"
+OUTCOME_OTHER_FORMATS = "import_other_formats"
+OUTCOME_STILL_MISSING = "still_missing"
+OUTCOME_EXCLUDED = "excluded"  # matched --exclude-targets; not counted in the summary
+
+def new_row_result(outcome=OUTCOME_STILL_MISSING):
+    """
+    Return an empty result for one CSV row.
+
+    A result holds everything the row contributes to the outputs: lines for
+    each .sh file, rows for the import CSVs and summary counter increments.
+    Rows are scored independently and their results written in CSV order.
+    """
+    return {
+        "outcome": outcome,
+        "relink": [],
+        "mismatch": [],
+        "higher_resolution": [],
+        "import_other_formats": [],
+        "import_same_format_higher_res": [],
+        "counters": Counter({"still_missing": 1}) if outcome == OUTCOME_STILL_MISSING else Counter(),
+    }
+
+def score_candidate(candidate, meta, target_time, csv_camera, original_path,
+                    allow_timezone_mismatches=False, debug=False, verbose_debug=False):
+    """Apply the time and camera rules to one candidate; return its score dict or None."""
+    if not meta:
+        if debug:
+            print(f"    [DEBUG] {candidate}: exiftool returned no data", file=sys.stderr)
+        return None
+    cand_time = parse_datetime(meta['DateTime'], verbose_debug=verbose_debug)
+    if not cand_time:
+        if debug:
+            print(f"    [DEBUG] {candidate}: could not parse candidate datetime: {meta['DateTime']}", file=sys.stderr)
+        return None
+    target_time_naive = target_time.replace(tzinfo=None)
+    cand_time_naive = cand_time.replace(tzinfo=None)
+    time_diff = abs(cand_time_naive - target_time_naive)
+    tz_adjusted = False
+    if time_diff > TIME_DELTA:
+        if allow_timezone_mismatches and timezone_offset_match(time_diff):
+            tz_adjusted = True
+            if debug:
+                total_mins = int(time_diff.total_seconds() / 60)
+                print(f"    [DEBUG] {candidate}: time diff {time_diff} accepted as timezone offset (~{total_mins} min)", file=sys.stderr)
+        else:
+            if debug:
+                print(f"    [DEBUG] {candidate}: time diff {time_diff} exceeds limit ({target_time} vs {cand_time})", file=sys.stderr)
+            return None
+    file_camera = meta['Camera Make'].strip().lower()
+    camera_ok = not csv_camera or not file_camera or csv_camera in file_camera or file_camera in csv_camera
+    if not camera_ok:
+        if debug:
+            print(f"    [DEBUG] {candidate}: camera mismatch (csv={csv_camera!r}, file={file_camera!r})", file=sys.stderr)
+        return None
+    if debug:
+        tz_note = " (timezone-adjusted)" if tz_adjusted else ""
+        print(f"    [DEBUG] {candidate}: PASS{tz_note} — time_diff={time_diff}, camera={file_camera!r}, size={meta['Width']}x{meta['Height']}", file=sys.stderr)
+    return {
+        'path': candidate,
+        'meta': meta,
+        'ext': Path(candidate).suffix.lower(),
+        'raw': is_raw_file(candidate),
+        'tz_adjusted': tz_adjusted,
+        'camera_score': 2 if csv_camera and file_camera and csv_camera == file_camera
+                        else 1 if csv_camera in file_camera or file_camera in csv_camera
+                        else 0,
+        'resolution': meta['Width'] * meta['Height'],
+        'same_volume': get_volume(candidate) == get_volume(original_path)
+    }
+
+def decide_row(original_path, target_w, target_h, scored, copy_across_volumes, debug=False):
+    """Choose the outputs for one missing photo from its scored candidates."""
+    result = new_row_result(outcome=None)
+    counters = result["counters"]
+    target_ext = Path(original_path).suffix.lower()
+
+    same_type_sorted = sorted(
+        [s for s in scored if s['ext'] == target_ext],
+        key=sort_key
+    )
+    other_type_sorted = sorted(
+        [s for s in scored if s['ext'] != target_ext],
+        key=sort_key
+    )
+
+    exact_matches = [s for s in same_type_sorted if s['meta']['Width'] == target_w and s['meta']['Height'] == target_h]
+    emitted_resolution_mismatch = False
+    decision_made = False
+
+    if debug:
+        print(
+            f"  scored={len(scored)}, same_type={len(same_type_sorted)}, "
+            f"other_type={len(other_type_sorted)}, exact_matches={len(exact_matches)}",
+            file=sys.stderr
+        )
+
+    if len(exact_matches) == 1:
+        cmd = make_link_or_copy_command(exact_matches[0]['path'], original_path, copy_across_volumes)
+        result["relink"].append(cmd)
+        counters["relink_best"] += 1
+        result["outcome"] = OUTCOME_RELINK
+        decision_made = True
+        # Check for same-extension candidates with higher resolution than the exact match
+        best_res = exact_matches[0]['resolution']
+        for rank, candidate in enumerate(
+            s for s in same_type_sorted if s['resolution'] > best_res
+        ):
+            result["import_same_format_higher_res"].append({
+                "missing_file": original_path,
+                "matched_file": str(exact_matches[0]['path']),
+                "new_file": str(candidate["path"]),
+                "lr_width": target_w,
+                "lr_height": target_h,
+                "matched_width": exact_matches[0]['meta']['Width'],
+                "matched_height": exact_matches[0]['meta']['Height'],
+                "new_width": candidate["meta"]["Width"],
+                "new_height": candidate["meta"]["Height"],
+                "rank": rank,
+            })
+    elif len(exact_matches) > 1:
+        sorted_matches = sorted(exact_matches, key=sort_key)
+        best = sorted_matches[0]
+        cmd = make_link_or_copy_command(best['path'], original_path, copy_across_volumes)
+        result["relink"].append(f'# Selected best match from {len(sorted_matches)} candidates: {format_candidate_meta(best)}')
+        result["relink"].append(cmd)
+        counters["relink_best"] += 1
+        for alt in sorted_matches[1:]:
+            result["relink"].append(f'# Alt: {alt["path"]} ({alt["meta"]["Width"]}x{alt["meta"]["Height"]}, {alt["meta"]["Camera Make"]})')
+            counters["relink_alt"] += 1
+        result["outcome"] = OUTCOME_RELINK
+        decision_made = True
+        # Check for same-extension candidates with higher resolution than the best exact match
+        best_res = best['resolution']
+        for rank, candidate in enumerate(
+            s for s in same_type_sorted if s['resolution'] > best_res
+        ):
+            result["import_same_format_higher_res"].append({
+                "missing_file": original_path,
+                "matched_file": str(best['path']),
+                "new_file": str(candidate["path"]),
+                "lr_width": target_w,
+                "lr_height": target_h,
+                "matched_width": best['meta']['Width'],
+                "matched_height": best['meta']['Height'],
+                "new_width": candidate["meta"]["Width"],
+                "new_height": candidate["meta"]["Height"],
+                "rank": rank,
+            })
+    elif same_type_sorted:
+        best = same_type_sorted[0]
+        _add_resolution_mismatch(result, best, same_type_sorted[1:], original_path,
+                                 target_w, target_h, copy_across_volumes)
+        emitted_resolution_mismatch = True
+        decision_made = True
+        higher_res_other_formats = [
+            s for s in other_type_sorted
+            if s['resolution'] > best['resolution']
+        ]
+        for rank, candidate in enumerate(higher_res_other_formats):
+            result["import_other_formats"].append({
+                "missing_file": original_path,
+                "new_file": str(candidate["path"]),
+                "missing_width": target_w,
+                "missing_height": target_h,
+                "new_width": candidate["meta"]["Width"],
+                "new_height": candidate["meta"]["Height"],
+                "rank": rank,
+            })
+    elif other_type_sorted:
+        for rank, candidate in enumerate(other_type_sorted):
+            result["import_other_formats"].append({
+                "missing_file": original_path,
+                "new_file": str(candidate["path"]),
+                "missing_width": target_w,
+                "missing_height": target_h,
+                "new_width": candidate["meta"]["Width"],
+                "new_height": candidate["meta"]["Height"],
+                "rank": rank,
+            })
+        counters["import_other_formats_primary"] += 1
+        result["outcome"] = OUTCOME_OTHER_FORMATS
+        decision_made = True
+
+    # Defensive guard: if same-type candidates exist and no exact match exists,
+    # resolution mismatch output must not be skipped.
+    if same_type_sorted and not exact_matches and not emitted_resolution_mismatch:
+        _add_resolution_mismatch(result, same_type_sorted[0], same_type_sorted[1:], original_path,
+                                 target_w, target_h, copy_across_volumes)
+        decision_made = True
+        if debug:
+            print("  [DEBUG] Fallback guard emitted resolution mismatch entry.", file=sys.stderr)
+    if not decision_made:
+        if debug:
+            print(f"  → no scored candidates passed filters", file=sys.stderr)
+        result["outcome"] = OUTCOME_STILL_MISSING
+        counters["still_missing"] += 1
+    return result
+
+def _add_resolution_mismatch(result, best, alternates, original_path, target_w, target_h, copy_across_volumes):
+    cmd = make_link_or_copy_command(best['path'], original_path, copy_across_volumes)
+    higher_res_tag = " HIGHER_RESOLUTION" if best['resolution'] > target_w * target_h else ""
+    comment = f'# Resolution mismatch{higher_res_tag} (LR:{target_w}x{target_h}): {original_path} -> {format_candidate_meta(best)}'
+    result["mismatch"] += [comment, cmd]
+    if higher_res_tag:
+        result["higher_resolution"] += [comment, cmd]
+        result["counters"]["higher_resolution"] += 1
+    result["counters"]["resolution_match"] += 1
+    for alt in alternates:
+        result["mismatch"].append(f'# Alt: {alt["path"]} ({alt["meta"]["Width"]}x{alt["meta"]["Height"]}, {alt["meta"]["Camera Make"]})')
+        result["counters"]["resolution_alt"] += 1
+    result["outcome"] = OUTCOME_RESOLUTION_MISMATCH
+
+def ordered_map(func, items, executor=None, max_in_flight=1):
+    """
+    Yield ``func(*item)`` for each item, in input order.
+
+    With an executor, up to ``max_in_flight`` items run concurrently but
+    results are still yielded strictly in order, so outputs written from
+    them are identical to a serial run.
+    """
+    if executor is None:
+        for item in items:
+            yield func(*item)
+        return
+    in_flight = deque()
+    for item in items:
+        in_flight.append(executor.submit(func, *item))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
 def main(csv_filename, search_root=None, test_n=None, exclude_sources=None,
          exclude_targets=None, use_mdfind=False, copy_across_volumes=False,
          output_dir=None, skip_rows=0, rows_to_process=None,
          append_outputs=False, debug=False, allow_timezone_mismatches=False,
-         verbose_debug=False):
+         verbose_debug=False, exiftool_workers=None, prefetch_rows=DEFAULT_PREFETCH_ROWS,
+         metadata_cache_path=None, jobs=1, native_exif=False,
+         index_workers=DEFAULT_INDEX_WORKERS, index_file=None, stats_json=None, resume=False,
+         shard=None, filename_index=None, async_lookups=0, quarantine_path=None,
+         retry_quarantined=False, quarantine_strikes=None, per_volume_reads=0, volume_order="inode"):
+
+    STATS.reset()
+    run_started = time.monotonic()
+    run_started_at = datetime.now().isoformat(timespec="seconds")
 
     out_dir = Path(output_dir) if output_dir else Path(".")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    relink_path = out_dir / "relink_good_matches.sh"
-    mismatch_path = out_dir / "resolution_mismatch.sh"
-    higher_resolution_path = out_dir / "higher_resolution.sh"
-    still_missing_path = out_dir / "Still_Missing_Photos.csv"
-    import_other_formats_path = out_dir / "import_other_formats.csv"
-    import_same_format_higher_res_path = out_dir / "import_same_format_higher_resolution.csv"
+    relink_path = out_dir / RELINK_SCRIPT
+    mismatch_path = out_dir / MISMATCH_SCRIPT
+    higher_resolution_path = out_dir / HIGHER_RESOLUTION_SCRIPT
+    still_missing_path = out_dir / STILL_MISSING_CSV
+    import_other_formats_path = out_dir / IMPORT_OTHER_FORMATS_CSV
+    import_same_format_higher_res_path = out_dir / IMPORT_SAME_FORMAT_CSV
 
     try:
-        missing_photos_df = pd.read_csv(csv_filename)
+        csv_file, csv_reader = open_missing_csv(csv_filename)
     except Exception as e:
         print(f"Error reading CSV file: {e}", file=sys.stderr)
         sys.exit(1)
+    csv_columns = csv_reader.fieldnames
+
+    # --resume: rows already in the journal are skipped, whatever order they
+    # were finished in, and the outputs are regenerated from the journal so
+    # they hold exactly those rows before new ones are appended.
+    journal_path = out_dir / RelinkJournal.NAME
+    done_rows = set()
+    if resume and journal_path.exists():
+        try:
+            journal_header, journal_entries = RelinkJournal.read(journal_path)
+        except ValueError as e:
+            print(f"Error: cannot resume: {e}", file=sys.stderr)
+            sys.exit(1)
+        if journal_header["csv"] != str(Path(csv_filename).resolve()):
+            print(f"Error: cannot resume: {journal_path} records a run over {journal_header['csv']}, "
+                  f"not {csv_filename}.", file=sys.stderr)
+            sys.exit(1)
+        if journal_header.get("shard") != format_shard(shard):
+            print(f"Error: cannot resume: {journal_path} records shard {journal_header.get('shard') or '(none)'}, "
+                  f"not {format_shard(shard) or '(none)'}.", file=sys.stderr)
+            sys.exit(1)
+        done_rows = set(journal_entries)
+        rebuild_outputs(out_dir)
+        print(f"Resuming: {len(done_rows)} row(s) already completed according to {journal_path}\n",
+              file=sys.stderr)
+    elif resume:
+        print(f"No journal in {out_dir}; starting from the beginning.\n", file=sys.stderr)
+    append_outputs = append_outputs or bool(done_rows)
 
-    # Apply row windowing
-    if skip_rows:
-        missing_photos_df = missing_photos_df.iloc[skip_rows:]
-    if rows_to_process is not None:
-        missing_photos_df = missing_photos_df.iloc[:rows_to_process]
+    # Capture times are normalized for the whole window up front, so bad
+    # values are reported before any work starts and the row loop only
+    # compares integers.
+    with STATS.timer("prescan_csv"):
+        capture_times, unparseable, stem_rows = prescan_missing_csv(csv_filename, skip_rows, rows_to_process,
+                                                                    done=done_rows, shard=shard)
+    if shard is None:
+        total = sum(1 for data_row in range(skip_rows, skip_rows + len(capture_times)) if data_row not in done_rows)
+    else:
+        total = sum(stem_rows.values())
+        print(f"Shard {format_shard(shard)}: {total} row(s) of this CSV belong to this shard.\n", file=sys.stderr)
+    if unparseable:
+        print(f"⚠️ {len(unparseable)} row(s) have a capture time that cannot be parsed; "
+              f"they will be listed as still missing:", file=sys.stderr)
+        for data_row, value in unparseable[:20]:
+            print(f"    row {data_row}: {value!r}", file=sys.stderr)
+        if len(unparseable) > 20:
+            print(f"    ... and {len(unparseable) - 20} more", file=sys.stderr)
+        print(file=sys.stderr)
+    STATS.count("capture_times_unparseable", len(unparseable))
 
+    # Rows are streamed as (data row, row, capture seconds); --skip-rows and
+    # --rows-to-process are applied while reading.
+    missing_rows = zip(count(skip_rows), window_rows(csv_reader, skip_rows, rows_to_process), capture_times)
+    if done_rows or shard is not None:
+        missing_rows = (item for item in missing_rows
+                        if item[0] not in done_rows and in_shard(item[1]['Photo'], shard))
     if test_n is not None:
         print(f"Running test mode with {test_n} random entries...", file=sys.stderr)
-        missing_photos_df = missing_photos_df.sample(n=min(test_n, len(missing_photos_df)))
+        missing_rows = sample_rows(missing_rows, test_n)
+        csv_file.close()
+        total = len(missing_rows)
+        stem_rows = Counter(Path(row['Photo']).stem.lower() for _, row, _ in missing_rows)
 
-    # Build full-tree index only when not using mdfind
-    if not use_mdfind:
-        if search_root is None:
-            print("Error: --search-root is required unless --mdfind is specified.", file=sys.stderr)
+    # exiftool time limits adapt to observed latency; files that time out,
+    # crash exiftool or repeatedly cannot be read are quarantined so later
+    # runs do not wait on them again.
+    exiftool_timeouts = ExiftoolTimeouts()
+    quarantine = ExiftoolQuarantine(quarantine_path or out_dir / QUARANTINE_FILE, strikes=quarantine_strikes)
+    async_runner = (AsyncLookups(async_lookups, verbose_debug=verbose_debug, timeouts=exiftool_timeouts)
+                    if async_lookups else None)
+
+    # Candidate discovery: a prebuilt --filename-index, Spotlight, or a walk
+    # of --search-root into memory.
+    if filename_index:
+        candidate_backend = FilenameIndex(filename_index, search_root, exclude_sources)
+        roots = candidate_backend.roots()
+        if not roots or (search_root is not None and not candidate_backend.covers(search_root)):
+            print(f"Error: {search_root or 'nothing'} is not indexed in {filename_index}; add it with: "
+                  f"relink_missing_photos.py build-filename-index {filename_index} ROOT", file=sys.stderr)
             sys.exit(1)
-        file_index = index_files_by_stem(search_root, exclude_sources or [])
+        print(f"Using filename index {filename_index}:", file=sys.stderr)
+        for root, (_, indexed_at, files) in roots.items():
+            print(f"  {root}: {files} files, indexed {indexed_at}", file=sys.stderr)
+        print(file=sys.stderr)
+    elif use_mdfind:
+        candidate_backend = MdfindBackend(search_root, exclude_sources, verbose_debug=verbose_debug)
     else:
-        file_index = None  # candidates fetched per-stem via mdfind
+        if search_root is None:
+            print("Error: --search-root is required unless --mdfind or --filename-index is specified.",
+                  file=sys.stderr)
+            sys.exit(1)
+        with STATS.timer("index_build"):
+            candidate_backend = StemIndexBackend(search_root, exclude_sources or [], workers=index_workers,
+                                                 index_file=index_file)
+
+    # Metadata backend: persistent exiftool workers, or one process per request
+    # when exiftool_workers is 0 (the original behaviour, kept for comparison).
+    # With --async-lookups, one-shot exiftool processes run side by side on
+    # the event loop instead, unless --exiftool-workers asks for a pool.
+    if exiftool_workers is None:
+        exiftool_workers = 0 if async_runner is not None else max(jobs, 1)
+    exiftool_pool = None
+    per_call_stats = {"lookups": 0, "seconds": 0.0}
+    per_call_lock = threading.Lock()
+    if exiftool_workers > 0:
+        print(f"Starting {exiftool_workers} persistent exiftool worker(s)...", file=sys.stderr)
+        exiftool_pool = ExiftoolPool(size=exiftool_workers, verbose_debug=verbose_debug, timeouts=exiftool_timeouts)
+        print(f"  exiftool workers ready in {exiftool_pool.startup_seconds:.2f}s\n", file=sys.stderr)
+
+    metadata_cache = MetadataCache(metadata_cache_path) if metadata_cache_path else None
+    volume_scheduler = VolumeScheduler(per_volume_reads, volume_order) if per_volume_reads else None
+
+    native_stats = Counter()  # files read by read_exif_header vs. handed to exiftool
+
+    def read_metadata_batch(paths):
+        if metadata_cache is None:
+            return read_metadata_uncached(paths)
+        with STATS.timer("metadata_cache_lookup"):
+            found, missing = metadata_cache.get_many(paths)
+        if missing:
+            fresh = read_metadata_uncached(missing)
+            metadata_cache.put_many(fresh)
+            found.update(fresh)
+        return found
+
+    def read_metadata_uncached(paths):
+        if not native_exif:
+            return read_metadata_exiftool(paths)
+        found = {}
+        fallback = []
+        for path in paths:
+            with STATS.timer("native_exif_header"):
+                meta = read_exif_header(path)
+            if meta is None:
+                fallback.append(path)
+            else:
+                found[str(path)] = meta
+        native_stats.update(native=len(found), fallback=len(fallback))
+        if fallback:
+            found.update(read_metadata_exiftool(fallback))
+        return found
+
+    def read_metadata_exiftool(paths):
+        """Read paths with exiftool, leaving out (or, with --retry-quarantined, re-reading) quarantined files."""
+        clear, held, struck = quarantine.split(paths)
+        STATS.count("quarantine_skipped", 0 if retry_quarantined else len(held))
+        found = read_metadata_exiftool_batches(clear) if clear else {}
+        retry = held if retry_quarantined else []
+        if retry:
+            # Known troublemakers go last, one per request, so they cannot
+            # hold up a batch of good files.
+            found.update(read_metadata_exiftool_batches(retry, batch_size=1))
+        failed = {str(path): ("timeout" if str(path) in exiftool_timeouts.timed_out
+                              else "crash" if str(path) in exiftool_timeouts.crashed else "unreadable")
+                  for path in [*clear, *retry] if str(path) not in found}
+        if failed:
+            quarantine.add(failed)
+            STATS.count("quarantine_failures", len(failed))
+        released = [path for path in [*retry, *struck] if str(path) in found]
+        if released:
+            quarantine.release(released)
+        return found
+
+    def read_metadata_exiftool_batches(paths, batch_size=EXIFTOOL_BATCH_SIZE):
+        STATS.observe("exiftool_request_files", len(paths))
+        with STATS.timer("exiftool"):
+            if exiftool_pool is not None:
+                return exiftool_pool.get_exif_data_batch(paths, batch_size=batch_size)
+            if async_runner is not None:
+                return async_runner.get_exif_data_batch(paths, batch_size=batch_size)
+            started = time.monotonic()
+            try:
+                found = {}
+                for i in range(0, len(paths), batch_size):
+                    found.update(get_exif_data_exiftool_batch(paths[i:i + batch_size], verbose_debug=verbose_debug,
+                                                              timeouts=exiftool_timeouts))
+                return found
+            finally:
+                with per_call_lock:
+                    per_call_stats["lookups"] += len(paths)
+                    per_call_stats["seconds"] += time.monotonic() - started
+
+    def find_candidates(stem):
+        with STATS.timer("candidate_lookup"):
+            return candidate_backend.find(stem)
+
+    def find_candidates_many(stems):
+        """Return ``{stem: candidates}``; --async-lookups runs the mdfind queries side by side."""
+        if async_runner is not None and use_mdfind:
+            with STATS.timer("candidate_lookup_batch"):
+                return async_runner.find_candidates_mdfind(stems, search_root, exclude_sources)
+        return {stem: find_candidates(stem) for stem in stems}
+
+    # Stem groups: rows whose files share a stem (IMG_0001, DSC_1234, ...)
+    # share one candidate lookup and one metadata read.  Groups are loaded
+    # for the stems of the next `prefetch_rows` rows at a time, in a few
+    # large exiftool requests, and kept until the last row with that stem
+    # (counted by the prescan) has been written — so a stem that recurs all
+    # through the CSV is looked up and read only once.  Groups are loaded
+    # and dropped on the main thread; --jobs workers only read them.
+    groups = {}  # stem -> {"candidates": [Path], "metadata": {str(path): meta or None}}
+    stem_rows_left = stem_rows
+
+    def row_stem(row):
+        return Path(row['Photo']).stem.lower()
+
+    def needs_group(row, capture):
+        """False for rows that will be excluded or lack the data to be scored."""
+        if exclude_targets and any(excl in row['Photo'] for excl in exclude_targets):
+            return False
+        if capture in (NO_CAPTURE_TIME, UNPARSEABLE_CAPTURE_TIME):
+            return False
+        return not (is_blank(row.get("Width")) or is_blank(row.get("Height")))
+
+    def load_groups(rows):
+        with STATS.timer("load_stem_groups"):
+            _load_groups(rows)
+
+    def _load_groups(rows):
+        stems = {}  # new stems, in row order
+        for _, row, capture in rows:
+            if not needs_group(row, capture):
+                continue
+            stem = row_stem(row)
+            if stem not in groups:
+                stems[stem] = None
+        new = find_candidates_many(stems)  # stem -> candidates
+        paths = list(dict.fromkeys(str(c) for cands in new.values() for c in cands))
+        found = {}
+        if paths:
+            if debug:
+                print(f"\n[DEBUG] Reading metadata for {len(paths)} candidates of {len(new)} new stems "
+                      f"({len(rows)} rows)", file=sys.stderr)
+            if volume_scheduler is not None:
+                found = volume_scheduler.run(paths, read_metadata_batch)
+            else:
+                found = read_metadata_batch(paths)
+        for stem, candidates in new.items():
+            groups[stem] = {"candidates": candidates,
+                            "metadata": {str(c): found.get(str(c)) for c in candidates}}
+        STATS.count("stem_groups_loaded", len(new))
+
+    def release_group(row):
+        stem = row_stem(row)
+        stem_rows_left[stem] -= 1
+        if stem_rows_left[stem] <= 0:
+            groups.pop(stem, None)
+            del stem_rows_left[stem]
+
+    def read_metadata(candidate, group):
+        key = str(candidate)
+        if key not in group["metadata"]:
+            group["metadata"][key] = read_metadata_batch([key]).get(key)
+        return group["metadata"][key]
+
+    def evaluate_row(i, data_row, row, capture, group):
+        """Score one CSV row.  Touches no shared output state, so rows can run concurrently."""
+        original_path = row['Photo']
+        if exclude_targets and any(excl in original_path for excl in exclude_targets):
+            result = new_row_result(OUTCOME_EXCLUDED)
+            result.update(index=i, data_row=data_row, row=row)
+            return result
+
+        filename = Path(original_path).name
+        stem = Path(filename).stem.lower()
+
+        if debug:
+            print(f"\n[DEBUG] Row {i}: {original_path}", file=sys.stderr)
+            print(f"  stem={stem}", file=sys.stderr)
+
+        if group is not None:
+            candidates = group["candidates"]
+        else:
+            candidates = find_candidates(stem)  # row cannot be scored; only its candidates are reported
+
+        STATS.observe("candidates_per_row", len(candidates))
+        if debug:
+            print(f"  candidates found={len(candidates)}", file=sys.stderr)
+
+        result = new_row_result()
+        result.update(index=i, data_row=data_row, row=row)
+        if not candidates:
+            if debug:
+                print(f"  → no candidates found", file=sys.stderr)
+            return result
+
+        if capture == NO_CAPTURE_TIME or is_blank(row.get("Width")) or is_blank(row.get("Height")):
+            if debug:
+                print(f"  → missing metadata in CSV row (date/width/height)", file=sys.stderr)
+            return result
+
+        if capture == UNPARSEABLE_CAPTURE_TIME:
+            if debug:
+                print(f"  → could not parse target datetime: {row.get(CAPTURE_COLUMN)}", file=sys.stderr)
+            return result
+        target_time = capture_datetime(capture)
+
+        csv_camera = str(row.get('Camera Make') or '').strip().lower()
+        target_w = csv_int(row['Width'])
+        target_h = csv_int(row['Height'])
+
+        scored = []
+        for c in candidates:
+            meta = read_metadata(c, group)
+            with STATS.timer("score_candidate"):
+                s = score_candidate(c, meta, target_time, csv_camera, original_path,
+                                    allow_timezone_mismatches=allow_timezone_mismatches,
+                                    debug=debug, verbose_debug=verbose_debug)
+            if s:
+                scored.append(s)
+        STATS.observe("scored_candidates_per_row", len(scored))
+        with STATS.timer("decide_row"):
+            result = decide_row(original_path, target_w, target_h, scored, copy_across_volumes, debug=debug)
+        result.update(index=i, data_row=data_row, row=row)
+        return result
+
+    def rows_with_groups():
+        rows = iter(missing_rows)
+        i = 0
+        while True:
+            chunk = list(islice(rows, max(prefetch_rows, 1)))
+            if not chunk:
+                return
+            load_groups(chunk)
+            for data_row, row, capture in chunk:
+                i += 1
+                group = groups.get(row_stem(row))
+                if group is not None and needs_group(row, capture):
+                    STATS.count("stem_group_rows")
+                yield i, data_row, row, capture, group
 
     still_missing = []
     import_other_formats = []
@@ -287,61 +2830,31 @@ def main(csv_filename, search_root=None, test_n=None, exclude_sources=None,
     csv_headers_written = False
 
     # Separate counters for meaningful summary (each photo counted once in primary category)
-    relink_best_count = 0
-    relink_alt_count = 0
-    resolution_match_count = 0
-    resolution_alt_count = 0
-    import_other_formats_primary_count = 0
-    higher_resolution_count = 0
-    still_missing_count = 0
-
-    total = len(missing_photos_df)
+    counters = Counter()
+
     print(f"Processing {total} rows...\n", file=sys.stderr)
 
-    last_completed_row = skip_rows  # absolute CSV data row of the last finished row
+    rows_done = 0  # rows finished in this run
 
     def flush_csv_outputs():
+        with STATS.timer("flush_csv_outputs"):
+            _flush_csv_outputs()
+
+    def _flush_csv_outputs():
         """Append buffered CSV rows to disk and clear the in-memory buffers."""
         nonlocal still_missing, import_other_formats, import_same_format_higher_res, csv_headers_written
+        append = csv_headers_written or append_outputs
 
-        still_missing_df = pd.DataFrame(still_missing)
-        if not still_missing_df.empty:
-            if csv_headers_written and still_missing_path.exists():
-                still_missing_df.to_csv(still_missing_path, mode="a", index=False, header=False)
-            elif append_outputs and still_missing_path.exists():
-                still_missing_df.to_csv(still_missing_path, mode="a", index=False, header=False)
-            else:
-                still_missing_df.to_csv(still_missing_path, index=False)
-            still_missing = []
+        append_csv_rows(still_missing_path, csv_columns,
+                        still_missing, append)
+        still_missing = []
 
-        import_other_formats_df = pd.DataFrame(
-            import_other_formats,
-            columns=["missing_file", "new_file", "missing_width", "missing_height", "new_width", "new_height", "rank"],
-        )
-        if not import_other_formats_df.empty:
-            if csv_headers_written and import_other_formats_path.exists():
-                import_other_formats_df.to_csv(import_other_formats_path, mode="a", index=False, header=False)
-            elif append_outputs and import_other_formats_path.exists():
-                import_other_formats_df.to_csv(import_other_formats_path, mode="a", index=False, header=False)
-            else:
-                import_other_formats_df.to_csv(import_other_formats_path, index=False)
-            import_other_formats = []
-
-        import_same_format_higher_res_df = pd.DataFrame(
-            import_same_format_higher_res,
-            columns=["missing_file", "matched_file", "new_file",
-                     "lr_width", "lr_height",
-                     "matched_width", "matched_height",
-                     "new_width", "new_height", "rank"],
-        )
-        if not import_same_format_higher_res_df.empty:
-            if csv_headers_written and import_same_format_higher_res_path.exists():
-                import_same_format_higher_res_df.to_csv(import_same_format_higher_res_path, mode="a", index=False, header=False)
-            elif append_outputs and import_same_format_higher_res_path.exists():
-                import_same_format_higher_res_df.to_csv(import_same_format_higher_res_path, mode="a", index=False, header=False)
-            else:
-                import_same_format_higher_res_df.to_csv(import_same_format_higher_res_path, index=False)
-            import_same_format_higher_res = []
+        append_csv_rows(import_other_formats_path, IMPORT_OTHER_FORMATS_COLUMNS, import_other_formats, append)
+        import_other_formats = []
+
+        append_csv_rows(import_same_format_higher_res_path, IMPORT_SAME_FORMAT_COLUMNS,
+                        import_same_format_higher_res, append)
+        import_same_format_higher_res = []
 
         csv_headers_written = True
 
@@ -349,292 +2862,419 @@ def main(csv_filename, search_root=None, test_n=None, exclude_sources=None,
     relink_file = open_output(relink_path, append_outputs)
     mismatch_file = open_output(mismatch_path, append_outputs)
     higher_resolution_file = open_output(higher_resolution_path, append_outputs)
+    journal = RelinkJournal(out_dir, csv_filename, csv_columns, append_outputs, shard)
+
+    def emit(result):
+        """Write one row's result.  Called in CSV row order, whatever order rows were scored in."""
+        nonlocal rows_done
+        relink_file.writelines(line + "\n" for line in result["relink"])
+        mismatch_file.writelines(line + "\n" for line in result["mismatch"])
+        higher_resolution_file.writelines(line + "\n" for line in result["higher_resolution"])
+        if result["outcome"] == OUTCOME_STILL_MISSING:
+            still_missing.append(result["row"])
+        import_other_formats.extend(result["import_other_formats"])
+        import_same_format_higher_res.extend(result["import_same_format_higher_res"])
+        counters.update(result["counters"])
+        STATS.count(f"rows_{result['outcome']}")
+        release_group(result["row"])
+        journal.record(result)
+
+        i = result["index"]
+        rows_done = i
+        if i % 100 == 0 or i == total:
+            print(f"Processed {i}/{total} rows...", file=sys.stderr)
+            relink_file.flush()
+            mismatch_file.flush()
+            higher_resolution_file.flush()
+            flush_csv_outputs()
+
+    # With --jobs, rows are scored on a thread pool (each mostly waits on
+    # exiftool or mdfind) and emitted strictly in CSV order.
+    def timed_evaluate_row(i, data_row, row, capture, group):
+        with STATS.timer("evaluate_row"):
+            return evaluate_row(i, data_row, row, capture, group)
+
+    def exiftool_report():
+        """Return ``(lookups, seconds, backend description)`` for the metadata backend."""
+        if exiftool_pool is not None:
+            return (exiftool_pool.lookups, exiftool_pool.lookup_seconds,
+                    f"{len(exiftool_pool.workers)} persistent worker(s), "
+                    f"startup {exiftool_pool.startup_seconds:.2f}s, "
+                    f"{exiftool_pool.restarts} restart(s)")
+        if async_runner is not None:
+            return (async_runner.lookups, async_runner.lookup_seconds,
+                    f"asyncio, up to {async_runner.limit} at once, {async_runner.timed_out_calls} timeout(s)")
+        return per_call_stats["lookups"], per_call_stats["seconds"], "one process per request"
+
+    def write_stats_json(status):
+        """Write the --stats-json report; called once at exit or on interrupt."""
+        lookups, seconds, backend = exiftool_report()
+        report = {
+            "status": status,
+            "started": run_started_at,
+            "elapsed_seconds": round(time.monotonic() - run_started, 3),
+            "argv": sys.argv,
+            "rows": {"total": total, "processed": rows_done, "resumed_from_journal": len(done_rows)},
+            "shard": format_shard(shard),
+            "summary": dict(counters),
+            "exiftool": {"lookups": lookups, "seconds": round(seconds, 3), "backend": backend},
+        }
+        if native_exif:
+            report["native_exif"] = dict(native_stats)
+        if metadata_cache is not None:
+            report["metadata_cache"] = {"hits": metadata_cache.hits, "misses": metadata_cache.misses}
+        report["quarantine"] = {"added": len(quarantine.added), "skipped": len(quarantine.skipped),
+                                "released": len(quarantine.released), "struck": len(quarantine.struck),
+                                "timeouts": len(exiftool_timeouts.timed_out),
+                                "crashes": len(exiftool_timeouts.crashed)}
+        if volume_scheduler is not None:
+            report["volumes"] = [{"volume": name, "files": files, "requests": requests, "seconds": round(seconds, 3)}
+                                 for name, files, requests, seconds in volume_scheduler.report()]
+        report["memory"] = {"peak_rss_bytes": peak_rss_bytes()}
+        if isinstance(candidate_backend, StemIndexBackend):
+            report["memory"].update(index_bytes=candidate_backend.index.nbytes(),
+                                    index_files=candidate_backend.index.files,
+                                    index_stems=len(candidate_backend.index))
+        report.update(STATS.report())
+        path = Path(stats_json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(report, indent=2) + "\n")
+        os.replace(tmp, path)
+        print(f"Stats written to {path}", file=sys.stderr)
 
+    executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
     try:
-        for i, (_, row) in enumerate(missing_photos_df.iterrows(), 1):
-            original_path = row['Photo']
-            if exclude_targets and any(excl in original_path for excl in exclude_targets):
-                continue
+        for result in ordered_map(timed_evaluate_row, rows_with_groups(), executor, max_in_flight=jobs * 4):
+            emit(result)
 
-            filename = Path(original_path).name
-            stem = Path(filename).stem.lower()
-            target_ext = Path(filename).suffix.lower()
+    except KeyboardInterrupt:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if exiftool_pool is not None:
+                exiftool_pool.kill()  # unblock rows still waiting on exiftool
+        relink_file.flush()
+        mismatch_file.flush()
+        higher_resolution_file.flush()
+        flush_csv_outputs()
+        _print_interrupt_resume(rows_done, journal.path, sys.argv)
+        if stats_json:
+            write_stats_json("interrupted")
+        sys.exit(130)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        relink_file.close()
+        mismatch_file.close()
+        higher_resolution_file.close()
+        if exiftool_pool is not None:
+            exiftool_pool.close()
+        if metadata_cache is not None:
+            metadata_cache.close()
+        candidate_backend.close()
+        csv_file.close()
+        journal.close()
+        quarantine.close()
 
-            if debug:
-                print(f"\n[DEBUG] Row {i}: {original_path}", file=sys.stderr)
-                print(f"  stem={stem}", file=sys.stderr)
+    # Final flush for any remaining buffered CSV rows
+    flush_csv_outputs()
 
-            if use_mdfind:
-                candidates = find_candidates_mdfind(stem, search_root, exclude_sources, verbose_debug=verbose_debug)
-            else:
-                candidates = file_index.get(stem, [])
+    if done_rows:
+        # Earlier runs may have finished rows in any order; put the outputs
+        # back in CSV order and report on everything the journal holds.
+        counters, total = rebuild_outputs(out_dir)
+        print(f"\nOutputs rebuilt from {journal.path} "
+              f"({len(done_rows)} row(s) from earlier runs, {rows_done} from this run).", file=sys.stderr)
 
-            if debug:
-                print(f"  candidates found={len(candidates)}", file=sys.stderr)
-
-            if not candidates:
-                if debug:
-                    print(f"  → no candidates found", file=sys.stderr)
-                still_missing.append(row)
-                still_missing_count += 1
-                last_completed_row = skip_rows + i
-                continue
+    print_summary(counters, total)
+    lookups, seconds, backend = exiftool_report()
+    rate = f"{lookups / seconds:.1f}/s" if seconds > 0 else "n/a"
+    print(f"  exiftool lookups:                  {lookups} in {seconds:.1f}s ({rate}; {backend})", file=sys.stderr)
+    if native_exif:
+        print(f"  Native EXIF header reads:          {native_stats['native']} "
+              f"({native_stats['fallback']} fell back to exiftool)", file=sys.stderr)
+    if metadata_cache is not None:
+        print(f"  Metadata cache:                    {metadata_cache.hits} hits, {metadata_cache.misses} misses "
+              f"({metadata_cache.path})", file=sys.stderr)
+    if volume_scheduler is not None:
+        for name, files, requests, seconds in volume_scheduler.report():
+            rate = f"{files / seconds:.1f} files/s" if seconds > 0 else "n/a"
+            print(f"  Volume {name}: {files} files in {requests} request(s), {seconds:.1f}s busy ({rate})",
+                  file=sys.stderr)
+    print_quarantine_report(quarantine, retry_quarantined)
+    if stats_json:
+        write_stats_json("completed")
+    print(f"\nDone. Outputs written to: {out_dir}/")
+
+def cmd_prune_metadata_cache(argv):
+    parser = argparse.ArgumentParser(
+        prog="relink_missing_photos.py prune-metadata-cache",
+        description="Remove --metadata-cache entries whose files no longer exist.",
+    )
+    parser.add_argument("cache", help="Path to the SQLite metadata cache.")
+    args = parser.parse_args(argv)
+    if not Path(args.cache).exists():
+        print(f"Error: metadata cache not found: {args.cache}", file=sys.stderr)
+        sys.exit(1)
+    cache = MetadataCache(args.cache)
+    try:
+        removed, total = cache.prune()
+        cache.conn.execute("VACUUM")
+    finally:
+        cache.close()
+    print(f"Pruned {removed} of {total} entries from {args.cache}", file=sys.stderr)
 
-            if pd.isna(row.get("Date/Time Original (Capture)")) or pd.isna(row.get("Width")) or pd.isna(row.get("Height")):
-                if debug:
-                    print(f"  → missing metadata in CSV row (date/width/height)", file=sys.stderr)
-                still_missing.append(row)
-                still_missing_count += 1
-                last_completed_row = skip_rows + i
+def cmd_check_native_exif(argv):
+    parser = argparse.ArgumentParser(
+        prog="relink_missing_photos.py check-native-exif",
+        description="Compare the built-in EXIF header reader (--native-exif) with exiftool "
+                    "on a set of files and report every disagreement.",
+    )
+    parser.add_argument("paths", nargs="+", help="Files or directories (searched recursively).")
+    parser.add_argument("--show-matches", action="store_true", help="Also list files where both agree.")
+    args = parser.parse_args(argv)
+    ensure_exiftool_available()
+
+    files = []
+    for p in args.paths:
+        if os.path.isdir(p):
+            for root, _, names in os.walk(p):
+                files += [os.path.join(root, n) for n in sorted(names)
+                          if Path(n).suffix.lower() in NATIVE_EXIF_EXTENSIONS]
+        else:
+            files.append(p)
+
+    counts = Counter()
+    with ExiftoolPool(size=1) as pool:
+        expected = pool.get_exif_data_batch(files)
+        for path in files:
+            native = read_exif_header(path)
+            reference = expected.get(str(path))
+            if native is None:
+                counts["fallback"] += 1
+                continue
+            if reference is None:
+                counts["exiftool_failed"] += 1
+                print(f"EXIFTOOL FAILED  {path}")
                 continue
+            diffs = [f"{k}: native={native[k]!r} exiftool={reference[k]!r}"
+                     for k in native if native[k] != reference[k]]
+            if diffs:
+                counts["mismatch"] += 1
+                print(f"MISMATCH  {path}\n    " + "\n    ".join(diffs))
+            else:
+                counts["match"] += 1
+                if args.show_matches:
+                    print(f"MATCH     {path}")
+
+    print(f"\nFiles checked:               {len(files)}", file=sys.stderr)
+    print(f"  Native read agrees:        {counts['match']}", file=sys.stderr)
+    print(f"  Native read disagrees:     {counts['mismatch']}", file=sys.stderr)
+    print(f"  Not handled (fallback):    {counts['fallback']}", file=sys.stderr)
+    print(f"  exiftool could not read:   {counts['exiftool_failed']}", file=sys.stderr)
+    if counts["mismatch"]:
+        sys.exit(1)
 
-            target_time = parse_datetime(row['Date/Time Original (Capture)'], verbose_debug=verbose_debug)
-            if not target_time:
-                if debug:
-                    print(f"  → could not parse target datetime: {row.get('Date/Time Original (Capture)')}", file=sys.stderr)
-                still_missing.append(row)
-                still_missing_count += 1
-                last_completed_row = skip_rows + i
+def cmd_rebuild_outputs(argv):
+    parser = argparse.ArgumentParser(
+        prog="relink_missing_photos.py rebuild-outputs",
+        description=f"Regenerate the .sh and CSV outputs in a directory from its {RelinkJournal.NAME}.",
+    )
+    parser.add_argument("output_dir", help="The --output-dir of an earlier run.")
+    args = parser.parse_args(argv)
+    try:
+        counters, rows = rebuild_outputs(args.output_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Rebuilt outputs in {args.output_dir} from {rows} journal rows "
+          f"({counters['relink_best']} relinks, {counters['resolution_match']} resolution mismatches, "
+          f"{counters['still_missing']} still missing)", file=sys.stderr)
+
+def cmd_merge(argv):
+    parser = argparse.ArgumentParser(
+        prog="relink_missing_photos.py merge",
+        description="Combine the outputs of --shard runs (one --output-dir each) into one set of outputs "
+                    "in CSV row order, with combined summary counts.",
+    )
+    parser.add_argument("output_dir", help="Directory to write the merged outputs to.")
+    parser.add_argument("shard_dirs", nargs="+", metavar="shard_dir",
+                        help=f"--output-dir of each shard run (each holds a {RelinkJournal.NAME}).")
+    args = parser.parse_args(argv)
+    try:
+        counters, rows, missing = merge_journals(args.shard_dirs, args.output_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Merged {len(args.shard_dirs)} run(s) into {args.output_dir}", file=sys.stderr)
+    print_summary(counters, rows)
+    if missing:
+        print(f"\n⚠️ Shard(s) {', '.join(missing)} not merged; their rows are missing from the outputs.",
+              file=sys.stderr)
+        sys.exit(1)
+
+def cmd_build_filename_index(argv):
+    parser = argparse.ArgumentParser(
+        prog="relink_missing_photos.py build-filename-index",
+        description="Create or refresh a --filename-index.  With no ROOT, every root already in the "
+                    "index is refreshed; only directories changed since the last build are listed again.",
+    )
+    parser.add_argument("index", help="SQLite file to create or update.")
+    parser.add_argument("roots", nargs="*", metavar="ROOT", help="Search root(s) to add or refresh.")
+    parser.add_argument("--exclude-sources", nargs="*", default=None,
+                        help="Paths to leave out of the given roots (default: as when each root was last built).")
+    parser.add_argument("--remove-root", nargs="*", default=[], metavar="ROOT",
+                        help="Drop these roots from the index.")
+    parser.add_argument("--index-workers", type=int, default=DEFAULT_INDEX_WORKERS,
+                        help=f"Directories listed in parallel (default: {DEFAULT_INDEX_WORKERS}).")
+    args = parser.parse_args(argv)
+    if args.index_workers < 1:
+        parser.error("--index-workers must be >= 1.")
+
+    index = FilenameIndex(args.index)
+    try:
+        for root in args.remove_root:
+            print(f"Removed {root}: {index.remove_root(root)} files", file=sys.stderr)
+        known = index.roots()
+        roots = args.roots or ([] if args.remove_root else list(known))
+        if not roots and not args.remove_root:
+            parser.error(f"{args.index} has no roots yet; give at least one ROOT.")
+        for root in roots:
+            root = os.path.abspath(root)
+            if not os.path.isdir(root):
+                print(f"⚠️ {root} is not a directory (is the volume mounted?); skipping", file=sys.stderr)
                 continue
+            exclude_sources = args.exclude_sources
+            if exclude_sources is None:
+                exclude_sources = known[root][0] if root in known else []
+            try:
+                added, removed = index.refresh(root, exclude_sources, workers=args.index_workers)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+            print(f"{root}: {added} files added, {removed} removed", file=sys.stderr)
+        for root, (excludes, indexed_at, files) in index.roots().items():
+            note = f", excluding {', '.join(excludes)}" if excludes else ""
+            print(f"  {root}: {files} files, indexed {indexed_at}{note}", file=sys.stderr)
+    finally:
+        index.close()
 
-            csv_camera = str(row.get('Camera Make') or '').strip().lower()
-            target_w = int(row['Width'])
-            target_h = int(row['Height'])
+def cmd_apply(argv):
+    parser = argparse.ArgumentParser(
+        prog="relink_missing_photos.py apply",
+        description="Carry out the ln/cp lines of generated scripts (e.g. relink_good_matches.sh "
+                    "higher_resolution.sh) in-process instead of running them with bash.  Existing "
+                    "files are never overwritten and links are only made within one filesystem.  "
+                    "Dry-run by default; pass --execute to link and copy.",
+    )
+    parser.add_argument("plans", nargs="+", metavar="SCRIPT", help="Generated script(s) to apply, in order.")
+    parser.add_argument("--execute", action="store_true",
+                        help="Actually create the links and copies (default: dry-run, nothing is written).")
+    parser.add_argument("--copy-across-volumes", action="store_true",
+                        help="Copy instead of failing when an ln line crosses filesystems.")
+    parser.add_argument("--jobs", type=int, default=4,
+                        help="Operations in flight on each source volume; volumes run in parallel (default: 4).")
+    parser.add_argument("--log", default=None, metavar="PATH",
+                        help=f"CSV log of every operation, appended to across runs "
+                             f"(default: {APPLY_LOG} next to the first SCRIPT).")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1.")
+    dry_run = not args.execute
 
-            def score(candidate, _target_time=target_time, _csv_camera=csv_camera):
-                meta = get_exif_data_exiftool(candidate, verbose_debug=verbose_debug)
-                if not meta:
-                    if debug:
-                        print(f"    [DEBUG] {candidate}: exiftool returned no data", file=sys.stderr)
-                    return None
-                cand_time = parse_datetime(meta['DateTime'], verbose_debug=verbose_debug)
-                if not cand_time:
-                    if debug:
-                        print(f"    [DEBUG] {candidate}: could not parse candidate datetime: {meta['DateTime']}", file=sys.stderr)
-                    return None
-                target_time_naive = _target_time.replace(tzinfo=None)
-                cand_time_naive = cand_time.replace(tzinfo=None)
-                time_diff = abs(cand_time_naive - target_time_naive)
-                tz_adjusted = False
-                if time_diff > TIME_DELTA:
-                    if allow_timezone_mismatches and timezone_offset_match(time_diff):
-                        tz_adjusted = True
-                        if debug:
-                            total_mins = int(time_diff.total_seconds() / 60)
-                            print(f"    [DEBUG] {candidate}: time diff {time_diff} accepted as timezone offset (~{total_mins} min)", file=sys.stderr)
-                    else:
-                        if debug:
-                            print(f"    [DEBUG] {candidate}: time diff {time_diff} exceeds limit ({_target_time} vs {cand_time})", file=sys.stderr)
-                        return None
-                file_camera = meta['Camera Make'].strip().lower()
-                camera_ok = not _csv_camera or not file_camera or _csv_camera in file_camera or file_camera in _csv_camera
-                if not camera_ok:
-                    if debug:
-                        print(f"    [DEBUG] {candidate}: camera mismatch (csv={_csv_camera!r}, file={file_camera!r})", file=sys.stderr)
-                    return None
-                if debug:
-                    tz_note = " (timezone-adjusted)" if tz_adjusted else ""
-                    print(f"    [DEBUG] {candidate}: PASS{tz_note} — time_diff={time_diff}, camera={file_camera!r}, size={meta['Width']}x{meta['Height']}", file=sys.stderr)
-                return {
-                    'path': candidate,
-                    'meta': meta,
-                    'ext': Path(candidate).suffix.lower(),
-                    'raw': is_raw_file(candidate),
-                    'tz_adjusted': tz_adjusted,
-                    'camera_score': 2 if _csv_camera and file_camera and _csv_camera == file_camera
-                                    else 1 if _csv_camera in file_camera or file_camera in _csv_camera
-                                    else 0,
-                    'resolution': meta['Width'] * meta['Height'],
-                    'same_volume': get_volume(candidate) == get_volume(original_path)
-                }
+    try:
+        operations, problems = read_plan(args.plans)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    log_path = Path(args.log) if args.log else Path(args.plans[0]).parent / APPLY_LOG
+    log_columns = ["timestamp", "operation", "status", "source", "destination", "file_size", "plan", "notes"]
+    print(f"Apply ({'DRY-RUN' if dry_run else 'EXECUTE'}): {len(operations)} operation(s) from "
+          f"{len(args.plans)} script(s)", file=sys.stderr)
+    if dry_run:
+        print("No files will be linked or copied.  Pass --execute to apply.", file=sys.stderr)
 
-            scored = list(filter(None, (score(c) for c in candidates)))
+    counts = Counter()
+    lock = threading.Lock()
+    # The log accumulates across runs (a dry-run, then --execute, then a
+    # re-run after an interruption); the header is written once.
+    new_log = not log_path.exists() or log_path.stat().st_size == 0
+    log_file = open(log_path, "a", newline="", encoding="utf-8")
+    writer = csv.DictWriter(log_file, fieldnames=log_columns)
+    if new_log:
+        writer.writeheader()
 
-            same_type_sorted = sorted(
-                [s for s in scored if s['ext'] == target_ext],
-                key=sort_key
-            )
-            other_type_sorted = sorted(
-                [s for s in scored if s['ext'] != target_ext],
-                key=sort_key
-            )
+    def log(operation, status, source, destination, file_size, plan, notes):
+        ts = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        with lock:
+            counts[operation, status] += 1
+            writer.writerow({"timestamp": ts, "operation": operation, "status": status, "source": source,
+                             "destination": destination, "file_size": file_size, "plan": plan, "notes": notes})
+            if status in ("SKIP", "ERROR"):
+                print(f"[{ts}] {operation} {status}: {source} → {destination}  {notes}", file=sys.stderr)
 
-            exact_matches = [s for s in same_type_sorted if s['meta']['Width'] == target_w and s['meta']['Height'] == target_h]
-            emitted_resolution_mismatch = False
-            decision_made = False
+    for plan, op, source, destination, notes in problems:
+        if op is None:
+            log("PARSE", "ERROR", source, destination, "", plan, notes)
+        else:
+            log("LINK" if op == "ln" else "COPY", "SKIP", source, destination, "", plan, notes)
 
-            if debug:
-                print(
-                    f"  scored={len(scored)}, same_type={len(same_type_sorted)}, "
-                    f"other_type={len(other_type_sorted)}, exact_matches={len(exact_matches)}",
-                    file=sys.stderr
-                )
+    by_source = defaultdict(list)
+    for operation in operations:
+        by_source[operation["source"]].append(operation)
 
-            if len(exact_matches) == 1:
-                cmd = make_link_or_copy_command(exact_matches[0]['path'], original_path, copy_across_volumes)
-                relink_file.write(cmd + "\n")
-                relink_best_count += 1
-                decision_made = True
-                # Check for same-extension candidates with higher resolution than the exact match
-                best_res = exact_matches[0]['resolution']
-                for rank, candidate in enumerate(
-                    s for s in same_type_sorted if s['resolution'] > best_res
-                ):
-                    import_same_format_higher_res.append({
-                        "missing_file": original_path,
-                        "matched_file": str(exact_matches[0]['path']),
-                        "new_file": str(candidate["path"]),
-                        "lr_width": target_w,
-                        "lr_height": target_h,
-                        "matched_width": exact_matches[0]['meta']['Width'],
-                        "matched_height": exact_matches[0]['meta']['Height'],
-                        "new_width": candidate["meta"]["Width"],
-                        "new_height": candidate["meta"]["Height"],
-                        "rank": rank,
-                    })
-            elif len(exact_matches) > 1:
-                sorted_matches = sorted(exact_matches, key=sort_key)
-                best = sorted_matches[0]
-                cmd = make_link_or_copy_command(best['path'], original_path, copy_across_volumes)
-                relink_file.write(f'# Selected best match from {len(sorted_matches)} candidates: {format_candidate_meta(best)}\n')
-                relink_file.write(cmd + "\n")
-                relink_best_count += 1
-                for alt in sorted_matches[1:]:
-                    relink_file.write(f'# Alt: {alt["path"]} ({alt["meta"]["Width"]}x{alt["meta"]["Height"]}, {alt["meta"]["Camera Make"]})\n')
-                    relink_alt_count += 1
-                decision_made = True
-                # Check for same-extension candidates with higher resolution than the best exact match
-                best_res = best['resolution']
-                for rank, candidate in enumerate(
-                    s for s in same_type_sorted if s['resolution'] > best_res
-                ):
-                    import_same_format_higher_res.append({
-                        "missing_file": original_path,
-                        "matched_file": str(best['path']),
-                        "new_file": str(candidate["path"]),
-                        "lr_width": target_w,
-                        "lr_height": target_h,
-                        "matched_width": best['meta']['Width'],
-                        "matched_height": best['meta']['Height'],
-                        "new_width": candidate["meta"]["Width"],
-                        "new_height": candidate["meta"]["Height"],
-                        "rank": rank,
-                    })
-            elif same_type_sorted:
-                best = same_type_sorted[0]
-                cmd = make_link_or_copy_command(best['path'], original_path, copy_across_volumes)
-                higher_res_tag = " HIGHER_RESOLUTION" if best['resolution'] > target_w * target_h else ""
-                comment = f'# Resolution mismatch{higher_res_tag} (LR:{target_w}x{target_h}): {original_path} -> {format_candidate_meta(best)}'
-                mismatch_file.write(comment + "\n")
-                mismatch_file.write(cmd + "\n")
-                if higher_res_tag:
-                    higher_resolution_file.write(comment + "\n")
-                    higher_resolution_file.write(cmd + "\n")
-                    higher_resolution_count += 1
-                emitted_resolution_mismatch = True
-                resolution_match_count += 1
-                decision_made = True
-                for alt in same_type_sorted[1:]:
-                    mismatch_file.write(f'# Alt: {alt["path"]} ({alt["meta"]["Width"]}x{alt["meta"]["Height"]}, {alt["meta"]["Camera Make"]})\n')
-                    resolution_alt_count += 1
-                higher_res_other_formats = [
-                    s for s in other_type_sorted
-                    if s['resolution'] > best['resolution']
-                ]
-                for rank, candidate in enumerate(higher_res_other_formats):
-                    import_other_formats.append({
-                        "missing_file": original_path,
-                        "new_file": str(candidate["path"]),
-                        "missing_width": target_w,
-                        "missing_height": target_h,
-                        "new_width": candidate["meta"]["Width"],
-                        "new_height": candidate["meta"]["Height"],
-                        "rank": rank,
-                    })
-            elif other_type_sorted:
-                for rank, candidate in enumerate(other_type_sorted):
-                    import_other_formats.append({
-                        "missing_file": original_path,
-                        "new_file": str(candidate["path"]),
-                        "missing_width": target_w,
-                        "missing_height": target_h,
-                        "new_width": candidate["meta"]["Width"],
-                        "new_height": candidate["meta"]["Height"],
-                        "rank": rank,
-                    })
-                import_other_formats_primary_count += 1
-                decision_made = True
-
-            # Defensive guard: if same-type candidates exist and no exact match exists,
-            # resolution mismatch output must not be skipped.
-            if same_type_sorted and not exact_matches and not emitted_resolution_mismatch:
-                best = same_type_sorted[0]
-                cmd = make_link_or_copy_command(best['path'], original_path, copy_across_volumes)
-                higher_res_tag = " HIGHER_RESOLUTION" if best['resolution'] > target_w * target_h else ""
-                comment = f'# Resolution mismatch{higher_res_tag} (LR:{target_w}x{target_h}): {original_path} -> {format_candidate_meta(best)}'
-                mismatch_file.write(comment + "\n")
-                mismatch_file.write(cmd + "\n")
-                if higher_res_tag:
-                    higher_resolution_file.write(comment + "\n")
-                    higher_resolution_file.write(cmd + "\n")
-                    higher_resolution_count += 1
-                resolution_match_count += 1
-                for alt in same_type_sorted[1:]:
-                    mismatch_file.write(f'# Alt: {alt["path"]} ({alt["meta"]["Width"]}x{alt["meta"]["Height"]}, {alt["meta"]["Camera Make"]})\n')
-                    resolution_alt_count += 1
-                decision_made = True
-                if debug:
-                    print("  [DEBUG] Fallback guard emitted resolution mismatch entry.", file=sys.stderr)
-            if not decision_made:
-                if debug:
-                    print(f"  → no scored candidates passed filters", file=sys.stderr)
-                still_missing.append(row)
-                still_missing_count += 1
-
-            last_completed_row = skip_rows + i
-            if i % 100 == 0 or i == total:
-                print(f"Processed {i}/{total} rows...", file=sys.stderr)
-                relink_file.flush()
-                mismatch_file.flush()
-                higher_resolution_file.flush()
-                flush_csv_outputs()
+    def apply_sources(sources):
+        """Apply every operation reading from ``sources`` (one VolumeScheduler request)."""
+        for source in sources:
+            for item in by_source[source]:
+                operation, status, file_size, notes = apply_plan_operation(
+                    item["op"], source, item["destination"], dry_run, args.copy_across_volumes)
+                log(operation, status, source, item["destination"], file_size, item["plan"], notes)
+        return {}
 
+    scheduler = VolumeScheduler(per_volume=args.jobs, order="directory")
+    try:
+        scheduler.run(list(by_source), apply_sources)
     except KeyboardInterrupt:
-        relink_file.flush()
-        mismatch_file.flush()
-        higher_resolution_file.flush()
-        flush_csv_outputs()
-        _print_interrupt_resume(csv_filename, last_completed_row, skip_rows,
-                                rows_to_process, output_dir, sys.argv)
+        print(f"\n⚠️ Interrupted; operations so far are logged in {log_path}. Applying the same "
+              f"script(s) again skips destinations that now exist.", file=sys.stderr)
         sys.exit(130)
     finally:
-        relink_file.close()
-        mismatch_file.close()
-        higher_resolution_file.close()
+        log_file.close()
 
-    # Final flush for any remaining buffered CSV rows
-    flush_csv_outputs()
+    print(f"\nLog appended to {log_path}", file=sys.stderr)
+    for (operation, status), n in sorted(counts.items()):
+        print(f"  {operation:<5} {status:<8} {n}", file=sys.stderr)
+    for name, files, requests, seconds in scheduler.report():
+        rate = f"{files / seconds:.1f} files/s" if seconds > 0 else "n/a"
+        print(f"  Volume {name}: {files} source files in {requests} request(s), {seconds:.1f}s busy ({rate})",
+              file=sys.stderr)
+    if any(status == "ERROR" for _, status in counts):
+        sys.exit(1)
 
-    print("\nSummary:", file=sys.stderr)
-    print(f"  Relink commands (best):            {relink_best_count}", file=sys.stderr)
-    print(f"  Relink commands (alternate):       {relink_alt_count}", file=sys.stderr)
-    print(f"  Resolution mismatches (match):     {resolution_match_count}", file=sys.stderr)
-    print(f"  Resolution mismatches (alternate): {resolution_alt_count}", file=sys.stderr)
-    print(f"  Higher resolution matches:         {higher_resolution_count}", file=sys.stderr)
-    print(f"  Import other formats:              {import_other_formats_primary_count} photos", file=sys.stderr)
-    print(f"  Import higher res same format:     (see {import_same_format_higher_res_path.name})", file=sys.stderr)
-    print(f"  Still missing:                     {still_missing_count}", file=sys.stderr)
-    total_primary = relink_best_count + resolution_match_count + import_other_formats_primary_count + still_missing_count
-    print(f"  (Total primary outcomes: {total_primary} / {total})", file=sys.stderr)
-    print(f"\nDone. Outputs written to: {out_dir}/")
+# Subcommands recognised as the first argument; anything else is a CSV filename
+# for the default relink run.
+COMMANDS = {
+    "prune-metadata-cache": cmd_prune_metadata_cache,
+    "rebuild-outputs": cmd_rebuild_outputs,
+    "merge": cmd_merge,
+    "build-filename-index": cmd_build_filename_index,
+    "apply": cmd_apply,
+    "check-native-exif": cmd_check_native_exif,
+}
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        sys.exit(0)
+
     parser = argparse.ArgumentParser(description="Find and relink missing photos by matching metadata.")
     parser.add_argument("csv_filename", help="Path to the CSV file containing missing photos metadata.")
     parser.add_argument(
         "--search-root",
         default=None,
-        help="Root directory to search for candidate photo files. Required unless --mdfind is specified.",
+        help="Root directory to search for candidate photo files. Required unless --mdfind or "
+             "--filename-index is specified (with either, it narrows the search to this directory).",
     )
     parser.add_argument(
         "--mdfind",
@@ -642,6 +3282,14 @@ if __name__ == "__main__":
         help="Use macOS Spotlight (mdfind) to find candidates instead of walking the directory tree. "
              "Makes --search-root optional (but it can still be used to constrain the search).",
     )
+    parser.add_argument(
+        "--filename-index",
+        default=None,
+        metavar="PATH",
+        help="Look candidates up in a prebuilt SQLite filename index instead of walking the tree. "
+             "Build or refresh it (for one or more roots) with: "
+             "relink_missing_photos.py build-filename-index PATH ROOT...",
+    )
     parser.add_argument(
         "--copy-across-volumes",
         action="store_true",
@@ -669,6 +3317,21 @@ if __name__ == "__main__":
         action="store_true",
         help="Append to existing output files instead of overwriting them.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Continue an interrupted run: skip every row already recorded in {RelinkJournal.NAME} in "
+             f"--output-dir (whatever order they were finished in) and rebuild the outputs from it.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="i/N",
+        help="Process only the i-th of N shards of the CSV (e.g. 2/4), chosen by a stable hash of the "
+             "file stem so rows sharing a stem stay together. Run each shard into its own --output-dir, "
+             "then combine them with: relink_missing_photos.py merge OUTPUT_DIR SHARD_DIR...",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -686,14 +3349,135 @@ if __name__ == "__main__":
         help="Accept candidates whose capture time differs by an even half-hour offset (±30 min granularity) "
              "up to ±26 hours, with a residual within 1 minute. Handles cameras without timezone support.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Score up to N rows concurrently (default: 1). Outputs are still written in CSV row order. "
+             "--debug output from concurrent rows may interleave.",
+    )
+    parser.add_argument(
+        "--exiftool-workers",
+        type=int,
+        default=None,
+        help="Number of persistent exiftool processes (-stay_open) used to read candidate metadata "
+             "(default: same as --jobs). "
+             "0 starts a new exiftool process for every request (slower; useful for comparison).",
+    )
+    parser.add_argument(
+        "--async-lookups",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Run mdfind queries and exiftool reads as asyncio subprocesses, up to N at once, each "
+             "with its own timeout, so one hung file does not hold up the others (default: 0, off). "
+             "exiftool then runs one process per batch unless --exiftool-workers is also given.",
+    )
+    parser.add_argument(
+        "--prefetch-rows",
+        type=int,
+        default=DEFAULT_PREFETCH_ROWS,
+        help=f"Look ahead this many CSV rows and read metadata for all of their candidates in batched "
+             f"exiftool requests (default: {DEFAULT_PREFETCH_ROWS}). 0 reads the candidates of one row "
+             f"at a time. Rows sharing a file stem reuse one lookup and read.",
+    )
+    parser.add_argument(
+        "--per-volume-reads",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Schedule candidate metadata reads per volume (st_dev): each volume's files are read in "
+             "on-disk order with at most N requests in flight on it, volumes in parallel, and the "
+             "Summary reports throughput per volume (default: 0, off). Give --exiftool-workers at "
+             "least N times the number of volumes so they can all be busy.",
+    )
+    parser.add_argument(
+        "--volume-order",
+        choices=VolumeScheduler.ORDERS,
+        default="inode",
+        help="Read order within a volume for --per-volume-reads: by inode (default) or by "
+             "directory, then inode.",
+    )
+    parser.add_argument(
+        "--metadata-cache",
+        default=None,
+        metavar="PATH",
+        help="SQLite file caching candidate metadata between runs. Entries are reused while the "
+             "file's device, inode, size and mtime are unchanged. "
+             "Prune entries for deleted files with: relink_missing_photos.py prune-metadata-cache PATH",
+    )
+    parser.add_argument(
+        "--quarantine",
+        default=None,
+        metavar="PATH",
+        help=f"SQLite file listing files exiftool timed out on, crashed on, or repeatedly could not "
+             f"read; later runs leave them out (default: {QUARANTINE_FILE} in --output-dir). A file is "
+             f"read again once it changes. To clear the quarantine, delete this file (with its -wal and "
+             f"-shm files), or use --retry-quarantined to release the files that now read.",
+    )
+    parser.add_argument(
+        "--retry-quarantined",
+        action="store_true",
+        help="Read quarantined files again (after the others, one per exiftool request); files that "
+             "now succeed leave the quarantine.",
+    )
+    parser.add_argument(
+        "--quarantine-strikes",
+        type=int,
+        default=ExiftoolQuarantine.STRIKES,
+        metavar="N",
+        help="Runs in which exiftool returns no record for a file before it is quarantined "
+             f"(default: {ExiftoolQuarantine.STRIKES}). A timeout or crash on the file itself "
+             "quarantines it at once.",
+    )
+    parser.add_argument(
+        "--native-exif",
+        action="store_true",
+        help="Read Make/size/DateTimeOriginal directly from JPEG and TIFF-based RAW headers "
+             "(NEF, CR2, DNG, ORF, ARW, PEF, RW2) without exiftool, falling back to exiftool for "
+             "anything it cannot read. Check parity on your own files first with: "
+             "relink_missing_photos.py check-native-exif DIR",
+    )
+    parser.add_argument(
+        "--index-workers",
+        type=int,
+        default=DEFAULT_INDEX_WORKERS,
+        help=f"Threads used to index --search-root; each top-level subdirectory is walked on its own "
+             f"thread (default: {DEFAULT_INDEX_WORKERS}). 1 walks the tree serially.",
+    )
+    parser.add_argument(
+        "--index-file",
+        default=None,
+        metavar="PATH",
+        help="SQLite file keeping the directory listings of --search-root between runs. Only "
+             "directories whose modification time has changed are listed again.",
+    )
+    parser.add_argument(
+        "--stats-json",
+        default=None,
+        metavar="PATH",
+        help="Write per-stage timings (totals and percentiles), candidate counts and rows per "
+             "outcome to this JSON file at exit, or when interrupted.",
+    )
     parser.add_argument("--test-n", type=int, help="Run script on a random sample of N rows for testing.")
     parser.add_argument("--exclude-sources", nargs='*', help="Paths to exclude as candidate sources.")
     parser.add_argument("--exclude-targets", nargs='*', help="Paths to exclude from processing as missing targets.")
     args = parser.parse_args()
 
-    # Validate: search-root required unless --mdfind
-    if not args.mdfind and args.search_root is None:
-        parser.error("--search-root is required unless --mdfind is specified.")
+    # Validate: search-root required unless --mdfind or --filename-index
+    if args.mdfind and args.filename_index:
+        parser.error("--mdfind and --filename-index cannot be used together.")
+    if not args.mdfind and not args.filename_index and args.search_root is None:
+        parser.error("--search-root is required unless --mdfind or --filename-index is specified.")
+
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1.")
+    if args.index_workers < 1:
+        parser.error("--index-workers must be >= 1.")
+    if args.async_lookups < 0:
+        parser.error("--async-lookups must be >= 0.")
+    if args.per_volume_reads < 0:
+        parser.error("--per-volume-reads must be >= 0.")
 
     # Fail fast before expensive indexing if exiftool is unavailable.
     ensure_exiftool_available()
@@ -717,4 +3501,21 @@ if __name__ == "__main__":
         debug=debug,
         allow_timezone_mismatches=args.allow_timezone_mismatches,
         verbose_debug=verbose_debug,
+        exiftool_workers=args.exiftool_workers,
+        prefetch_rows=args.prefetch_rows,
+        metadata_cache_path=args.metadata_cache,
+        jobs=args.jobs,
+        native_exif=args.native_exif,
+        index_workers=args.index_workers,
+        index_file=args.index_file,
+        stats_json=args.stats_json,
+        resume=args.resume,
+        shard=args.shard,
+        filename_index=args.filename_index,
+        async_lookups=args.async_lookups,
+        quarantine_path=args.quarantine,
+        retry_quarantined=args.retry_quarantined,
+        quarantine_strikes=args.quarantine_strikes,
+        per_volume_reads=args.per_volume_reads,
+        volume_order=args.volume_order,
     )
@@ -0,0 +1,33 @@
+import csv
+
+import relink_missing_photos as rmp
+
+
+def test_apply_log_accumulates_across_runs(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.jpg").write_bytes(b"jpeg")
+    (tmp_path / "dst").mkdir()
+    plan = tmp_path / "relink_good_matches.sh"
+    plan.write_text(f"#!/bin/bash\nln '{tmp_path}/src/a.jpg' '{tmp_path}/dst/a.jpg'\n")
+    log = tmp_path / rmp.APPLY_LOG
+
+    rmp.cmd_apply([str(plan)])
+    rmp.cmd_apply([str(plan), "--execute"])
+
+    with open(log, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["status"] for row in rows] == ["DRY-RUN", "OK"]
+    assert (tmp_path / "dst" / "a.jpg").read_bytes() == b"jpeg"
+
+
+def test_apply_does_not_create_destination_directories(tmp_path):
+    source = tmp_path / "a.jpg"
+    source.write_bytes(b"jpeg")
+    unmounted = tmp_path / "Volumes" / "Old" / "Photos" / "a.jpg"
+
+    for op, copy_across_volumes in (("cp", False), ("ln", True)):
+        operation, status, _, notes = rmp.apply_plan_operation(
+            op, str(source), str(unmounted), dry_run=False, copy_across_volumes=copy_across_volumes)
+        assert status == "ERROR" and "does not exist" in notes
+
+    assert not (tmp_path / "Volumes").exists()
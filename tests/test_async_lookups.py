@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+
+import relink_missing_photos as rmp
+
+# Stand-in for exiftool -json: each file holds its tags as JSON; a file whose
+# name contains "hang" never answers.
+FAKE_EXIFTOOL = """#!{python}
+import json, sys, time
+files = [a for a in sys.argv[1:] if not a.startswith("-")]
+if any("hang" in f for f in files):
+    time.sleep(1000)
+out = []
+for f in files:
+    with open(f) as fh:
+        tags = json.load(fh)
+    tags["SourceFile"] = f
+    out.append(tags)
+print(json.dumps(out))
+"""
+
+
+def _fake_exiftool(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "exiftool"
+    script.write_text(FAKE_EXIFTOOL.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def _photo(tmp_path, name, make):
+    path = tmp_path / name
+    path.write_text(json.dumps({"Make": make, "ImageWidth": 4000, "ImageHeight": 3000,
+                                "DateTimeOriginal": "2013:05:01 10:00:00"}))
+    return str(path)
+
+
+def test_async_exiftool_timeout_skips_only_the_hung_file(tmp_path, monkeypatch):
+    _fake_exiftool(tmp_path, monkeypatch)
+    good = [_photo(tmp_path, f"ok{i}.NEF", "NIKON") for i in range(3)]
+    hung = _photo(tmp_path, "hang.NEF", "NIKON")
+    timeouts = rmp.ExiftoolTimeouts(default=1)
+    runner = rmp.AsyncLookups(4, timeouts=timeouts)
+
+    found = runner.get_exif_data_batch(good + [hung], batch_size=10)
+
+    assert sorted(found) == sorted(good)
+    assert found[good[0]]["Camera Make"] == "NIKON"
+    assert runner.timeouts is timeouts
+    assert list(timeouts.timed_out) == [hung]
+    # The batch and then the hung file on its own.
+    assert runner.timed_out_calls == 2
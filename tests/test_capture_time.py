@@ -0,0 +1,32 @@
+import pytest
+
+import relink_missing_photos as rmp
+
+
+@pytest.mark.parametrize("value", ["1e15", "1e20", "-1e20", "1e400", "inf", "-inf", "nan"])
+def test_out_of_range_numbers_are_unparseable(value):
+    assert rmp.capture_seconds(value) == rmp.UNPARSEABLE_CAPTURE_TIME
+
+
+def test_valid_capture_times_round_trip():
+    seconds = rmp.capture_seconds("2012:05:06 07:08:09")
+    assert str(rmp.capture_datetime(seconds)) == "2012-05-06 07:08:09"
+    assert rmp.capture_datetime(rmp.capture_seconds("0")) == rmp.datetime(2001, 1, 1)
+
+
+def test_prescan_reports_out_of_range_rows(tmp_path):
+    missing = tmp_path / "Missing_Photos.csv"
+    missing.write_text(
+        f"Photo,{rmp.CAPTURE_COLUMN},Width,Height\n"
+        "/p/a.NEF,1e20,10,10\n"
+        "/p/b.NEF,inf,10,10\n"
+        "/p/c.NEF,nan,10,10\n"
+        "/p/d.NEF,2012:05:06 07:08:09,10,10\n",
+        encoding="utf-8",
+    )
+
+    seconds, unparseable, stem_rows = rmp.prescan_missing_csv(missing)
+
+    assert list(seconds[:3]) == [rmp.UNPARSEABLE_CAPTURE_TIME] * 3
+    assert unparseable == [(0, "1e20"), (1, "inf"), (2, "nan")]
+    assert sum(stem_rows.values()) == 4
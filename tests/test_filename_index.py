@@ -0,0 +1,24 @@
+import relink_missing_photos as rmp
+
+
+def make_tree(root):
+    (root / "photos" / "2012").mkdir(parents=True)
+    (root / "photos" / "2012" / "IMG_0001.NEF").write_bytes(b"raw")
+    (root / "photos" / "IMG_0001.jpg").write_bytes(b"jpeg")
+
+
+def test_relative_search_root_paths_match_a_plain_walk(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    plain = dict(rmp.index_files_by_stem("photos", [], workers=1).items())
+
+    with_index_file = rmp.index_files_by_stem("photos", [], workers=1, index_file=tmp_path / "dirs.sqlite")
+    filename_index = rmp.FilenameIndex(tmp_path / "names.sqlite")
+    filename_index.refresh("photos", [], workers=1)
+    filename_index.close()
+    narrowed = rmp.FilenameIndex(tmp_path / "names.sqlite", search_root="photos")
+
+    assert plain == {"img_0001": ["photos/2012/IMG_0001.NEF", "photos/IMG_0001.jpg"]}
+    assert dict(with_index_file.items()) == plain
+    assert [str(p) for p in narrowed.find("img_0001")] == plain["img_0001"]
+    narrowed.close()
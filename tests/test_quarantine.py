@@ -0,0 +1,40 @@
+import relink_missing_photos as rmp
+
+
+def test_unreadable_files_need_strikes_but_timeouts_do_not(tmp_path):
+    flaky = tmp_path / "flaky.NEF"
+    hung = tmp_path / "hung.NEF"
+    for path in (flaky, hung):
+        path.write_bytes(b"raw")
+    db = tmp_path / "quarantine.sqlite"
+
+    for run in range(1, 4):
+        quarantine = rmp.ExiftoolQuarantine(db, strikes=3)
+        clear, held, _ = quarantine.split([flaky, hung])
+        assert flaky in clear
+        if run == 1:
+            quarantine.add({str(hung): "timeout"})
+        else:
+            assert held == [hung]
+        quarantine.add({str(flaky): "unreadable"})
+        assert (str(flaky) in quarantine.added) == (run == 3)
+        quarantine.close()
+
+    quarantine = rmp.ExiftoolQuarantine(db, strikes=3)
+    assert quarantine.split([flaky, hung])[1] == [flaky, hung]
+    quarantine.close()
+
+
+def test_successful_read_clears_strikes(tmp_path):
+    flaky = tmp_path / "flaky.NEF"
+    flaky.write_bytes(b"raw")
+    quarantine = rmp.ExiftoolQuarantine(tmp_path / "quarantine.sqlite", strikes=2)
+
+    quarantine.add({str(flaky): "unreadable"})
+    clear, held, struck = quarantine.split([flaky])
+    assert (clear, held, struck) == ([flaky], [], [flaky])
+    quarantine.release(struck)
+    quarantine.add({str(flaky): "unreadable"})
+
+    assert quarantine.split([flaky])[1] == []
+    quarantine.close()
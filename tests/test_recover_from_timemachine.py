@@ -0,0 +1,94 @@
+import unicodedata
+
+import recover_from_timemachine as rtm
+
+
+def test_trie_matches_nfd_and_case_variants(tmp_path):
+    # HFS+ stores names decomposed (NFD); Lightroom's CSV paths are NFC.
+    folder = tmp_path / unicodedata.normalize("NFD", "Café Zürich")
+    folder.mkdir()
+    (folder / "img_0001.nef").write_text("x")
+    wanted = unicodedata.normalize("NFC", "Café Zürich/IMG_0001.NEF")
+
+    found = rtm.resolve_path_trie(tmp_path, rtm.build_path_trie([wanted]))
+
+    assert found == {wanted: folder / "img_0001.nef"}
+
+
+def test_trie_prefers_exact_spelling_and_skips_missing(tmp_path):
+    (tmp_path / "RawPhotos").mkdir()
+    (tmp_path / "RawPhotos" / "a.jpg").write_text("x")
+    trie = rtm.build_path_trie(["RawPhotos/a.jpg", "RawPhotos/b.jpg", "Other/a.jpg"])
+
+    assert rtm.resolve_path_trie(tmp_path, trie) == {
+        "RawPhotos/a.jpg": tmp_path / "RawPhotos" / "a.jpg",
+    }
+
+
+def test_manifest_lookup_matches_nfd_paths(tmp_path):
+    manifests = rtm.SnapshotManifests(tmp_path / "manifests.sqlite")
+    stored = unicodedata.normalize("NFD", "Café/img_0001.nef")
+    snapshot_id = manifests.store("snap", "Ladyhawke", "Ladyhawke", [(stored, 10, 0.0, 1)])
+    wanted = unicodedata.normalize("NFC", "Café/IMG_0001.NEF")
+
+    assert manifests.lookup(snapshot_id, [wanted]) == {wanted: (stored, 10, 0.0)}
+    manifests.close()
+
+
+def test_walk_reports_unreadable_directories(tmp_path, monkeypatch):
+    (tmp_path / "ok").mkdir()
+    (tmp_path / "ok" / "a.jpg").write_text("x")
+    (tmp_path / "locked").mkdir()
+    (tmp_path / "locked" / "b.jpg").write_text("x")
+    real_scandir = rtm.os.scandir
+
+    def scandir(path):
+        if str(path).endswith("locked"):
+            raise PermissionError(13, "Permission denied")
+        return real_scandir(path)
+
+    monkeypatch.setattr(rtm.os, "scandir", scandir)
+    files, errors = rtm.walk_snapshot_files(tmp_path)
+
+    assert [f[0] for f in files] == ["ok/a.jpg"]
+    assert len(errors) == 1 and "locked" in errors[0]
+
+
+def make_monthly_snapshots(root, presence):
+    """
+    Newest-first monthly snapshot dirs; ``presence`` maps rel_path -> the
+    snapshot indices holding it (its directory is in every snapshot).
+    """
+    snapshots = []
+    for idx in range(12):
+        date_str = f"2020-{12 - idx:02}-01-120000"
+        lh_root = root / date_str / "Ladyhawke"
+        lh_root.mkdir(parents=True)
+        for rel, indices in presence.items():
+            (lh_root / rel).parent.mkdir(parents=True, exist_ok=True)
+            if idx in indices:
+                (lh_root / rel).write_text("x")
+        snapshots.append((lh_root, date_str))
+    return snapshots
+
+
+def test_batched_searches_do_no_more_lookups_than_per_path(tmp_path):
+    presence = {
+        "Photos/2020/new.jpg": range(0, 2),
+        "Photos/2019/mid.jpg": range(3, 8),
+        "Archive/2009/old.jpg": range(9, 12),
+    }
+    snapshots = make_monthly_snapshots(tmp_path, presence)
+    anchors = rtm.build_month_anchor_indices(snapshots)
+
+    for search in (rtm.find_all_in_snapshots_anchored, rtm.find_all_in_snapshots_bisect):
+        batched_stats = {}
+        batched = search(list(presence), snapshots, anchors, stats=batched_stats)
+        single_listed = 0
+        for rel in presence:
+            stats = {}
+            assert search([rel], snapshots, anchors, stats=stats) == {rel: batched[rel]}
+            single_listed += stats["dirs_listed"]
+
+        assert all(batched[rel] for rel in presence)
+        assert batched_stats["dirs_listed"] <= single_listed, search.__name__
@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+
+import relink_missing_photos as rmp
+
+
+def test_interrupt_stops_queued_reads(tmp_path):
+    paths = []
+    for i in range(50):
+        path = tmp_path / f"{i:02}.jpg"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+    calls = []
+    lock = threading.Lock()
+
+    def read(chunk):
+        with lock:
+            calls.append(chunk)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+        return {path: {} for path in chunk}
+
+    scheduler = rmp.VolumeScheduler(per_volume=2, batch_size=1)
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.run(paths, read)
+
+    assert len(calls) <= 4